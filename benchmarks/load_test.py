@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Concurrent-session load test for the Streamlit application
+
+Drives simulated analyst sessions through the full flow (upload, preview,
+ask, EDA, download) against a local mock LLM server and reports latency
+percentiles per step, memory growth and throughput at each concurrency level.
+
+Each session is a Streamlit AppTest instance running src/streamlit_app.py in
+this process, so reruns, the shared dataset store, the cached AI agent and
+background jobs behave as they do on a server. AppTest cannot drive the file
+uploader, so the upload step runs the app's ingestion path (preflight,
+processing, registration in the shared store) headlessly and hands the
+dataset to the session the same way the uploader branch does.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1,2,4,8 --rows 20000 --llm-latency-ms 300
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import statistics
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+APP = SRC / "streamlit_app.py"
+sys.path.append(str(SRC))
+
+try:
+    import psutil
+except ImportError:  # RSS is read from /proc (Linux) or getrusage when psutil is not installed
+    psutil = None
+
+STEPS = ['upload', 'preview', 'ask', 'eda', 'download']
+
+QUESTIONS = [
+    "What are the main trends in this data?",
+    "Which region has the highest revenue?",
+    "Are there any outliers in the quantity column?",
+    "Summarize the relationship between price and quantity.",
+]
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint with configurable latency and rate limiting"""
+
+    latency_ms = 200
+    jitter_ms = 50
+    rate_limit_ratio = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        with MockLLMHandler.lock:
+            MockLLMHandler.requests += 1
+
+        if not self.path.rstrip('/').endswith('chat/completions'):
+            self._reply(404, {'error': {'message': f"Unknown path {self.path}"}})
+            return
+
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+        if random.random() < self.rate_limit_ratio:
+            self._reply(429, {'error': {'message': "Rate limit exceeded (mock)", 'type': 'rate_limit'}})
+            return
+
+        prompt_chars = sum(len(m.get('content') or '') for m in body.get('messages', []))
+        completion = ("The data shows a steady upward trend with seasonal variation. "
+                      "Revenue is concentrated in a few regions and quantity has a handful of outliers.")
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = min(len(completion) // 4, body.get('max_tokens') or 500)
+        self._reply(200, {
+            'id': f"mock-{MockLLMHandler.requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': completion},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+def start_mock_llm(latency_ms: float, jitter_ms: float, rate_limit_ratio: float) -> ThreadingHTTPServer:
+    """Start the mock LLM server on a free local port in a daemon thread"""
+    MockLLMHandler.latency_ms = latency_ms
+    MockLLMHandler.jitter_ms = jitter_ms
+    MockLLMHandler.rate_limit_ratio = rate_limit_ratio
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockLLMHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="mock-llm").start()
+    return server
+
+class UploadedBytes(io.BytesIO):
+    """In-memory file with the attributes of a Streamlit UploadedFile"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.type = 'text/csv'
+
+def make_csv(rows: int, seed: int) -> bytes:
+    """Synthetic sales data with numeric, categorical and date columns"""
+    rng = random.Random(seed)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['date', 'region', 'product', 'quantity', 'price', 'revenue'])
+    regions = ['North', 'South', 'East', 'West']
+    products = [f"P{i:03d}" for i in range(50)]
+    start = time.mktime((2023, 1, 1, 0, 0, 0, 0, 0, -1))
+    for i in range(rows):
+        quantity = rng.randint(1, 20)
+        price = round(rng.uniform(5, 500), 2)
+        day = time.strftime('%Y-%m-%d', time.localtime(start + (i % 730) * 86400))
+        writer.writerow([day, rng.choice(regions), rng.choice(products), quantity, price,
+                         round(quantity * price, 2)])
+    return out.getvalue().encode('utf-8')
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, not current
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class SimulatedSession:
+    """One analyst session driven through the application script"""
+
+    def __init__(self, index: int, rows: int, shared_dataset: bool, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.timeout = timeout
+        self.upload = UploadedBytes(f"sales_{0 if shared_dataset else index}.csv",
+                                    make_csv(rows, 0 if shared_dataset else index))
+        self.app = AppTest.from_file(str(APP), default_timeout=timeout)
+        self.session_id = f"loadtest-{index}-{random.getrandbits(32):08x}"
+        self.timings = {}
+        self.error = None
+
+    def run(self) -> 'SimulatedSession':
+        try:
+            for step in STEPS:
+                started = time.perf_counter()
+                getattr(self, f"step_{step}")()
+                self.timings[step] = time.perf_counter() - started
+        except Exception as e:
+            self.error = f"{step}: {type(e).__name__}: {e}"
+        return self
+
+    def step_upload(self):
+        from data_processor import DataProcessor
+        from dataset_store import get_dataset_store, compute_fingerprint
+
+        processor = DataProcessor()
+        store = get_dataset_store()
+        key = compute_fingerprint(self.upload)
+        if not store.contains(key):
+            data = processor.process_file(self.upload)
+            store.put(key, data)
+        store.attach(self.session_id, key)
+        self.dataset_key = key
+        self.file_info = {'name': self.upload.name, 'type': 'CSV', 'size': self.upload.size, 'fingerprint': key}
+
+    def step_preview(self):
+        from dataset_store import get_dataset_store
+        from pagination import get_page_cache
+
+        for name, value in [('session_id', self.session_id), ('dataset_key', self.dataset_key),
+                            ('file_info', self.file_info)]:
+            self.app.session_state[name] = value
+        self.app.run()
+        self._check_exceptions()
+
+        data = get_dataset_store().get(self.dataset_key, self.session_id)
+        cache = get_page_cache()
+        for page in range(3):
+            cache.get_page(self.dataset_key, data, page, 25)
+        cache.get_page(self.dataset_key, data, 0, 25, sort_by='revenue', ascending=False)
+
+    def step_ask(self):
+        question = QUESTIONS[self.index % len(QUESTIONS)]
+        self.app.text_input(key="question_input").input(question).run()
+        self._button("🚀 Analyze").click().run()
+        self._check_exceptions()
+        if not self.app.session_state['chat_history']:
+            raise RuntimeError("No answer was recorded")
+
+    def step_eda(self):
+        self._button("📊 Generate EDA Report").click().run()
+        self._wait_for_job(f"eda:{self.dataset_key}")
+
+    def step_download(self):
+        self._button("💾 Download Analysis").click().run()
+        job = self._wait_for_job('export:report')
+        with open(job.result, 'rb') as f:
+            while f.read(1024 * 1024):
+                pass
+
+    def _button(self, label: str):
+        for button in self.app.button:
+            if button.label == label:
+                return button
+        raise RuntimeError(f"Button {label!r} is not on the page")
+
+    def _wait_for_job(self, memo_key: str):
+        from jobs import get_job_manager
+
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            self._check_exceptions()
+            job = get_job_manager().get(self.app.session_state['jobs'].get(memo_key))
+            if job is not None and not job.active:
+                if job.status != 'done':
+                    raise RuntimeError(f"Job {job.name} {job.status}: {job.error}")
+                return job
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Job {memo_key} did not finish in {self.timeout:.0f}s")
+            time.sleep(0.2)
+            self.app.run()
+
+    def _check_exceptions(self):
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].message)
+        for error in self.app.error:
+            raise RuntimeError(error.value)
+
+def run_level(concurrency: int, sessions: int, rows: int, shared_dataset: bool, timeout: float,
+              offset: int) -> dict:
+    """Run a number of sessions with at most `concurrency` in flight"""
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="session") as executor:
+        results = list(executor.map(
+            lambda i: SimulatedSession(offset + i, rows, shared_dataset, timeout).run(), range(sessions)
+        ))
+    elapsed = time.perf_counter() - started
+    rss_after = rss_bytes()
+
+    completed = [r for r in results if r.error is None]
+    steps = {}
+    for step in STEPS:
+        values = [r.timings[step] for r in results if step in r.timings]
+        steps[step] = {
+            'count': len(values),
+            'p50_s': percentile(values, 50),
+            'p95_s': percentile(values, 95),
+            'p99_s': percentile(values, 99),
+            'mean_s': statistics.fmean(values) if values else float('nan')
+        }
+    return {
+        'concurrency': concurrency,
+        'sessions': sessions,
+        'completed': len(completed),
+        'errors': [r.error for r in results if r.error],
+        'elapsed_s': elapsed,
+        'sessions_per_min': len(completed) / elapsed * 60 if elapsed else 0.0,
+        'rss_before_mb': rss_before / 1024 ** 2,
+        'rss_after_mb': rss_after / 1024 ** 2,
+        'rss_growth_mb': (rss_after - rss_before) / 1024 ** 2,
+        'steps': steps
+    }
+
+def print_level(result: dict):
+    print(f"\n=== concurrency {result['concurrency']}: {result['completed']}/{result['sessions']} sessions "
+          f"in {result['elapsed_s']:.1f}s ({result['sessions_per_min']:.1f} sessions/min), "
+          f"RSS {result['rss_before_mb']:.0f} -> {result['rss_after_mb']:.0f} MB "
+          f"({result['rss_growth_mb']:+.0f} MB)")
+    print(f"{'step':<10}{'n':>5}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}")
+    for step, stats in result['steps'].items():
+        print(f"{step:<10}{stats['count']:>5}{stats['p50_s']:>10.3f}{stats['p95_s']:>10.3f}{stats['p99_s']:>10.3f}")
+    for error in result['errors'][:5]:
+        print(f"  ! {error}")
+    if len(result['errors']) > 5:
+        print(f"  ! ... {len(result['errors']) - 5} more errors")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,2,4,8',
+                        help="Comma-separated numbers of simultaneous sessions")
+    parser.add_argument('--sessions-per-worker', type=int, default=2,
+                        help="Sessions run per concurrent worker at each level")
+    parser.add_argument('--rows', type=int, default=20000, help="Rows in each uploaded CSV")
+    parser.add_argument('--shared-dataset', action='store_true',
+                        help="Upload the same file in every session (exercises dataset sharing)")
+    parser.add_argument('--llm-latency-ms', type=float, default=300, help="Mock LLM response time")
+    parser.add_argument('--llm-jitter-ms', type=float, default=100, help="Random variation of the response time")
+    parser.add_argument('--llm-rate-limit-ratio', type=float, default=0.0,
+                        help="Fraction of LLM requests answered with HTTP 429")
+    parser.add_argument('--timeout', type=float, default=300, help="Per-step timeout in seconds")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError:
+        print("❌ Streamlit with the AppTest API (streamlit>=1.28) is required")
+        sys.exit(1)
+
+    server = start_mock_llm(args.llm_latency_ms, args.llm_jitter_ms, args.llm_rate_limit_ratio)
+    os.environ["TOGETHER_API_KEY"] = "mock-key"
+    os.environ["TOGETHER_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("METRICS_PORT", "0")
+    os.chdir(ROOT)
+    print(f"🧪 Mock LLM at {os.environ['TOGETHER_BASE_URL']} "
+          f"({args.llm_latency_ms:.0f}±{args.llm_jitter_ms:.0f} ms)")
+
+    results = []
+    offset = 0
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(',') if c.strip()]:
+            sessions = concurrency * args.sessions_per_worker
+            result = run_level(concurrency, sessions, args.rows, args.shared_dataset, args.timeout, offset)
+            offset += sessions
+            results.append(result)
+            print_level(result)
+    finally:
+        server.shutdown()
+
+    print(f"\nMock LLM requests: {MockLLMHandler.requests}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'levels': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,11 @@ def main():
     # Launch Streamlit
     streamlit_script = src_dir / "streamlit_app.py"
     
+    # Streamlit's own upload limit follows the app's file size cap
+    sys.path.insert(0, str(src_dir))
+    from settings import get_setting
+    max_upload_mb = get_setting('file_processing.max_file_size_mb', 50)
+    
     try:
         print(f"🌐 Launching Streamlit application...")
         print(f"📁 Script: {streamlit_script}")
@@ -61,7 +66,8 @@ def main():
             str(streamlit_script),
             "--server.address", "localhost",
             "--server.port", "8501",
-            "--server.headless", "false"
+            "--server.headless", "false",
+            "--server.maxUploadSize", str(max_upload_mb)
         ])
         
     except KeyboardInterrupt:
@@ -7,9 +7,25 @@ import together
 import os
 import logging
 import time
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, List, Optional
 import pandas as pd
 from data_processor import DataProcessor
+from conversation import Conversation
+from dataset_collection import DatasetCollection
+from out_of_core import ParquetDataset
+from dataset_store import get_dataset_store, fingerprint_data
+from metrics import get_metrics, timed, record_cache_lookup, TOKEN_BUCKETS
+from profiling import profiled
+from semantic_cache import get_semantic_cache
+from settings import get_setting
+from singleflight import SingleFlight, request_key
+
+# Shared by every AIAgent in the process so concurrent sessions coalesce identical requests
+_inflight_requests = SingleFlight()
+
+def _is_rate_limit(error: Exception) -> bool:
+    """Whether an API error is a rate limit (HTTP 429)"""
+    return getattr(error, 'status_code', None) == 429 or "rate limit" in str(error).lower()
 
 class AIAgent:
     """AI Agent for data analysis using Together AI's LLaMA model"""
@@ -30,8 +46,12 @@ class AIAgent:
         self.max_tokens = max_tokens
         self.temperature = temperature
         
-        # Initialize Together client
-        self.client = together.Together(api_key=api_key)
+        # Task routes (model tier, max tokens and fallback per task type)
+        self.model_tiers = get_setting('api.together.model_tiers', {}) or {}
+        self.routes = get_setting('api.together.routes', {}) or {}
+        
+        # Initialize Together client (TOGETHER_BASE_URL points it at another endpoint, e.g. a mock server)
+        self.client = together.Together(api_key=api_key, base_url=os.getenv("TOGETHER_BASE_URL") or None)
         self.data_processor = DataProcessor()
         
         # Test the connection
@@ -39,19 +59,55 @@ class AIAgent:
     
     def _test_connection(self):
         """Test the AI model connection"""
+        route = self.resolve_route('connection_test')
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
+                model=route['model'],
                 messages=[{"role": "user", "content": "Hello, are you working?"}],
-                max_tokens=50,
+                max_tokens=route['max_tokens'],
                 temperature=0.7
             )
-            self.logger.info("AI Agent connection successful")
+            self.logger.info(f"AI Agent connection successful ({route['model']})")
         except Exception as e:
             self.logger.error(f"Failed to connect to AI model: {str(e)}")
             raise ValueError(f"AI Agent initialization failed: {str(e)}")
     
-    def analyze_data(self, data: Union[pd.DataFrame, str], question: str, file_info: Dict[str, Any] = None) -> str:
+    def resolve_route(self, task: str) -> Dict[str, Any]:
+        """
+        Resolve the model settings for a task type
+        
+        Routes in api.together.routes name a model tier (from api.together.model_tiers),
+        a max_tokens budget and an optional fallback tier. The 'selected' tier, and any
+        task without a route, uses the model and max tokens chosen in the app.
+        
+        Args:
+            task: Task type such as 'analysis', 'suggest', 'summarize' or 'explain_column'
+            
+        Returns:
+            Dictionary with 'task', 'model', 'max_tokens' and 'fallback_model'
+        """
+        route = self.routes.get(task) or {}
+        
+        def tier_model(tier):
+            if not tier:
+                return None
+            if tier == 'selected':
+                return self.model
+            return self.model_tiers.get(tier, tier)
+        
+        model = tier_model(route.get('tier', 'selected'))
+        fallback_model = tier_model(route.get('fallback_tier'))
+        return {
+            'task': task,
+            'model': model,
+            'max_tokens': route.get('max_tokens') or self.max_tokens,
+            'fallback_model': fallback_model if fallback_model != model else None
+        }
+    
+    @profiled('analyze_data', fingerprint_fn=lambda self, data, question, file_info=None, *a, **kw:
+              (file_info or {}).get('fingerprint') or fingerprint_data(data))
+    def analyze_data(self, data: Union[pd.DataFrame, str], question: str, file_info: Dict[str, Any] = None,
+                     conversation: Conversation = None, task: str = 'analysis') -> str:
         """
         Analyze data using AI and answer the user's question
         
@@ -59,19 +115,46 @@ class AIAgent:
             data: Processed data (DataFrame or string)
             question: User's question about the data
             file_info: Information about the uploaded file
+            conversation: Optional conversation state; when given, the data context is sent
+                as a stable system message followed by the summarized and recent turns
+            task: Task type used to pick the model route
             
         Returns:
             AI-generated analysis response
         """
         try:
+            # Reuse an earlier answer to the same (or a rephrased) standalone question
+            cache_namespace = self._cache_namespace(file_info, task)
+            standalone = conversation is None or not conversation.turns
+            if cache_namespace and standalone and get_setting('analysis.ai.semantic_cache.enabled', True):
+                match = get_semantic_cache().lookup(cache_namespace, question)
+                if match and match['action'] == 'return':
+                    self.logger.info(f"Semantic cache hit (similarity {match['similarity']})")
+                    response = match['answer']
+                    if conversation is not None:
+                        conversation.add_turn(question, response)
+                    self._log_interaction(question, response, file_info)
+                    return response
+            
             # Prepare context for the AI
-            context = self._prepare_context(data, file_info)
+            context = self.prepare_context(data, file_info)
             
-            # Create the prompt
-            prompt = self._create_prompt(context, question)
+            if conversation is not None:
+                messages = conversation.build_messages(context, question)
+                response = self._get_ai_response(messages=messages, task=task)
+                
+                evicted = conversation.add_turn(question, response)
+                if evicted:
+                    self._compress_history(conversation, evicted)
+            else:
+                # Create the prompt
+                prompt = self._create_prompt(context, question)
+                
+                # Get AI response with retry logic
+                response = self._get_ai_response(prompt, task=task)
             
-            # Get AI response with retry logic
-            response = self._get_ai_response(prompt)
+            if cache_namespace and standalone:
+                get_semantic_cache().add(cache_namespace, question, response)
             
             # Log the interaction
             self._log_interaction(question, response, file_info)
@@ -82,11 +165,50 @@ class AIAgent:
             self.logger.error(f"Error in data analysis: {str(e)}")
             raise
     
-    def _prepare_context(self, data: Union[pd.DataFrame, str], file_info: Dict[str, Any] = None) -> str:
-        """Prepare context information for the AI"""
+    def find_similar_question(self, question: str, file_info: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up an earlier answer to a similar question about the same dataset
+        
+        Args:
+            question: The question being typed
+            file_info: Information about the uploaded file (must include its fingerprint)
+            
+        Returns:
+            Match dict from the semantic cache, or None
+        """
+        cache_namespace = self._cache_namespace(file_info, 'analysis')
+        if not cache_namespace or not question.strip():
+            return None
+        return get_semantic_cache().lookup(cache_namespace, question, record_stats=False)
+    
+    def _cache_namespace(self, file_info: Dict[str, Any] = None, task: str = 'analysis') -> Optional[str]:
+        """Answers are cached per dataset fingerprint and model"""
+        if not file_info or not file_info.get('fingerprint'):
+            return None
+        return f"{file_info['fingerprint']}:{self.resolve_route(task)['model']}"
+    
+    @timed('prepare_context')
+    def prepare_context(self, data: Union[pd.DataFrame, str], file_info: Dict[str, Any] = None) -> str:
+        """Prepare context information for the AI (cached per dataset in the shared store)"""
+        fingerprint = (file_info or {}).get('fingerprint')
+        if not fingerprint:
+            return self._build_context(data, file_info)
+        
+        source = f"{file_info.get('name')}|{file_info.get('type')}|{','.join(file_info.get('files', []))}"
+        return get_dataset_store().get_artifact(
+            fingerprint, f"prompt_context:{source}", lambda: self._build_context(data, file_info)
+        )
+    
+    def _build_context(self, data: Union[pd.DataFrame, str], file_info: Dict[str, Any] = None) -> str:
+        """Build the context information for the AI"""
         context = "You are a professional data analyst AI assistant. "
         
-        if file_info:
+        if file_info and file_info.get('files'):
+            files = file_info['files']
+            context += (f"The user has uploaded a collection of {len(files)} {file_info.get('type', '')} files "
+                        f"analyzed together as one dataset: {', '.join(files[:20])}"
+                        f"{', ...' if len(files) > 20 else ''}. ")
+        elif file_info:
             context += f"The user has uploaded a {file_info.get('type', 'file')} file named '{file_info.get('name', 'unknown')}'. "
         
         # Get data summary
@@ -104,41 +226,127 @@ class AIAgent:
         prompt = f"{context}\\n\\nUser Question: {question}\\n\\nPlease provide a detailed analysis:"
         return prompt
     
-    def _get_ai_response(self, prompt: str, max_retries: int = 3) -> str:
+    def _get_ai_response(self, prompt: str = None, max_retries: int = 3, messages: List[Dict[str, str]] = None,
+                         max_tokens: int = None, task: str = 'analysis') -> str:
         """
         Get response from AI with retry logic for rate limits
         
         Args:
-            prompt: The prompt to send to AI
+            prompt: The prompt to send to AI (sent as a single user message)
             max_retries: Maximum number of retries for rate limits
+            messages: Full chat messages to send instead of a single prompt
+            max_tokens: Override for the maximum response tokens
+            task: Task type used to pick the model route
             
         Returns:
             AI response text
         """
-        for attempt in range(max_retries):
+        if messages is None:
+            messages = [{"role": "user", "content": prompt}]
+        route = self.resolve_route(task)
+        if max_tokens:
+            route['max_tokens'] = max_tokens
+        
+        # Identical requests already in flight (from any session) share one API call
+        key = request_key(model=route['model'], fallback_model=route['fallback_model'], messages=messages,
+                          max_tokens=route['max_tokens'], temperature=self.temperature)
+        response, shared = _inflight_requests.do(
+            key, lambda: self._request_completion(messages, max_retries, route)
+        )
+        record_cache_lookup('singleflight', shared)
+        if shared:
+            self.logger.info("Reused the result of an identical in-flight AI request")
+        return response
+    
+    def _request_completion(self, messages: List[Dict[str, str]], max_retries: int, route: Dict[str, Any]) -> str:
+        """
+        Call the chat completions API, switching to the fallback model or backing off on rate limits
+        
+        Switching to the fallback model does not use up one of the max_retries
+        attempts, so even a single-attempt call tries the fallback.
+        """
+        metrics = get_metrics()
+        model = route['model']
+        task = route['task']
+        attempt = 0
+        
+        while True:
+            start = time.perf_counter()
             try:
                 response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=self.max_tokens,
+                    model=model,
+                    messages=messages,
+                    max_tokens=route['max_tokens'],
                     temperature=self.temperature
                 )
                 
+                latency = time.perf_counter() - start
+                metrics.histogram('llm_latency_seconds', "Latency of LLM API calls").observe(
+                    latency, model=model, route=task)
+                metrics.counter('llm_requests_total', "LLM API calls by outcome").inc(
+                    model=model, route=task, status='ok')
+                self._record_usage(response, messages, model)
+                self.logger.info(f"AI response for '{task}' from {model} in {latency:.2f}s (attempt {attempt + 1})")
+                
                 return response.choices[0].message.content
                 
             except Exception as e:
-                error_str = str(e).lower()
+                rate_limited = _is_rate_limit(e)
+                # Prefer switching to the secondary model over waiting
+                can_fall_back = route['fallback_model'] and model != route['fallback_model']
                 
-                if "rate limit" in error_str and attempt < max_retries - 1:
+                if rate_limited and (can_fall_back or attempt < max_retries - 1):
+                    metrics.counter('llm_requests_total', "LLM API calls by outcome").inc(
+                        model=model, route=task, status='rate_limited')
+                    metrics.counter('llm_retries_total', "LLM API retries").inc(model=model, route=task)
+                    
+                    if can_fall_back:
+                        self.logger.warning(f"Rate limit hit on {model}, falling back to {route['fallback_model']}")
+                        model = route['fallback_model']
+                        continue
+                    
                     wait_time = 60 * (attempt + 1)  # Exponential backoff
                     self.logger.warning(f"Rate limit hit, waiting {wait_time} seconds...")
                     time.sleep(wait_time)
+                    attempt += 1
                     continue
                 else:
+                    metrics.counter('llm_requests_total', "LLM API calls by outcome").inc(
+                        model=model, route=task, status='error')
                     self.logger.error(f"AI API error: {str(e)}")
                     raise ValueError(f"Failed to get AI response: {str(e)}")
+    
+    def _record_usage(self, response, messages: List[Dict[str, str]], model: str):
+        """Record prompt and completion token counts (estimated when the API reports no usage)"""
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = (getattr(usage, 'prompt_tokens', None)
+                         or sum(len(m['content']) for m in messages) // 4)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
         
-        raise ValueError("Max retries exceeded for AI API calls")
+        metrics = get_metrics()
+        metrics.histogram('prompt_tokens', "Prompt tokens per LLM call", TOKEN_BUCKETS).observe(
+            prompt_tokens, model=model)
+        if completion_tokens is not None:
+            metrics.histogram('completion_tokens', "Completion tokens per LLM call", TOKEN_BUCKETS).observe(
+                completion_tokens, model=model)
+    
+    def _compress_history(self, conversation: Conversation, evicted: List[Dict[str, str]]):
+        """Fold turns that left the conversation window into its running summary"""
+        if not get_setting('analysis.ai.conversation.llm_summary', True):
+            conversation.set_summary(conversation.extractive_summary(evicted))
+            return
+        
+        transcript = "\n".join(f"Q: {t['question']}\nA: {t['response']}" for t in evicted)
+        prompt = ("Update the running summary of a data analysis conversation. Keep the facts, numbers "
+                  "and conclusions that later questions may refer to. Answer with the summary only, "
+                  f"at most {conversation.max_summary_chars // 6} words.\n\n"
+                  f"Current summary:\n{conversation.summary or '(empty)'}\n\n"
+                  f"New turns:\n{transcript}")
+        try:
+            conversation.set_summary(self._get_ai_response(prompt, max_retries=1, task='history_summary'))
+        except Exception as e:
+            self.logger.warning(f"Falling back to extractive conversation summary: {str(e)}")
+            conversation.set_summary(conversation.extractive_summary(evicted))
     
     def _log_interaction(self, question: str, response: str, file_info: Dict[str, Any] = None):
         """Log the interaction for future reference"""
@@ -183,7 +391,7 @@ class AIAgent:
                            "4. Potential business implications or recommendations, "
                            "5. Data quality assessment.")
         
-        return self.analyze_data(data, summary_question, file_info)
+        return self.analyze_data(data, summary_question, file_info, task='summarize')
     
     def suggest_questions(self, data: Union[pd.DataFrame, str], file_info: Dict[str, Any] = None) -> str:
         """
@@ -200,7 +408,7 @@ class AIAgent:
                            "that would provide valuable insights. Focus on questions that would "
                            "help understand the data better, identify trends, or make business decisions.")
         
-        return self.analyze_data(data, suggestion_prompt, file_info)
+        return self.analyze_data(data, suggestion_prompt, file_info, task='suggest')
     
     def explain_column(self, data: pd.DataFrame, column_name: str, file_info: Dict[str, Any] = None) -> str:
         """
@@ -214,7 +422,7 @@ class AIAgent:
         Returns:
             Detailed column analysis
         """
-        if not isinstance(data, pd.DataFrame):
+        if not isinstance(data, (pd.DataFrame, DatasetCollection, ParquetDataset)):
             raise ValueError("Column analysis is only available for structured data")
         
         if column_name not in data.columns:
@@ -224,4 +432,4 @@ class AIAgent:
                    f"including its data distribution, summary statistics, patterns, "
                    f"potential issues, and insights.")
         
-        return self.analyze_data(data, question, file_info)
+        return self.analyze_data(data, question, file_info, task='explain_column')
@@ -0,0 +1,236 @@
+"""
+Compression Module
+Recognizes compressed uploads by magic bytes and exposes their contents as decompressing streams
+"""
+
+import io
+import bz2
+import gzip
+import lzma
+import zlib
+import struct
+import hashlib
+import zipfile
+from typing import Callable, List, Optional
+
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+]
+
+COMPRESSED_EXTENSIONS = {'gz': 'gzip', 'gzip': 'gzip', 'bz2': 'bz2', 'xz': 'xz', 'zip': 'zip'}
+
+STREAM_OPENERS = {
+    'gzip': lambda fileobj: gzip.GzipFile(fileobj=fileobj, mode='rb'),
+    'bz2': lambda fileobj: bz2.BZ2File(fileobj, mode='rb'),
+    'xz': lambda fileobj: lzma.LZMAFile(fileobj, mode='rb'),
+}
+
+def detect_compression(fileobj) -> Optional[str]:
+    """
+    Detect the compression format of a file from its first bytes
+
+    Args:
+        fileobj: Seekable binary file object (position is restored)
+
+    Returns:
+        'gzip', 'bz2', 'xz', 'zip' or None for uncompressed data
+    """
+    position = fileobj.tell()
+    header = fileobj.read(6)
+    fileobj.seek(position)
+    for magic, compression in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return compression
+    return None
+
+def strip_compression_extension(name: str) -> str:
+    """'sales.csv.gz' -> 'sales.csv'"""
+    base, _, extension = name.rpartition('.')
+    return base if base and extension.lower() in COMPRESSED_EXTENSIONS else name
+
+def data_file_type(name: str) -> str:
+    """File type of the data inside a possibly compressed file name ('sales.csv.gz' -> 'CSV')"""
+    return strip_compression_extension(name).split('.')[-1].upper()
+
+def gzip_uncompressed_size(fileobj) -> Optional[int]:
+    """Uncompressed size from the gzip trailer (modulo 4 GB, last member only)"""
+    try:
+        position = fileobj.tell()
+        fileobj.seek(-4, io.SEEK_END)
+        size = struct.unpack('<I', fileobj.read(4))[0]
+        fileobj.seek(position)
+        return size
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _gzip_sample_ratio(fileobj, sample_bytes: int) -> Optional[float]:
+    """Decompressed bytes per compressed byte over the start of a gzip stream (output is discarded)"""
+    position = fileobj.tell()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    consumed = produced = 0
+    try:
+        fileobj.seek(0)
+        while consumed < sample_bytes and not decompressor.eof:
+            data = fileobj.read(min(64 * 1024, sample_bytes - consumed))
+            if not data:
+                break
+            consumed += len(data)
+            while data:
+                produced += len(decompressor.decompress(data, 1024 * 1024))
+                data = decompressor.unconsumed_tail
+    except (OSError, zlib.error):
+        return None
+    finally:
+        fileobj.seek(position)
+    return produced / consumed if consumed and produced else None
+
+def estimate_gzip_size(fileobj, compressed_size: int, sample_bytes: int = 1024 * 1024) -> Optional[int]:
+    """
+    Estimate the uncompressed size of a gzip file
+
+    The trailer stores the size modulo 4 GB (of the last member only), so it
+    is only a lower bound. When it is smaller than the compressed size or the
+    file is larger than 4 GB, the size is extrapolated from the compression
+    ratio of the first sample_bytes instead.
+
+    Args:
+        fileobj: Seekable gzip file object (position is restored)
+        compressed_size: Size of the compressed file in bytes
+        sample_bytes: Compressed bytes decompressed to measure the ratio
+
+    Returns:
+        Estimated uncompressed size, or None if it cannot be determined
+    """
+    trailer_size = gzip_uncompressed_size(fileobj)
+    if trailer_size is not None and trailer_size >= compressed_size and compressed_size < 1 << 32:
+        return trailer_size
+    ratio = _gzip_sample_ratio(fileobj, sample_bytes)
+    if ratio is None:
+        return trailer_size
+    return max(int(compressed_size * ratio), trailer_size or 0)
+
+class DecompressedFile(io.RawIOBase):
+    """
+    Read-only stream over decompressed data that behaves like an uploaded file
+
+    Data is decompressed on the fly as it is read, so the uncompressed
+    contents never exist as a whole in memory or on disk. Seeking back to the
+    start reopens the stream; other seeks are delegated to the decompressor.
+    """
+
+    def __init__(self, name: str, opener: Callable[[], io.IOBase], size: int = 0,
+                 compression: str = None, source: str = None):
+        """
+        Initialize the DecompressedFile
+
+        Args:
+            name: File name of the decompressed data
+            opener: Returns a new decompressing stream positioned at the start
+            size: Uncompressed size in bytes if known, otherwise the compressed size
+            compression: Compression format of the source
+            source: Name of the compressed file or archive
+        """
+        super().__init__()
+        self.name = name
+        self.size = size
+        self.compression = compression
+        self.source = source
+        self._opener = opener
+        self._stream = opener()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if offset == 0 and whence == io.SEEK_SET:
+            self._stream.close()
+            self._stream = self._opener()
+            return 0
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def getvalue(self) -> bytes:
+        """Whole decompressed contents (used by parsers that need random access)"""
+        self.seek(0)
+        return self.read()
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+def open_compressed(uploaded_file):
+    """
+    Wrap a gzip, bz2 or xz compressed upload in a decompressing stream
+
+    Args:
+        uploaded_file: Uploaded file object
+
+    Returns:
+        DecompressedFile named after the inner file, or the upload itself when
+        it is not a single-stream compressed file
+    """
+    compression = detect_compression(uploaded_file)
+    if compression not in STREAM_OPENERS:
+        return uploaded_file
+
+    def opener():
+        uploaded_file.seek(0)
+        return STREAM_OPENERS[compression](uploaded_file)
+
+    size = getattr(uploaded_file, 'size', 0) or 0
+    if compression == 'gzip':
+        size = estimate_gzip_size(uploaded_file, size) or size
+
+    name = strip_compression_extension(uploaded_file.name)
+    if name == uploaded_file.name:
+        name = f"{name}.txt"  # Compressed file without a telling extension is treated as text
+    return DecompressedFile(name, opener, size=size, compression=compression, source=uploaded_file.name)
+
+def archive_members(uploaded_file) -> List[DecompressedFile]:
+    """
+    List the files of a zip archive as lazily decompressed streams
+
+    Directories and macOS resource forks are skipped. Members are named
+    'archive.zip/member.csv' so they stay distinct across archives.
+
+    Args:
+        uploaded_file: Uploaded zip file object
+
+    Returns:
+        One DecompressedFile per member
+    """
+    uploaded_file.seek(0)
+    archive = zipfile.ZipFile(uploaded_file)
+    members = []
+    for info in archive.infolist():
+        if info.is_dir() or info.filename.startswith('__MACOSX/') or info.filename.split('/')[-1].startswith('.'):
+            continue
+        members.append(DecompressedFile(
+            f"{uploaded_file.name}/{info.filename}",
+            lambda info=info: archive.open(info),
+            size=info.file_size,
+            compression='zip',
+            source=uploaded_file.name
+        ))
+    return members
+
+def member_fingerprint(archive_fingerprint: str, member_name: str) -> str:
+    """Fingerprint of an archive member derived from the archive's content hash"""
+    return hashlib.sha256(f"{archive_fingerprint}:{member_name}".encode('utf-8')).hexdigest()
@@ -0,0 +1,109 @@
+"""
+Conversation Module
+Multi-turn conversation state with a bounded window of recent turns and a running summary
+"""
+
+import re
+from typing import List, Dict
+
+class Conversation:
+    """
+    Conversation history for one dataset
+
+    Messages are laid out so the dataset context is a stable system message
+    (cacheable as a prompt prefix by providers that support it), followed by
+    a running summary of older turns and a bounded window of recent turns.
+    Prompt size therefore stays roughly flat as the conversation grows.
+    """
+
+    def __init__(self, window_turns: int = 4, max_summary_chars: int = 2000, max_turn_chars: int = 2000):
+        """
+        Initialize the Conversation
+
+        Args:
+            window_turns: Number of recent question/answer pairs sent verbatim
+            max_summary_chars: Upper bound for the running summary
+            max_turn_chars: Upper bound for each question or answer kept in the window
+        """
+        self.window_turns = window_turns
+        self.max_summary_chars = max_summary_chars
+        self.max_turn_chars = max_turn_chars
+        self.turns: List[Dict[str, str]] = []
+        self.summary = ""
+        self.total_turns = 0
+
+    def build_messages(self, system_context: str, question: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for the next question
+
+        Args:
+            system_context: Dataset context (identical for every turn on the same data)
+            question: The new user question
+
+        Returns:
+            List of chat messages
+        """
+        messages = [{"role": "system", "content": system_context}]
+
+        if self.summary:
+            messages.append({"role": "system",
+                             "content": f"Summary of the earlier conversation:\n{self.summary}"})
+
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn['question']})
+            messages.append({"role": "assistant", "content": turn['response']})
+
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def add_turn(self, question: str, response: str) -> List[Dict[str, str]]:
+        """
+        Record a completed turn
+
+        Args:
+            question: User question
+            response: Assistant answer
+
+        Returns:
+            Turns that fell out of the window and should be folded into the summary
+        """
+        self.turns.append({
+            'question': self._truncate(question, self.max_turn_chars),
+            'response': self._truncate(response, self.max_turn_chars)
+        })
+        self.total_turns += 1
+
+        evicted = []
+        while len(self.turns) > self.window_turns:
+            evicted.append(self.turns.pop(0))
+        return evicted
+
+    def set_summary(self, summary: str):
+        """Replace the running summary (bounded to max_summary_chars)"""
+        self.summary = self._truncate(summary.strip(), self.max_summary_chars)
+
+    def extractive_summary(self, turns: List[Dict[str, str]]) -> str:
+        """
+        Fold turns into the summary without an LLM call
+
+        Keeps each question with the first sentence of its answer and drops
+        the oldest lines once the summary is over its size limit.
+        """
+        lines = [line for line in self.summary.splitlines() if line.strip()]
+        for turn in turns:
+            first_sentence = re.split(r'(?<=[.!?])\s', turn['response'].strip(), maxsplit=1)[0]
+            lines.append(f"- Q: {turn['question']} A: {self._truncate(first_sentence, 300)}")
+
+        while lines and len("\n".join(lines)) > self.max_summary_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def clear(self):
+        """Forget all turns and the summary"""
+        self.turns = []
+        self.summary = ""
+        self.total_turns = 0
+
+    @staticmethod
+    def _truncate(text: str, max_chars: int) -> str:
+        return text if len(text) <= max_chars else text[:max_chars - 3] + "..."
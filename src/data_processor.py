@@ -7,14 +7,32 @@ import pandas as pd
 import pdfplumber
 from PIL import Image
 import pytesseract
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 import os
+import time
 import logging
+import contextvars
 from io import StringIO
-from typing import Union, Dict, Any
+from pandas.api.types import union_categoricals
+from typing import Union, Dict, Any, List, Tuple, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import tempfile
 
+from compression import open_compressed, archive_members, detect_compression
+from dataset_collection import DatasetCollection, group_compatible_frames
+from dataset_store import compute_fingerprint, fingerprint_data
+from out_of_core import ParquetDataset, parquet_path, out_of_core_available
+from pdf_tables import extract_pdf
+from text_document import TextDocument, document_path
+from preflight import sniff_upload, summarize_report, CHUNKED, OUT_OF_CORE
+from plot_cache import get_plot_cache
+from metrics import get_metrics, timed, size_class, SIZE_BUCKETS
+from profiling import profiled
+from settings import get_setting
+from sketches import CategoricalSketch, sketch_column
+from timeseries import detect_time_series, describe_time_series, downsample_series
+
 class DataProcessor:
     """Class for processing different types of data files"""
     
@@ -30,50 +48,226 @@ class DataProcessor:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
             self.logger.info(f"Tesseract path set to: {tesseract_path}")
     
-    def process_file(self, uploaded_file) -> Union[pd.DataFrame, str, None]:
+    def preflight(self, uploaded_file, max_file_size_mb: float = None) -> Dict[str, Any]:
+        """
+        Check an upload before parsing it
+        
+        Only the file size and the first few KB are read. Files above the size
+        limit are rejected; delimited text gets an estimate of its rows and
+        in-memory size and an ingestion strategy (eager, chunked or out of core).
+        
+        Args:
+            uploaded_file: Streamlit uploaded file object
+            max_file_size_mb: Size limit (defaults to file_processing.max_file_size_mb)
+            
+        Returns:
+            Preflight report (see preflight.sniff_upload)
+        """
+        if max_file_size_mb is None:
+            max_file_size_mb = get_setting('file_processing.max_file_size_mb', 50)
+        report = sniff_upload(
+            uploaded_file,
+            sample_bytes=get_setting('file_processing.preflight.sample_kb', 64) * 1024,
+            max_file_size_mb=max_file_size_mb,
+            eager_limit_mb=get_setting('file_processing.preflight.eager_limit_mb', 64),
+            out_of_core_limit_mb=get_setting('performance.out_of_core.threshold_mb', 256),
+            out_of_core_available=out_of_core_available()
+        )
+        self.logger.info(f"Preflight {uploaded_file.name}: {summarize_report(report)}")
+        return report
+    
+    @profiled('process_file', fingerprint_fn=lambda self, uploaded_file, max_file_size_mb=None, fingerprint=None:
+              fingerprint or compute_fingerprint(uploaded_file))
+    def process_file(self, uploaded_file, max_file_size_mb: float = None,
+                     fingerprint: str = None) -> Union[pd.DataFrame, str, None]:
         """
         Process uploaded file based on its type
         
+        A preflight check rejects oversized or unreadable files before parsing
+        and picks how delimited text is read. gzip, bz2 and xz files are
+        recognized by their magic bytes and parsed from a decompressing stream
+        according to the inner file name.
+        
         Args:
             uploaded_file: Streamlit uploaded file object
+            max_file_size_mb: Size limit (defaults to file_processing.max_file_size_mb)
+            fingerprint: Content hash of the upload, if already known; names the
+                on-disk copy of out-of-core files (computed when omitted)
             
         Returns:
-            Processed data (DataFrame for structured data, str for text)
+            Processed data (DataFrame for structured data, str for text, a dict of
+            DataFrames by table name for PDFs with several tables)
         """
         if uploaded_file is None:
             return None
         
+        report = self.preflight(uploaded_file, max_file_size_mb)
+        if report['error']:
+            raise ValueError(report['error'])
+        
+        uploaded_file = open_compressed(uploaded_file)
         file_extension = uploaded_file.name.split('.')[-1].lower()
+        file_size = getattr(uploaded_file, 'size', 0) or 0
         self.logger.info(f"Processing file: {uploaded_file.name} (type: {file_extension})")
         
+        metrics = get_metrics()
+        metrics.histogram('file_size_bytes', "Size of processed files", SIZE_BUCKETS).observe(
+            file_size, file_type=file_extension)
+        
         try:
-            if file_extension == 'csv':
-                return self._process_csv(uploaded_file)
-            elif file_extension in ['xlsx', 'xls']:
-                return self._process_excel(uploaded_file)
-            elif file_extension == 'txt':
-                return self._process_text(uploaded_file)
-            elif file_extension == 'pdf':
-                return self._process_pdf(uploaded_file)
-            elif file_extension in ['png', 'jpg', 'jpeg', 'bmp', 'tiff', 'gif']:
-                return self._process_image(uploaded_file)
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
+            start = time.perf_counter()
+            with metrics.timer('parse', file_type=file_extension, size_class=size_class(file_size)):
+                if file_extension == 'csv' and report['strategy'] == OUT_OF_CORE:
+                    data = self._process_csv_out_of_core(uploaded_file, report, fingerprint)
+                elif file_extension in ['csv', 'jsonl', 'ndjson'] and report['strategy'] == CHUNKED:
+                    data = self._process_chunked(uploaded_file, report)
+                elif file_extension == 'csv':
+                    data = self._process_csv(uploaded_file, report)
+                elif file_extension in ['json', 'jsonl', 'ndjson']:
+                    data = self._process_json(uploaded_file, lines=file_extension != 'json')
+                elif file_extension in ['xlsx', 'xls']:
+                    data = self._process_excel(uploaded_file)
+                elif file_extension == 'txt':
+                    data = self._process_text(uploaded_file, fingerprint)
+                elif file_extension == 'pdf':
+                    data = self._process_pdf(uploaded_file)
+                elif file_extension in ['png', 'jpg', 'jpeg', 'bmp', 'tiff', 'gif']:
+                    data = self._process_image(uploaded_file)
+                elif file_extension == 'zip':
+                    raise ValueError("Zip archives are unpacked with process_files")
+                else:
+                    raise ValueError(f"Unsupported file type: {file_extension}")
+            
+            self.logger.info(f"Processed {uploaded_file.name} in {time.perf_counter() - start:.2f}s")
+            return data
                 
         except Exception as e:
             self.logger.error(f"Error processing file {uploaded_file.name}: {str(e)}")
             raise
     
-    def _process_csv(self, uploaded_file) -> pd.DataFrame:
+    def process_files(self, uploaded_files: List, max_workers: int = None,
+                      progress_callback: Callable[[str, str, Optional[str]], None] = None,
+                      max_file_size_mb: float = None,
+                      fingerprints: Dict[str, str] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Process several uploaded files in parallel on a worker pool
+        
+        Args:
+            uploaded_files: List of Streamlit uploaded file objects
+            max_workers: Number of worker threads (defaults to file_processing.max_workers)
+            progress_callback: Called from the calling thread as callback(file_name, status, error)
+                with status 'processing', 'done' or 'failed'
+            max_file_size_mb: Size limit per file (defaults to file_processing.max_file_size_mb)
+            fingerprints: Content hashes already computed for the files, by file name
+            
+        Returns:
+            Tuple of (processed data by file name in upload order, error messages by file name);
+            PDFs with tables contribute one entry per table, named 'report.pdf/table_1_p2', and
+            one for their text, 'report.pdf/text'
+        """
+        results, errors = {}, {}
+        if not uploaded_files:
+            return results, errors
+        
+        uploaded_files = self.expand_archives(uploaded_files)
+        max_workers = max_workers or get_setting('file_processing.max_workers', 4)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(uploaded_files))) as executor:
+            # Each file runs in a copy of the caller's context (per-session settings such as profiling)
+            futures = {executor.submit(contextvars.copy_context().run, self.process_file, f, max_file_size_mb,
+                                       (fingerprints or {}).get(f.name)): f.name
+                       for f in uploaded_files}
+            
+            if progress_callback:
+                for name in futures.values():
+                    progress_callback(name, 'processing', None)
+            
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    data = future.result()
+                    if isinstance(data, dict):
+                        # The tables and text of one PDF become datasets of their own
+                        for table_name, frame in data.items():
+                            results[f"{name}/{table_name}"] = frame
+                    else:
+                        results[name] = data
+                    if progress_callback:
+                        progress_callback(name, 'done', None)
+                except Exception as e:
+                    errors[name] = str(e)
+                    if progress_callback:
+                        progress_callback(name, 'failed', str(e))
+        
+        ordered = {}
+        for f in uploaded_files:
+            for name, data in results.items():
+                if name == f.name or name.startswith(f"{f.name}/"):
+                    ordered[name] = data
+        return ordered, errors
+    
+    def expand_archives(self, uploaded_files: List) -> List:
+        """
+        Replace zip archives by their member files
+        
+        Members are decompressed lazily when they are parsed, so process_files
+        ingests them in parallel like separately uploaded files.
+        
+        Args:
+            uploaded_files: List of uploaded file objects
+            
+        Returns:
+            List of uploaded files and archive members
+        """
+        expanded = []
+        for uploaded_file in uploaded_files:
+            if getattr(uploaded_file, 'compression', None) != 'zip' and detect_compression(uploaded_file) == 'zip':
+                members = archive_members(uploaded_file)
+                self.logger.info(f"Archive {uploaded_file.name} contains {len(members)} files")
+                expanded.extend(members)
+            else:
+                expanded.append(uploaded_file)
+        return expanded
+    
+    def combine_datasets(self, results: Dict[str, Any]) -> List[Tuple[List[str], Any]]:
+        """
+        Combine processed files into logical datasets
+        
+        Tabular files with the same columns (by name and kind) become one DatasetCollection;
+        everything else stays a dataset of its own.
+        
+        Args:
+            results: Processed data by file name
+            
+        Returns:
+            List of (source file names, data) tuples
+        """
+        tabular = {name: data for name, data in results.items() if isinstance(data, pd.DataFrame)}
+        datasets = []
+        
+        for group in group_compatible_frames(tabular):
+            if len(group) > 1:
+                datasets.append((list(group), DatasetCollection(group)))
+            else:
+                name, frame = next(iter(group.items()))
+                datasets.append(([name], frame))
+        
+        for name, data in results.items():
+            if name not in tabular and data is not None:
+                datasets.append(([name], data))
+        
+        return datasets
+    
+    def _process_csv(self, uploaded_file, report: Dict[str, Any] = None) -> pd.DataFrame:
         """Process CSV files"""
+        report = report or {}
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'latin-1', 'cp1252']
+            # Try the sniffed encoding first, then the common ones
+            encodings = self._candidate_encodings(report)
             
             for encoding in encodings:
                 try:
                     uploaded_file.seek(0)  # Reset file pointer
-                    df = pd.read_csv(uploaded_file, encoding=encoding)
+                    df = pd.read_csv(uploaded_file, encoding=encoding, **self._csv_options(report))
                     self.logger.info(f"CSV loaded successfully with encoding: {encoding}")
                     return df
                 except UnicodeDecodeError:
@@ -84,6 +278,99 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error reading CSV: {str(e)}")
     
+    def _candidate_encodings(self, report: Dict[str, Any]) -> List[str]:
+        encodings = ['utf-8', 'latin-1', 'cp1252']
+        if report.get('encoding'):
+            encodings = [report['encoding']] + [e for e in encodings if e != report['encoding']]
+        return encodings
+    
+    def _csv_options(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """read_csv options taken from the preflight report"""
+        options = {}
+        if report.get('delimiter'):
+            options['sep'] = report['delimiter']
+        if report.get('has_header') is False:
+            options['header'] = None
+        return options
+    
+    def _process_chunked(self, uploaded_file, report: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Read delimited text in chunks, shrinking each chunk before the next is read
+        
+        Integer columns are downcast and repetitive text columns become
+        categoricals, so peak memory stays close to the compact result
+        instead of the full object-dtype frame.
+        """
+        chunk_rows = get_setting('file_processing.preflight.chunk_rows', 100000)
+        encoding = report.get('encoding', 'utf-8')
+        uploaded_file.seek(0)
+        if report['file_type'] == 'CSV':
+            reader = pd.read_csv(uploaded_file, encoding=encoding, chunksize=chunk_rows, **self._csv_options(report))
+        else:
+            reader = pd.read_json(uploaded_file, lines=True, encoding=encoding, chunksize=chunk_rows)
+        
+        try:
+            chunks = [self._compact_frame(chunk) for chunk in reader]
+        except UnicodeDecodeError:
+            raise ValueError(f"Unable to decode file with the detected encoding {encoding}")
+        if not chunks:
+            raise ValueError("File contains no rows")
+        
+        # Categoricals of different chunks must share categories to stay categorical after concat
+        for col in chunks[0].columns:
+            if all(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks):
+                categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+        
+        df = pd.concat(chunks, ignore_index=True)
+        self.logger.info(f"Loaded {len(df)} rows in {len(chunks)} chunks "
+                         f"({df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB)")
+        return df
+    
+    def _compact_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Downcast integer columns and turn low-cardinality text columns into categoricals"""
+        for col in frame.columns:
+            series = frame[col]
+            if pd.api.types.is_integer_dtype(series):
+                frame[col] = pd.to_numeric(series, downcast='integer')
+            elif series.dtype == object and len(series) and series.nunique() <= len(series) / 2:
+                frame[col] = series.astype('category')
+        return frame
+    
+    def _process_csv_out_of_core(self, uploaded_file, report: Dict[str, Any] = None,
+                                 fingerprint: str = None) -> ParquetDataset:
+        """Convert a large CSV file to Parquet partitions instead of loading it into memory"""
+        base_dir = get_setting('performance.out_of_core.dir', os.path.join('data', 'cache', 'parquet'))
+        path = parquet_path(fingerprint or compute_fingerprint(uploaded_file), base_dir)
+        os.makedirs(base_dir, exist_ok=True)
+        chunk_rows = get_setting('performance.out_of_core.chunk_rows', 250000)
+        
+        for encoding in self._candidate_encodings(report or {}):
+            try:
+                data = ParquetDataset.from_csv(uploaded_file, path, uploaded_file.name,
+                                               chunk_rows=chunk_rows, encoding=encoding,
+                                               read_options=self._csv_options(report or {}))
+                self.logger.info(f"Large CSV stored out of core with encoding {encoding}: "
+                                 f"{len(data)} rows in {len(data.parts)} partitions")
+                return data
+            except UnicodeDecodeError:
+                continue
+            except Exception as e:
+                raise ValueError(f"Error converting CSV to Parquet: {str(e)}")
+        
+        raise ValueError("Unable to decode CSV file with common encodings")
+    
+    def _process_json(self, uploaded_file, lines: bool = False) -> pd.DataFrame:
+        """Process JSON files (an array of records, or one record per line when lines is True)"""
+        try:
+            uploaded_file.seek(0)
+            df = pd.read_json(uploaded_file, lines=lines)
+            self.logger.info("JSON file loaded successfully")
+            return df
+        except Exception as e:
+            raise ValueError(f"Error reading JSON: {str(e)}")
+    
     def _process_excel(self, uploaded_file) -> pd.DataFrame:
         """Process Excel files"""
         try:
@@ -93,16 +380,27 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error reading Excel file: {str(e)}")
     
-    def _process_text(self, uploaded_file) -> str:
-        """Process text files"""
+    def _process_text(self, uploaded_file, fingerprint: str = None) -> Union[str, TextDocument]:
+        """
+        Process text files
+        
+        Files above file_processing.text.mmap_threshold_mb are stored on disk
+        as a line-indexed TextDocument instead of being decoded into one string.
+        """
+        size = getattr(uploaded_file, 'size', 0) or 0
+        if size > get_setting('file_processing.text.mmap_threshold_mb', 16) * 1024 * 1024:
+            return self._process_text_document(uploaded_file, fingerprint)
+        
         try:
+            uploaded_file.seek(0)
+            raw = uploaded_file.read()
+            
             # Try different encodings
             encodings = ['utf-8', 'latin-1', 'cp1252']
             
             for encoding in encodings:
                 try:
-                    uploaded_file.seek(0)
-                    content = uploaded_file.read().decode(encoding)
+                    content = raw.decode(encoding)
                     self.logger.info(f"Text file loaded with encoding: {encoding}")
                     return content
                 except UnicodeDecodeError:
@@ -113,9 +411,54 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error reading text file: {str(e)}")
     
-    def _process_pdf(self, uploaded_file) -> str:
-        """Process PDF files"""
+    def _process_text_document(self, uploaded_file, fingerprint: str = None) -> TextDocument:
+        """Copy a large text file to disk and index its lines for random access"""
+        base_dir = get_setting('file_processing.text.dir', os.path.join('data', 'cache', 'text'))
+        os.makedirs(base_dir, exist_ok=True)
+        try:
+            document = TextDocument.from_upload(
+                uploaded_file,
+                document_path(fingerprint or compute_fingerprint(uploaded_file), base_dir),
+                uploaded_file.name,
+                chunk_bytes=get_setting('file_processing.text.chunk_kb', 1024) * 1024,
+                sample_bytes=get_setting('file_processing.preflight.sample_kb', 64) * 1024
+            )
+            self.logger.info(f"Large text file indexed: {document.line_count} lines ({document.encoding})")
+            return document
+        except Exception as e:
+            raise ValueError(f"Error reading text file: {str(e)}")
+    
+    def _process_pdf(self, uploaded_file) -> Union[pd.DataFrame, Dict[str, pd.DataFrame], str]:
+        """
+        Process PDF files
+        
+        With file_processing.pdf.tables set to 'auto', tables are detected
+        page by page in worker processes and returned as DataFrames keyed by
+        page range, with the text of the pages kept as a 'text' entry (a lone
+        table in a PDF without other text is returned as a DataFrame); PDFs
+        without tables, or with the setting 'never', are flattened to text.
+        """
+        if get_setting('file_processing.pdf.tables', 'auto') != 'never':
+            extracted = self._process_pdf_tables(uploaded_file)
+            tables = extracted['tables'] if extracted else []
+            if tables:
+                named = {}
+                for i, table in enumerate(tables, 1):
+                    pages = str(table['first_page'])
+                    if table['last_page'] != table['first_page']:
+                        pages += f"-{table['last_page']}"
+                    named[f"table_{i}_p{pages}"] = table['frame']
+                if extracted['text'].strip():
+                    named['text'] = extracted['text']
+                elif len(named) == 1:
+                    return tables[0]['frame']
+                return named
+            if extracted and extracted['text'].strip():
+                self.logger.info(f"PDF processed successfully, extracted {len(extracted['text'])} characters")
+                return extracted['text']
+        
         try:
+            uploaded_file.seek(0)
             with pdfplumber.open(uploaded_file) as pdf:
                 text = ''
                 for page in pdf.pages:
@@ -132,6 +475,26 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error reading PDF: {str(e)}")
     
+    def _process_pdf_tables(self, uploaded_file) -> Optional[Dict[str, Any]]:
+        """Extract the tables and text of a PDF (worker processes read it from a temporary file)"""
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                tmp_path = tmp_file.name
+                uploaded_file.seek(0)
+                while True:
+                    chunk = uploaded_file.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    tmp_file.write(chunk)
+            return extract_pdf(tmp_path)
+        except Exception as e:
+            self.logger.warning(f"Table extraction failed for {uploaded_file.name}, falling back to text: {str(e)}")
+            return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
     def _process_image(self, uploaded_file) -> str:
         """Process image files using OCR"""
         try:
@@ -160,16 +523,38 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error processing image: {str(e)}")
     
-    def generate_eda_report(self, data: pd.DataFrame) -> Dict[str, Any]:
+    @profiled('generate_eda_report', fingerprint_fn=lambda self, data, *a, **kw: fingerprint_data(data))
+    @timed('eda')
+    def generate_eda_report(self, data: pd.DataFrame,
+                            progress_callback: Callable[[float, str], None] = None,
+                            fingerprint: str = None) -> Dict[str, Any]:
         """
         Generate Exploratory Data Analysis report for DataFrame
         
+        Plots are drawn on standalone Figure objects rather than the pyplot
+        state machine so reports can be generated from background threads.
+        Rendered plots are cached by dataset fingerprint, so repeated reports
+        on the same data reuse the images instead of drawing them again.
+        
         Args:
             data: pandas DataFrame
+            progress_callback: Optional callback(fraction, message) called after each plot
+            fingerprint: Dataset fingerprint (computed from the data when omitted)
             
         Returns:
             Dictionary containing EDA results
         """
+        if fingerprint is None and isinstance(data, (pd.DataFrame, DatasetCollection, ParquetDataset)):
+            fingerprint = fingerprint_data(data)
+        
+        if isinstance(data, DatasetCollection):
+            data = data.to_frame()
+        
+        source = data
+        if isinstance(data, ParquetDataset):
+            # Aggregates are pushed down to the Parquet scan; plots are drawn from an evenly spaced sample
+            data = source.sample(get_setting('performance.out_of_core.plot_sample_rows', 100000))
+        
         if not isinstance(data, pd.DataFrame):
             raise ValueError("EDA can only be generated for tabular data (CSV/Excel)")
         
@@ -180,41 +565,60 @@ class DataProcessor:
         
         try:
             # Basic info
-            report['summary']['shape'] = data.shape
-            report['summary']['columns'] = list(data.columns)
-            report['summary']['dtypes'] = data.dtypes.to_dict()
-            report['summary']['missing_values'] = data.isnull().sum().to_dict()
+            report['summary']['shape'] = source.shape
+            report['summary']['columns'] = list(source.columns)
+            report['summary']['dtypes'] = source.dtypes.to_dict()
+            if isinstance(source, ParquetDataset):
+                report['summary']['missing_values'] = source.missing_counts()
+            else:
+                report['summary']['missing_values'] = data.isnull().sum().to_dict()
             
             # Statistical summary for numeric columns
             numeric_columns = data.select_dtypes(include=['number']).columns
             if len(numeric_columns) > 0:
-                report['summary']['statistics'] = data[numeric_columns].describe().to_dict()
+                if isinstance(source, ParquetDataset):
+                    report['summary']['statistics'] = source.describe_numeric().to_dict()
+                    report['summary']['plot_sample_rows'] = len(data)
+                else:
+                    report['summary']['statistics'] = data[numeric_columns].describe().to_dict()
                 
                 # Generate plots
-                plots_dir = os.path.join('data', 'outputs')
-                os.makedirs(plots_dir, exist_ok=True)
+                total_plots = len(numeric_columns) + (1 if len(numeric_columns) > 1 else 0)
                 
                 # Distribution plots for numeric columns
-                for col in numeric_columns:
+                for i, col in enumerate(numeric_columns):
                     if data[col].nunique() > 1:  # Skip constant columns
-                        plt.figure(figsize=(8, 6))
-                        sns.histplot(data[col], kde=True)
-                        plt.title(f'Distribution of {col}')
-                        plot_path = os.path.join(plots_dir, f'{col}_distribution.png')
-                        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-                        plt.close()
-                        report['plots'][f'{col}_distribution'] = plot_path
+                        def draw(ax, col=col):
+                            sns.histplot(data[col], kde=True, ax=ax)
+                            ax.set_title(f'Distribution of {col}')
+                        report['plots'][f'{col}_distribution'] = self._cached_plot(
+                            fingerprint, {'kind': 'distribution', 'column': str(col)}, draw, figsize=(8, 6), dpi=300)
+                    if progress_callback:
+                        progress_callback((i + 1) / total_plots, f"Plotted distribution of {col}")
                 
                 # Correlation heatmap
                 if len(numeric_columns) > 1:
-                    plt.figure(figsize=(10, 8))
-                    correlation_matrix = data[numeric_columns].corr()
-                    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-                    plt.title('Correlation Heatmap')
-                    plot_path = os.path.join(plots_dir, 'correlation_heatmap.png')
-                    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-                    plt.close()
-                    report['plots']['correlation_heatmap'] = plot_path
+                    def draw(ax):
+                        correlation_matrix = data[numeric_columns].corr()
+                        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax)
+                        ax.set_title('Correlation Heatmap')
+                    spec = {'kind': 'correlation_heatmap', 'columns': [str(c) for c in numeric_columns]}
+                    report['plots']['correlation_heatmap'] = self._cached_plot(
+                        fingerprint, spec, draw, figsize=(10, 8), dpi=300)
+                    if progress_callback:
+                        progress_callback(1.0, "Plotted correlation heatmap")
+            
+            # Top values, distinct counts and string lengths of categorical columns
+            categorical = self.profile_categorical(source)
+            if categorical:
+                report['summary']['categorical'] = categorical
+                self._plot_categorical(fingerprint, categorical, report)
+            
+            # Line plots over time, downsampled with LTTB
+            time_series = detect_time_series(data)
+            if time_series:
+                report['summary']['time_series'] = time_series
+                self._plot_time_series(fingerprint, data, time_series, report)
             
             self.logger.info("EDA report generated successfully")
             return report
@@ -223,19 +627,187 @@ class DataProcessor:
             self.logger.error(f"Error generating EDA report: {str(e)}")
             raise
     
-    def get_data_summary(self, data: Union[pd.DataFrame, str]) -> str:
+    def _cached_plot(self, fingerprint: str, spec: Dict[str, Any], draw: Callable,
+                     figsize: Tuple[float, float], dpi: int) -> str:
+        """
+        Get a plot from the plot cache, drawing it on a miss
+        
+        Args:
+            fingerprint: Dataset fingerprint
+            spec: Plot kind, columns and options (everything that changes the image)
+            draw: Callable drawing onto the given Axes
+            figsize: Figure size in inches
+            dpi: Output resolution
+            
+        Returns:
+            Path of the plot image
+        """
+        def render(path):
+            fig = Figure(figsize=figsize)
+            draw(fig.subplots())
+            fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        
+        render_params = {'figsize': list(figsize), 'dpi': dpi, 'seaborn': sns.__version__}
+        return get_plot_cache().get_or_render(fingerprint, spec, render_params, render)
+    
+    def _plot_time_series(self, fingerprint: str, data: pd.DataFrame, time_series: Dict[str, Any],
+                          report: Dict[str, Any]):
+        """Add a line plot per value column of a detected time series to the report"""
+        max_points = get_setting('analysis.eda.timeseries.max_plot_points', 1000)
+        max_columns = get_setting('analysis.eda.max_numeric_columns_plot', 5)
+        time_column = time_series['time_column']
+        
+        for col in time_series['value_columns'][:max_columns]:
+            def draw(ax, col=col):
+                series = downsample_series(data, time_column, col, max_points)
+                ax.plot(series.index, series.to_numpy(), linewidth=1)
+                ax.set_title(f'{col} over {time_column}')
+                ax.set_xlabel(time_column)
+                ax.set_ylabel(col)
+                ax.figure.autofmt_xdate()
+            spec = {'kind': 'timeseries', 'time_column': time_column, 'column': col, 'max_points': max_points}
+            report['plots'][f'{col}_timeseries'] = self._cached_plot(fingerprint, spec, draw, figsize=(10, 4), dpi=150)
+    
+    def _plot_categorical(self, fingerprint: str, categorical: Dict[str, Dict[str, Any]], report: Dict[str, Any]):
+        """Add a bar chart of the most frequent values per categorical column to the report"""
+        for col, column_profile in categorical.items():
+            top_values = column_profile['top_values']
+            if len(top_values) < 2:
+                continue
+            labels = [item['value'] if len(item['value']) <= 30 else item['value'][:27] + '...'
+                      for item in reversed(top_values)]
+            counts = [item['count'] for item in reversed(top_values)]
+            title = f'Top values of {col} (~{column_profile["approx_distinct"]} distinct)'
+            def draw(ax, labels=labels, counts=counts, title=title):
+                ax.barh(labels, counts)
+                ax.set_title(title)
+                ax.set_xlabel('Count')
+            spec = {'kind': 'top_values', 'column': col, 'top_k': len(top_values)}
+            report['plots'][f'{col}_top_values'] = self._cached_plot(
+                fingerprint, spec, draw, figsize=(8, max(3, 0.4 * len(labels))), dpi=150)
+    
+    @timed('categorical_profile')
+    def profile_categorical(self, data: Union[pd.DataFrame, DatasetCollection, ParquetDataset],
+                            top_k: int = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Profile the categorical (text, category and boolean) columns of a tabular dataset
+        
+        Columns are streamed in chunks through bounded-size sketches (Space-Saving
+        top-k and HyperLogLog), so memory does not grow with the number of
+        distinct values. Collections are sketched per file and merged;
+        Parquet datasets are streamed batch by batch, reading only those columns.
+        
+        Args:
+            data: pandas DataFrame, DatasetCollection or ParquetDataset
+            top_k: Number of most frequent values to report (analysis.eda.max_categories_to_show)
+            
+        Returns:
+            Dictionary mapping column name to its top values, approximate distinct
+            count, missing counts and string length statistics
+        """
+        top_k = top_k or get_setting('analysis.eda.max_categories_to_show', 10)
+        chunk_size = get_setting('analysis.eda.categorical.chunk_size', 100000)
+        capacity = max(top_k * 10, get_setting('analysis.eda.categorical.sketch_capacity', 100))
+        
+        if isinstance(data, ParquetDataset):
+            columns = [str(c) for c in data.dtypes.index
+                       if str(data.dtypes[c]) in ('object', 'string', 'bool', 'boolean', 'category')]
+            sketches = {col: CategoricalSketch(capacity) for col in columns}
+            for frame in data.iter_batches(columns=columns, batch_size=chunk_size):
+                for col in columns:
+                    sketches[col].update(frame[col])
+            self.logger.info(f"Profiled {len(sketches)} categorical columns out of core")
+            return {col: sketch.result(top_k) for col, sketch in sketches.items()}
+        
+        frames = list(data.frames.values()) if isinstance(data, DatasetCollection) else [data]
+        if not all(isinstance(frame, pd.DataFrame) for frame in frames):
+            raise ValueError("Categorical profiles are only available for tabular data")
+        
+        columns = frames[0].select_dtypes(include=['object', 'category', 'bool', 'string']).columns
+        profile = {}
+        for col in columns:
+            sketch = None
+            for frame in frames:
+                part = sketch_column(frame[col], chunk_size, capacity)
+                if sketch is None:
+                    sketch = part
+                else:
+                    sketch.merge(part)
+            profile[str(col)] = sketch.result(top_k)
+        
+        self.logger.info(f"Profiled {len(profile)} categorical columns")
+        return profile
+    
+    def _describe_categorical(self, data: Union[pd.DataFrame, DatasetCollection], max_values: int = 5) -> str:
+        """Describe categorical columns for the AI context"""
+        categorical = self.profile_categorical(data)
+        if not categorical:
+            return ""
+        
+        summary = "Categorical columns (approximate distinct count, most frequent values):\n"
+        for col, column_profile in categorical.items():
+            top_values = ", ".join(f"{item['value']} ({item['count']})"
+                                   for item in column_profile['top_values'][:max_values])
+            summary += f"- {col}: ~{column_profile['approx_distinct']} distinct, "
+            summary += f"mean length {column_profile['string_length']['mean']}; top: {top_values}\n"
+        return summary
+    
+    @timed('column_profile')
+    def profile_columns(self, data: Union[pd.DataFrame, DatasetCollection, ParquetDataset]
+                        ) -> Dict[str, Dict[str, Any]]:
+        """
+        Profile every column of a tabular dataset
+        
+        Args:
+            data: pandas DataFrame, DatasetCollection or ParquetDataset
+            
+        Returns:
+            Dictionary mapping column name to its dtype, missing counts and
+            (for numeric columns) summary statistics
+        """
+        if isinstance(data, (DatasetCollection, ParquetDataset)):
+            # Merged from per-file or per-batch aggregates without materializing all rows
+            missing_counts = data.missing_counts()
+            numeric_stats = data.describe_numeric().to_dict()
+        elif isinstance(data, pd.DataFrame):
+            missing_counts = data.isnull().sum().to_dict()
+            numeric_stats = data.select_dtypes(include=['number']).describe().to_dict()
+        else:
+            raise ValueError("Column profiles are only available for tabular data")
+        
+        profile = {}
+        row_count = len(data)
+        dtypes = data.dtypes
+        
+        for col in data.columns:
+            missing = int(missing_counts[col])
+            column_profile = {
+                'dtype': str(dtypes[col]),
+                'non_null': row_count - missing,
+                'missing': missing,
+                'missing_pct': round(missing / row_count * 100, 2) if row_count else 0.0
+            }
+            if col in numeric_stats:
+                column_profile['statistics'] = {k: float(v) for k, v in numeric_stats[col].items()}
+            profile[str(col)] = column_profile
+        
+        self.logger.info(f"Profiled {len(profile)} columns")
+        return profile
+    
+    @timed('data_summary')
+    def get_data_summary(self, data: Union[pd.DataFrame, str, TextDocument]) -> str:
         """
         Get a brief summary of the data for AI agent context
         
         Args:
-            data: Processed data (DataFrame or string)
+            data: Processed data (DataFrame, string or indexed text document)
             
         Returns:
             String summary of the data
         """
         if isinstance(data, pd.DataFrame):
             summary = f"Dataset with {data.shape[0]} rows and {data.shape[1]} columns.\\n"
-            summary += f"Columns: {', '.join(data.columns.tolist())}\\n"
+            summary += f"Columns: {', '.join(map(str, data.columns))}\\n"
             
             # Sample of the data
             if len(data) > 5:
@@ -248,6 +820,68 @@ class DataProcessor:
             if len(numeric_cols) > 0:
                 summary += f"\\nBasic statistics for numeric columns:\\n"
                 summary += data[numeric_cols].describe().to_string()
+            
+            # Resampled aggregates cover the whole time range, not just the first rows
+            time_series = detect_time_series(data)
+            if time_series:
+                summary += "\n\n" + describe_time_series(
+                    data, time_series, max_periods=get_setting('analysis.eda.timeseries.max_prompt_periods', 30))
+            
+            categorical = self._describe_categorical(data)
+            if categorical:
+                summary += "\n\n" + categorical
+        
+        elif isinstance(data, DatasetCollection):
+            summary = (f"Combined dataset from {len(data.names)} files with {data.shape[0]} total rows "
+                       f"and {data.shape[1]} columns.\n")
+            summary += f"Columns: {', '.join(str(c) for c in data.columns)}\n"
+            
+            summary += "\nRows per file:\n"
+            rows_per_file = data.rows_per_file()
+            for name, rows in list(rows_per_file.items())[:20]:
+                summary += f"- {name}: {rows}\n"
+            if len(rows_per_file) > 20:
+                summary += f"- ... and {len(rows_per_file) - 20} more files\n"
+            
+            summary += f"\nFirst 5 rows:\n{data.head().to_string()}\n"
+            
+            statistics = data.describe_numeric()
+            if not statistics.empty:
+                summary += "\nBasic statistics for numeric columns (all files):\n"
+                summary += statistics.to_string()
+            
+            categorical = self._describe_categorical(data)
+            if categorical:
+                summary += "\n\n" + categorical
+        
+        elif isinstance(data, ParquetDataset):
+            summary = (f"Large dataset with {data.shape[0]} rows and {data.shape[1]} columns "
+                       f"(stored out of core in {len(data.parts)} Parquet partitions).\n")
+            summary += f"Columns: {', '.join(str(c) for c in data.columns)}\n"
+            summary += f"\nFirst 5 rows:\n{data.head().to_string()}\n"
+            
+            statistics = data.describe_numeric()
+            if not statistics.empty:
+                summary += "\nBasic statistics for numeric columns (all rows):\n"
+                summary += statistics.to_string()
+            
+            sample = data.sample(get_setting('performance.out_of_core.plot_sample_rows', 100000))
+            time_series = detect_time_series(sample)
+            if time_series:
+                summary += "\n\n" + describe_time_series(
+                    sample, time_series, max_periods=get_setting('analysis.eda.timeseries.max_prompt_periods', 30))
+            
+            categorical = self._describe_categorical(data)
+            if categorical:
+                summary += "\n\n" + categorical
+        
+        elif isinstance(data, TextDocument):
+            preview_chars = 500
+            summary = f"Text data with {data.line_count:,} lines and {len(data):,} characters.\n"
+            summary += f"Beginning: {data.head(preview_chars)}{'...' if len(data) > preview_chars else ''}"
+            if data.line_count > 20:
+                tail = data.read_lines(data.line_count - 10, data.line_count)[-preview_chars:]
+                summary += f"\n\nLast lines: {tail}"
         
         elif isinstance(data, str):
             summary = f"Text data with {len(data)} characters.\\n"
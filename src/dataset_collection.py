@@ -0,0 +1,209 @@
+"""
+Dataset Collection Module
+Logical dataset made of several compatible tabular files, combined lazily
+"""
+
+import logging
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+class DatasetCollection:
+    """
+    Several DataFrames with the same columns treated as one dataset
+
+    The parts are kept separate; row counts, previews, missing counts and
+    numeric statistics are computed per part and merged. A concatenated frame
+    is only built when an operation really needs all rows at once, and it is
+    not kept, so the collection's memory use stays what memory_usage reports.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Initialize the DatasetCollection
+
+        Args:
+            frames: Mapping of file name to DataFrame (all with the same columns)
+        """
+        if not frames:
+            raise ValueError("A dataset collection needs at least one file")
+
+        columns = None
+        for name, frame in frames.items():
+            if columns is None:
+                columns = list(frame.columns)
+            elif list(frame.columns) != columns:
+                raise ValueError(f"File '{name}' does not have the same columns as the other files")
+
+        self.logger = logging.getLogger(__name__)
+        self.frames = dict(frames)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.frames)
+
+    @property
+    def columns(self) -> pd.Index:
+        return next(iter(self.frames.values())).columns
+
+    @property
+    def dtypes(self) -> pd.Series:
+        return next(iter(self.frames.values())).dtypes
+
+    @property
+    def shape(self):
+        return (len(self), len(self.columns))
+
+    def __len__(self) -> int:
+        return sum(len(frame) for frame in self.frames.values())
+
+    def rows_per_file(self) -> Dict[str, int]:
+        """Get the number of rows contributed by each file"""
+        return {name: len(frame) for name, frame in self.frames.items()}
+
+    def memory_usage(self) -> int:
+        """Get the total in-memory size of all parts in bytes"""
+        return int(sum(frame.memory_usage(index=True, deep=True).sum() for frame in self.frames.values()))
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """Get the first n rows across parts without combining everything"""
+        parts = []
+        remaining = n
+        for frame in self.frames.values():
+            if remaining <= 0:
+                break
+            parts.append(frame.head(remaining))
+            remaining -= len(parts[-1])
+        if not parts:
+            return next(iter(self.frames.values())).head(0)
+        return pd.concat(parts, ignore_index=True)
+
+    def missing_counts(self) -> Dict[str, int]:
+        """Get the number of missing values per column across parts"""
+        counts = sum(frame.isnull().sum() for frame in self.frames.values())
+        return {col: int(count) for col, count in counts.items()}
+
+    def column(self, name: str) -> pd.Series:
+        """Get one column across all parts (only that column is copied)"""
+        return pd.concat([frame[name] for frame in self.frames.values()], ignore_index=True)
+
+    def take(self, positions) -> pd.DataFrame:
+        """
+        Get rows by global position with a 'source_file' column, without combining all parts
+
+        Args:
+            positions: Row positions in the order of the parts
+
+        Returns:
+            DataFrame with the rows in the requested order
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        offsets = np.cumsum([0] + [len(frame) for frame in self.frames.values()])
+        parts = np.searchsorted(offsets, positions, side='right') - 1
+
+        pieces = []
+        for part, (name, frame) in enumerate(self.frames.items()):
+            selected = np.nonzero(parts == part)[0]
+            if len(selected) == 0:
+                continue
+            rows = frame.iloc[positions[selected] - offsets[part]].reset_index(drop=True)
+            rows.insert(0, 'source_file', name)
+            rows.index = selected
+            pieces.append(rows)
+
+        if not pieces:
+            empty = self.head(0)
+            empty.insert(0, 'source_file', pd.Series(dtype=object))
+            return empty
+        return pd.concat(pieces).sort_index().reset_index(drop=True)
+
+    def describe_numeric(self) -> pd.DataFrame:
+        """
+        Compute count/mean/std/min/max for numeric columns by merging per-part aggregates
+
+        Each part contributes its count, mean and sum of squared deviations
+        (M2), combined with Chan et al.'s parallel formula, which stays
+        accurate for large values with a small spread. Values that are not
+        numeric in a later part are counted as missing.
+
+        Returns:
+            DataFrame shaped like DataFrame.describe() (without quantiles)
+        """
+        numeric_cols = next(iter(self.frames.values())).select_dtypes(include=['number']).columns
+        if len(numeric_cols) == 0:
+            return pd.DataFrame()
+
+        count = pd.Series(0.0, index=numeric_cols)
+        mean = pd.Series(0.0, index=numeric_cols)
+        m2 = pd.Series(0.0, index=numeric_cols)
+        minimum = pd.Series(np.inf, index=numeric_cols)
+        maximum = pd.Series(-np.inf, index=numeric_cols)
+
+        for frame in self.frames.values():
+            part = frame[numeric_cols].apply(pd.to_numeric, errors='coerce').astype('float64')
+            part_count = part.count().astype('float64')
+            part_mean = part.mean().fillna(0.0)
+            part_m2 = ((part - part_mean) ** 2).sum()
+
+            combined = count + part_count
+            delta = part_mean - mean
+            weight = (part_count / combined.replace(0, np.nan)).fillna(0.0)
+            mean = mean + delta * weight
+            m2 = m2 + part_m2 + delta ** 2 * count * weight
+            count = combined
+            minimum = np.minimum(minimum, part.min().fillna(np.inf))
+            maximum = np.maximum(maximum, part.max().fillna(-np.inf))
+
+        mean = mean.where(count > 0)
+        std = np.sqrt(m2 / (count - 1).where(count > 1))
+
+        return pd.DataFrame({
+            'count': count,
+            'mean': mean,
+            'std': std,
+            'min': minimum.replace(np.inf, np.nan),
+            'max': maximum.replace(-np.inf, np.nan)
+        }).T
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get all rows as one DataFrame with a 'source_file' column
+
+        The concatenation is a new copy on every call and is not kept; use it
+        only for the duration of an operation that needs all rows at once.
+        """
+        self.logger.info(f"Combining {len(self.frames)} files into one DataFrame")
+        combined = pd.concat(self.frames.values(), keys=self.names, names=['source_file', None])
+        combined = combined.reset_index(level='source_file').reset_index(drop=True)
+        combined['source_file'] = combined['source_file'].astype('category')
+        return combined
+
+def _dtype_class(dtype) -> str:
+    """Coarse kind of a column (int and float columns stay compatible)"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    return 'object'
+
+def group_compatible_frames(frames: Dict[str, pd.DataFrame]) -> List[Dict[str, pd.DataFrame]]:
+    """
+    Group DataFrames that share the same column layout
+
+    Columns must match by name and by kind (numeric, boolean, datetime or
+    other), so a file with text in a column that is numeric elsewhere is
+    kept as a separate dataset.
+
+    Args:
+        frames: Mapping of file name to DataFrame
+
+    Returns:
+        List of groups, each a mapping of file name to DataFrame
+    """
+    groups = {}
+    for name, frame in frames.items():
+        signature = tuple((str(col), _dtype_class(dtype)) for col, dtype in frame.dtypes.items())
+        groups.setdefault(signature, {})[name] = frame
+    return list(groups.values())
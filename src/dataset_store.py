@@ -0,0 +1,554 @@
+"""
+Dataset Store Module
+Process-wide, content-addressed store for processed datasets shared across Streamlit sessions
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Union, Dict, Any, List, Callable, Optional
+import pandas as pd
+
+from dataset_collection import DatasetCollection
+from metrics import record_cache_lookup
+from out_of_core import ParquetDataset
+from settings import get_setting
+from singleflight import SingleFlight
+from text_document import TextDocument
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Spilling DataFrames to disk requires pyarrow
+    pa = None
+    feather = None
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def compute_fingerprint(uploaded_file) -> str:
+    """
+    Compute a content hash for an uploaded file without loading it twice
+
+    Args:
+        uploaded_file: Streamlit uploaded file object (or any binary file object)
+
+    Returns:
+        Hex SHA-256 digest of the file contents
+    """
+    hasher = hashlib.sha256()
+    uploaded_file.seek(0)
+    while True:
+        chunk = uploaded_file.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+def fingerprint_data(data: Union[pd.DataFrame, DatasetCollection, ParquetDataset, TextDocument, str]) -> str:
+    """
+    Compute a content hash for already processed data
+
+    Args:
+        data: Processed data (DataFrame, DatasetCollection or string)
+
+    Returns:
+        Hex SHA-256 digest of the data
+    """
+    if isinstance(data, DatasetCollection):
+        return combine_fingerprints(fingerprint_data(frame) for frame in data.frames.values())
+
+    hasher = hashlib.sha256()
+    if isinstance(data, ParquetDataset):
+        # Converted directories are named after the source file's content hash
+        hasher.update(os.path.basename(os.path.normpath(data.path)).encode('utf-8'))
+        hasher.update(str(data.manifest['rows']).encode('utf-8'))
+    elif isinstance(data, TextDocument):
+        # Indexed copies are named after the source file's content hash
+        hasher.update(os.path.basename(os.path.normpath(data.path)).encode('utf-8'))
+        hasher.update(str(data.size_bytes).encode('utf-8'))
+    elif isinstance(data, pd.DataFrame):
+        hasher.update(",".join(str(c) for c in data.columns).encode('utf-8'))
+        hasher.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    else:
+        hasher.update(str(data).encode('utf-8'))
+    return hasher.hexdigest()
+
+def combine_fingerprints(fingerprints) -> str:
+    """
+    Derive a stable key for a set of files from their fingerprints
+
+    Args:
+        fingerprints: Iterable of file content hashes
+
+    Returns:
+        Hex SHA-256 digest independent of file order
+    """
+    return hashlib.sha256("".join(sorted(fingerprints)).encode('utf-8')).hexdigest()
+
+def estimate_size(data: Union[pd.DataFrame, DatasetCollection, ParquetDataset, TextDocument, str]) -> int:
+    """
+    Estimate the in-memory size of processed data in bytes
+
+    Args:
+        data: Processed data (DataFrame, DatasetCollection or string)
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True, deep=True).sum())
+    if isinstance(data, (DatasetCollection, ParquetDataset, TextDocument)):
+        return data.memory_usage()
+    return sys.getsizeof(data)
+
+class _StoreEntry:
+    """Bookkeeping for a single dataset held by the store"""
+
+    def __init__(self, data, size_bytes: int):
+        self.data = data
+        self.size_bytes = size_bytes
+        if isinstance(data, pd.DataFrame):
+            self.kind = 'dataframe'
+        elif isinstance(data, DatasetCollection):
+            self.kind = 'collection'
+        elif isinstance(data, ParquetDataset):
+            self.kind = 'parquet'
+        elif isinstance(data, TextDocument):
+            self.kind = 'document'
+        else:
+            self.kind = 'text'
+        self.spill_path = None
+        self.spilling = False
+        self.loading = False
+        self.last_access = time.time()
+        self.artifacts: Dict[str, Any] = {}
+
+    @property
+    def resident(self) -> bool:
+        return self.data is not None
+
+class DatasetStore:
+    """
+    Shared dataset store keyed by content hash
+
+    Datasets are held once per process and referenced by key from each
+    session. When resident data exceeds the memory budget, the least
+    recently used datasets are spilled to memory-mappable Arrow files and
+    reloaded transparently on the next access. Datasets that are no longer
+    referenced by a live session are dropped after the session timeout,
+    together with their files on disk. Spilling, reloading and file removal
+    run outside the store lock so other sessions are not blocked on disk I/O.
+    """
+
+    def __init__(self, memory_budget_mb: float = 2048, spill_dir: str = None,
+                 session_timeout_minutes: float = 30):
+        """
+        Initialize the DatasetStore
+
+        Args:
+            memory_budget_mb: Maximum resident size of all datasets
+            spill_dir: Directory for spilled datasets
+            session_timeout_minutes: Idle time after which sessions are released
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.spill_dir = spill_dir or os.path.join('data', 'cache', 'datasets')
+        self.session_timeout = session_timeout_minutes * 60
+
+        self._entries: "OrderedDict[str, _StoreEntry]" = OrderedDict()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._uploads: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._tracked: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._last_cleanup = 0.0
+        self._artifact_builds = SingleFlight()
+        self._reloads = SingleFlight()
+
+    def put(self, key: str, data: Union[pd.DataFrame, str], session_id: str = None) -> str:
+        """
+        Add a dataset to the store (no-op if the key is already present)
+
+        Args:
+            key: Content hash of the source file
+            data: Processed data
+            session_id: Session referencing the dataset
+
+        Returns:
+            The dataset key
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _StoreEntry(data, estimate_size(data))
+                self.logger.info(f"Dataset {key[:12]} stored ({self._entries[key].size_bytes} bytes)")
+            if session_id:
+                self.attach(session_id, key)
+            self._touch(key)
+            victims = self._enforce_budget(pinned=key)
+        self._spill_all(victims)
+        self._maybe_cleanup()
+        return key
+
+    def get(self, key: str, session_id: str = None) -> Optional[Union[pd.DataFrame, str]]:
+        """
+        Get a dataset, reloading it from disk if it was spilled
+
+        Args:
+            key: Dataset key
+            session_id: Session accessing the dataset
+
+        Returns:
+            The dataset or None if it is not in the store
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            record_cache_lookup('dataset_store', entry is not None)
+            if entry is None:
+                return None
+            if session_id:
+                self.attach(session_id, key)
+            self._touch(key)
+            data = entry.data
+            victims = self._enforce_budget(pinned=key) if data is not None else []
+
+        if data is None:
+            # Sessions asking for the same spilled dataset share one read
+            data, _ = self._reloads.do(key, lambda: self._reload(key, entry))
+            with self._lock:
+                victims = self._enforce_budget(pinned=key) if self._entries.get(key) is entry else []
+        self._spill_all(victims)
+        self._maybe_cleanup()
+        return data
+
+    def get_artifact(self, key: str, name: str, factory: Callable[[], Any] = None) -> Any:
+        """
+        Get a value derived from a dataset (column profile, prompt context, ...)
+
+        Artifacts live as long as their dataset and stay in memory when the
+        dataset is spilled. Concurrent builds of the same artifact are coalesced.
+
+        Args:
+            key: Dataset key
+            name: Artifact name
+            factory: Builds the artifact when it is missing
+
+        Returns:
+            The artifact, or None if it is missing and no factory was given
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry.artifacts:
+                record_cache_lookup('artifact', True)
+                return entry.artifacts[name]
+        record_cache_lookup('artifact', False)
+
+        if factory is None:
+            return None
+
+        value, _ = self._artifact_builds.do(f"{key}:{name}", factory)
+        self.set_artifact(key, name, value)
+        return value
+
+    def set_artifact(self, key: str, name: str, value: Any):
+        """Attach a derived value to a dataset (ignored if the dataset is not stored)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.artifacts[name] = value
+
+    def track_memory(self, name: str, size_bytes: int):
+        """
+        Count memory held outside the store (e.g. preview sort indices) against the budget
+
+        Datasets are spilled as needed to make room.
+
+        Args:
+            name: Owner of the memory
+            size_bytes: Bytes held (replaces an earlier value for the same name)
+        """
+        with self._lock:
+            self._tracked[name] = int(size_bytes)
+            victims = self._enforce_budget()
+        self._spill_all(victims)
+
+    def untrack_memory(self, name: str):
+        """Stop counting memory registered with track_memory"""
+        with self._lock:
+            self._tracked.pop(name, None)
+
+    def remember_upload(self, upload_key: str, datasets: List[Dict[str, Any]]):
+        """
+        Remember which datasets a set of uploaded files produced
+
+        Args:
+            upload_key: Combined fingerprint of the uploaded files
+            datasets: List of dicts with the dataset 'key' and its 'file_info'
+        """
+        with self._lock:
+            self._uploads[upload_key] = datasets
+            self._uploads.move_to_end(upload_key)
+            while len(self._uploads) > 1000:
+                self._uploads.popitem(last=False)
+
+    def lookup_upload(self, upload_key: str, session_id: str = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the datasets produced by an earlier identical upload
+
+        Args:
+            upload_key: Combined fingerprint of the uploaded files
+            session_id: Session reusing the datasets
+
+        Returns:
+            List of dataset dicts, or None if any of them is no longer stored
+        """
+        with self._lock:
+            datasets = self._uploads.get(upload_key)
+            if datasets is None or not all(d['key'] in self._entries for d in datasets):
+                record_cache_lookup('upload', False)
+                return None
+            record_cache_lookup('upload', True)
+            if session_id:
+                for d in datasets:
+                    self.attach(session_id, d['key'])
+            return datasets
+
+    def contains(self, key: str) -> bool:
+        """Check whether a dataset is held by the store (resident or spilled)"""
+        with self._lock:
+            return key in self._entries
+
+    def attach(self, session_id: str, key: str):
+        """Record that a session references a dataset"""
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {'keys': set(), 'last_seen': time.time()})
+            session['keys'].add(key)
+            session['last_seen'] = time.time()
+
+    def touch_session(self, session_id: str):
+        """Mark a session as alive"""
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id]['last_seen'] = time.time()
+        self._maybe_cleanup()
+
+    def release_session(self, session_id: str):
+        """Drop a session's references to its datasets"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def cleanup_expired(self):
+        """Release idle sessions and drop datasets nobody references any more"""
+        with self._lock:
+            now = time.time()
+            expired = [sid for sid, s in self._sessions.items()
+                       if now - s['last_seen'] > self.session_timeout]
+            for sid in expired:
+                del self._sessions[sid]
+                self.logger.info(f"Session {sid[:8]} expired")
+
+            referenced = set()
+            for session in self._sessions.values():
+                referenced.update(session['keys'])
+
+            dropped = []
+            for key in list(self._entries):
+                entry = self._entries[key]
+                if key not in referenced and now - entry.last_access > self.session_timeout:
+                    dropped.append(self._drop(key))
+            self._last_cleanup = now
+
+        for entry in dropped:
+            self._remove_files(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        with self._lock:
+            resident = [e for e in self._entries.values() if e.resident]
+            return {
+                'datasets': len(self._entries),
+                'resident_datasets': len(resident),
+                'resident_bytes': sum(e.size_bytes for e in resident),
+                'tracked_bytes': sum(self._tracked.values()),
+                'memory_budget_bytes': self.memory_budget,
+                'sessions': len(self._sessions)
+            }
+
+    def _touch(self, key: str):
+        self._entries[key].last_access = time.time()
+        self._entries.move_to_end(key)
+
+    def _resident_bytes(self) -> int:
+        """Resident size, not counting datasets that are being spilled"""
+        return (sum(e.size_bytes for e in self._entries.values() if e.resident and not e.spilling)
+                + sum(self._tracked.values()))
+
+    def _enforce_budget(self, pinned: str = None) -> List[tuple]:
+        """
+        Choose least recently used datasets to spill until the budget is met (lock held)
+
+        Datasets that were spilled before are released at once; the others
+        are marked and returned for _spill_all to write once the lock is released.
+
+        Returns:
+            List of (key, entry, last_access) to spill
+        """
+        victims = []
+        for key in list(self._entries):
+            if self._resident_bytes() <= self.memory_budget:
+                return victims
+            entry = self._entries[key]
+            if key == pinned or not entry.resident or entry.spilling or entry.kind in ('parquet', 'document'):
+                continue  # Out-of-core datasets are already on disk
+            if entry.spill_path is not None:
+                entry.data = None
+                self.logger.info(f"Dataset {key[:12]} released (spill file kept from an earlier spill)")
+            elif entry.kind == 'text' or feather is not None:
+                entry.spilling = True
+                victims.append((key, entry, entry.last_access))
+
+        if self._resident_bytes() > self.memory_budget:
+            self.logger.warning("Dataset store is over its memory budget; active dataset kept in memory")
+        return victims
+
+    def _spill_all(self, victims: List[tuple]):
+        for key, entry, last_access in victims:
+            self._spill(key, entry, last_access)
+
+    def _spill(self, key: str, entry: _StoreEntry, last_access: float):
+        """
+        Write a dataset to disk without holding the lock, then release its memory
+
+        The memory is kept if the dataset was used while it was being written;
+        the spill file is then reused by the next spill.
+        """
+        os.makedirs(self.spill_dir, exist_ok=True)
+        try:
+            if entry.kind == 'dataframe':
+                path = os.path.join(self.spill_dir, f"{key}.arrow")
+                table = pa.Table.from_pandas(entry.data)
+                feather.write_feather(table, path, compression='uncompressed')
+            elif entry.kind == 'collection':
+                path = os.path.join(self.spill_dir, key)
+                os.makedirs(path, exist_ok=True)
+                for i, (name, frame) in enumerate(entry.data.frames.items()):
+                    table = pa.Table.from_pandas(frame)
+                    table = table.replace_schema_metadata(
+                        {**(table.schema.metadata or {}), b'source_file': name.encode('utf-8')})
+                    feather.write_feather(table, os.path.join(path, f"part-{i:05d}.arrow"),
+                                          compression='uncompressed')
+            else:
+                path = os.path.join(self.spill_dir, f"{key}.txt")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(entry.data)
+        except Exception as e:
+            with self._lock:
+                entry.spilling = False
+            self.logger.warning(f"Could not spill dataset {key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            entry.spilling = False
+            entry.spill_path = path
+            dropped = self._entries.get(key) is not entry
+            if not dropped and entry.last_access == last_access:
+                entry.data = None
+                self.logger.info(f"Dataset {key[:12]} spilled to {path}")
+        if dropped:
+            self._remove_files(entry)
+
+    def _reload(self, key: str, entry: _StoreEntry):
+        """
+        Load a spilled dataset back into memory without holding the lock
+
+        The entry is marked as loading meanwhile, so a drop in the meantime
+        leaves the spill file to be removed here once the read is done.
+
+        Returns:
+            The reloaded data
+        """
+        with self._lock:
+            if entry.resident:
+                return entry.data
+            entry.loading = True
+
+        data = None
+        try:
+            data = self._read_spill(entry)
+            self.logger.info(f"Dataset {key[:12]} reloaded from disk")
+        finally:
+            with self._lock:
+                entry.loading = False
+                dropped = self._entries.get(key) is not entry
+                if data is not None and not dropped:
+                    entry.data = data
+            if dropped:
+                self._remove_files(entry)
+        return data
+
+    def _read_spill(self, entry: _StoreEntry):
+        """Read a dataset from its spill file"""
+        if entry.kind == 'dataframe':
+            return feather.read_table(entry.spill_path, memory_map=True).to_pandas()
+        if entry.kind == 'collection':
+            frames = {}
+            for part in sorted(os.listdir(entry.spill_path)):
+                table = feather.read_table(os.path.join(entry.spill_path, part), memory_map=True)
+                name = table.schema.metadata[b'source_file'].decode('utf-8')
+                frames[name] = table.to_pandas()
+            return DatasetCollection(frames)
+        with open(entry.spill_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _drop(self, key: str) -> _StoreEntry:
+        """Remove a dataset from the store (lock held); its files are removed by _remove_files"""
+        entry = self._entries.pop(key)
+        self.logger.info(f"Dataset {key[:12]} dropped from store")
+        return entry
+
+    def _remove_files(self, entry: _StoreEntry):
+        """Delete a dropped dataset's spill file and the on-disk data of out-of-core datasets"""
+        if entry.spilling or entry.loading:
+            return  # The spill or reload in progress removes the files when it finds the entry dropped
+        cleanup = getattr(entry.data, 'cleanup', None)
+        if cleanup is not None:
+            try:
+                cleanup()
+            except OSError as e:
+                self.logger.warning(f"Could not remove the files of {entry.data.path}: {str(e)}")
+        if entry.spill_path and os.path.exists(entry.spill_path):
+            try:
+                if os.path.isdir(entry.spill_path):
+                    shutil.rmtree(entry.spill_path)
+                else:
+                    os.unlink(entry.spill_path)
+            except OSError as e:
+                self.logger.warning(f"Could not remove spill file {entry.spill_path}: {str(e)}")
+
+    def _maybe_cleanup(self):
+        if time.time() - self._last_cleanup > 60:
+            self.cleanup_expired()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_dataset_store() -> DatasetStore:
+    """
+    Get the process-wide dataset store, creating it from config on first use
+
+    Returns:
+        Shared DatasetStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore(
+                memory_budget_mb=get_setting('performance.dataset_store.memory_budget_mb', 2048),
+                spill_dir=get_setting('performance.dataset_store.spill_dir', os.path.join('data', 'cache', 'datasets')),
+                session_timeout_minutes=get_setting('security.session_timeout_minutes', 30)
+            )
+        return _store
@@ -0,0 +1,393 @@
+"""
+Exporters Module
+Streaming export of analysis reports and datasets to files, written chunk by chunk
+"""
+
+import os
+import json
+import html
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Dict, Any, List, Callable, Union
+import pandas as pd
+
+from dataset_collection import DatasetCollection
+from out_of_core import ParquetDataset
+from settings import get_setting
+from utils import format_file_size
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export requires pyarrow
+    pa = None
+    pq = None
+
+REPORT_FORMATS = {'md': 'text/markdown', 'html': 'text/html', 'json': 'application/json'}
+DATASET_FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'html': 'text/html',
+    'json': 'application/x-ndjson'
+}
+
+EXCEL_MAX_ROWS = 1048575  # Sheet limit minus the header row
+
+def iter_report_markdown(chat_history: List[Dict[str, Any]], file_info: Dict[str, Any] = None) -> Iterator[str]:
+    """
+    Yield a Markdown analysis report piece by piece
+
+    Args:
+        chat_history: List of chat interactions
+        file_info: Information about the analyzed file
+
+    Yields:
+        Markdown fragments
+    """
+    yield "# Data Analysis Report\n\n"
+    yield f"**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+    if file_info:
+        yield "## File Information\n\n"
+        yield f"- **File Name:** {file_info.get('name', 'N/A')}\n"
+        yield f"- **File Type:** {file_info.get('type', 'N/A')}\n"
+        yield f"- **File Size:** {format_file_size(file_info.get('size', 0))}\n\n"
+
+    yield "## Analysis Results\n\n"
+
+    for i, interaction in enumerate(chat_history, 1):
+        yield f"### Question {i}\n\n"
+        if interaction.get('file'):
+            yield f"**File:** {interaction['file']}\n\n"
+        yield f"**Q:** {interaction.get('question', 'N/A')}\n\n"
+        yield f"**A:** {interaction.get('response', 'N/A')}\n\n"
+        yield "---\n\n"
+
+    yield "\n*Report generated by Data Analyst Agent*\n"
+
+def iter_report_html(chat_history: List[Dict[str, Any]], file_info: Dict[str, Any] = None) -> Iterator[str]:
+    """Yield an HTML analysis report piece by piece"""
+    yield ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Data Analysis Report</title>"
+           "<style>body{font-family:sans-serif;max-width:900px;margin:auto}"
+           ".answer{white-space:pre-wrap}</style></head><body>\n")
+    yield "<h1>Data Analysis Report</h1>\n"
+    yield f"<p><strong>Generated on:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n"
+
+    if file_info:
+        yield "<h2>File Information</h2>\n<ul>\n"
+        yield f"<li><strong>File Name:</strong> {html.escape(str(file_info.get('name', 'N/A')))}</li>\n"
+        yield f"<li><strong>File Type:</strong> {html.escape(str(file_info.get('type', 'N/A')))}</li>\n"
+        yield f"<li><strong>File Size:</strong> {format_file_size(file_info.get('size', 0))}</li>\n</ul>\n"
+
+    yield "<h2>Analysis Results</h2>\n"
+    for i, interaction in enumerate(chat_history, 1):
+        yield f"<h3>Question {i}</h3>\n"
+        yield f"<p><strong>Q:</strong> {html.escape(str(interaction.get('question', 'N/A')))}</p>\n"
+        yield f"<div class=\"answer\"><strong>A:</strong> {html.escape(str(interaction.get('response', 'N/A')))}</div>\n<hr>\n"
+
+    yield "<p><em>Report generated by Data Analyst Agent</em></p>\n</body></html>\n"
+
+def iter_report_json(chat_history: List[Dict[str, Any]], file_info: Dict[str, Any] = None) -> Iterator[str]:
+    """Yield a JSON analysis report piece by piece"""
+    report = {
+        'generated_on': datetime.now().isoformat(),
+        'file_info': file_info or {},
+        'interactions': chat_history
+    }
+    yield from json.JSONEncoder(indent=2, ensure_ascii=False, default=str).iterencode(report)
+
+REPORT_WRITERS = {'md': iter_report_markdown, 'html': iter_report_html, 'json': iter_report_json}
+
+PARTIAL_MARKER = '.partial'
+
+def export_dir() -> str:
+    """
+    Directory that holds finished exports
+
+    Old exports are removed each time a new one is placed here (see cleanup_exports).
+    """
+    path = get_setting('export.directory', os.path.join('data', 'exports'))
+    os.makedirs(path, exist_ok=True)
+    cleanup_exports(path, get_setting('export.max_age_hours', 24), get_setting('export.max_size_mb', 1024))
+    return path
+
+def cleanup_exports(directory: str, max_age_hours: float = 24, max_size_mb: float = 1024) -> int:
+    """
+    Delete exports older than max_age_hours, then the oldest ones while the directory exceeds max_size_mb
+
+    The newest finished export is always kept so a large export can still
+    be downloaded. Partial files of failed or interrupted exports are only
+    removed once they are older than max_age_hours, since a running export
+    may still be writing them.
+
+    Returns:
+        Number of files deleted
+    """
+    now = time.time()
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path, PARTIAL_MARKER in name))
+
+    removed = 0
+    kept, total = [], 0
+    for mtime, size, path, partial in sorted(entries, reverse=True):
+        if now - mtime > max_age_hours * 3600:
+            removed += _remove(path)
+        elif not partial:
+            kept.append((size, path))
+            total += size
+
+    while len(kept) > 1 and total > max_size_mb * 1024 * 1024:
+        size, path = kept.pop()
+        total -= size
+        removed += _remove(path)
+
+    if removed:
+        logging.getLogger(__name__).info(f"Removed {removed} old export files from {directory}")
+    return removed
+
+def _remove(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except OSError:
+        return 0
+
+@contextmanager
+def _writing(path: str) -> Iterator[str]:
+    """
+    Yield a temporary path next to path and move it into place on success
+
+    A failed export deletes its partial file instead of leaving a truncated
+    file under the final name. The extension is kept so writers that check
+    it (openpyxl) accept the temporary name.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{uuid.uuid4().hex[:8]}{PARTIAL_MARKER}{ext}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+def export_report(chat_history: List[Dict[str, Any]], file_info: Dict[str, Any] = None, fmt: str = 'md',
+                  path: str = None, progress_callback: Callable[[float, str], None] = None) -> str:
+    """
+    Write an analysis report to a file without building it in memory
+
+    Args:
+        chat_history: List of chat interactions
+        file_info: Information about the analyzed file
+        fmt: 'md', 'html' or 'json'
+        path: Output path (a unique file in the export directory when omitted)
+        progress_callback: Optional callback(fraction, message)
+
+    Returns:
+        Path of the written file
+    """
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    path = path or os.path.join(export_dir(), f"analysis_report_{uuid.uuid4().hex[:8]}.{fmt}")
+
+    with _writing(path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for fragment in REPORT_WRITERS[fmt](chat_history, file_info):
+                f.write(fragment)
+
+    if progress_callback:
+        progress_callback(1.0, "Report written")
+    logging.getLogger(__name__).info(f"Exported report to {path}")
+    return path
+
+def iter_dataset_chunks(data: Union[pd.DataFrame, DatasetCollection, ParquetDataset],
+                        chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield a tabular dataset in chunks without materializing it as one frame
+
+    Collections get a source_file column naming the file each row came from.
+    """
+    if isinstance(data, ParquetDataset):
+        yield from data.iter_batches(batch_size=chunk_rows)
+    elif isinstance(data, DatasetCollection):
+        for name, frame in data.frames.items():
+            for start in range(0, len(frame), chunk_rows):
+                chunk = frame.iloc[start:start + chunk_rows].copy()
+                chunk.insert(0, 'source_file', name)
+                yield chunk
+    elif isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        raise ValueError("Only tabular datasets can be exported")
+
+def export_dataset(data: Union[pd.DataFrame, DatasetCollection, ParquetDataset], fmt: str, path: str = None,
+                   name: str = 'dataset', chunk_rows: int = None,
+                   progress_callback: Callable[[float, str], None] = None) -> str:
+    """
+    Write a tabular dataset to a file chunk by chunk
+
+    Args:
+        data: Stored tabular dataset
+        fmt: 'csv', 'parquet', 'xlsx', 'html' or 'json' (JSON lines)
+        path: Output path (a unique file in the export directory when omitted)
+        name: Base name of the generated file
+        chunk_rows: Rows written per chunk (export.chunk_rows)
+        progress_callback: Optional callback(fraction, message)
+
+    Returns:
+        Path of the written file
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == 'parquet' and pq is None:
+        raise ValueError("Parquet export requires pyarrow")
+
+    chunk_rows = chunk_rows or get_setting('export.chunk_rows', 50000)
+    path = path or os.path.join(export_dir(), f"{name}_{uuid.uuid4().hex[:8]}.{fmt}")
+    total_rows = max(len(data), 1)
+    written = 0
+
+    with _writing(path) as tmp_path:
+        if fmt == 'parquet':
+            writer = _ParquetWriter(tmp_path, dataset_schema(data))
+        else:
+            writer = _DATASET_WRITERS[fmt](tmp_path)
+        try:
+            for chunk in iter_dataset_chunks(data, chunk_rows):
+                writer.write(chunk)
+                written += len(chunk)
+                if progress_callback:
+                    progress_callback(min(written / total_rows, 1.0), f"Wrote {written:,} of {len(data):,} rows")
+        finally:
+            writer.close()
+
+    logging.getLogger(__name__).info(f"Exported {written} rows to {path}")
+    return path
+
+def _frame_schema(frame: pd.DataFrame) -> "pa.Schema":
+    """
+    Arrow schema of a whole frame
+
+    Taken from the dtypes; object columns are typed from their first
+    non-null values anywhere in the frame, so a leading run of nulls does
+    not fix them to the null type.
+    """
+    schema = pa.Schema.from_pandas(frame.head(0), preserve_index=False).remove_metadata()
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            values = frame[field.name].dropna()
+            if not values.empty:
+                schema = schema.set(i, field.with_type(pa.array(values.iloc[:1000], from_pandas=True).type))
+    return schema
+
+def dataset_schema(data: Union[pd.DataFrame, DatasetCollection, ParquetDataset]) -> "pa.Schema":
+    """Arrow schema that every exported chunk of a dataset is written with"""
+    if isinstance(data, ParquetDataset):
+        return data.schema.remove_metadata()
+    if isinstance(data, DatasetCollection):
+        schema = pa.unify_schemas([_frame_schema(frame) for frame in data.frames.values()],
+                                  promote_options='permissive')
+        return schema.insert(0, pa.field('source_file', pa.string()))
+    return _frame_schema(data)
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.header = True
+
+    def write(self, chunk: pd.DataFrame):
+        chunk.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+class _JsonLinesWriter:
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, chunk: pd.DataFrame):
+        if len(chunk):
+            lines = chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+            # Older pandas versions leave out the final newline
+            self.file.write(lines if lines.endswith('\n') else lines + '\n')
+
+    def close(self):
+        self.file.close()
+
+class _ParquetWriter:
+    """One row group per chunk, all written with the schema of the whole dataset"""
+
+    def __init__(self, path: str, schema: "pa.Schema"):
+        self.schema = schema
+        self.writer = pq.ParquetWriter(path, schema)
+
+    def write(self, chunk: pd.DataFrame):
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        self.writer.close()
+
+class _HtmlWriter:
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.header = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.header:
+            self.file.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Dataset export</title></head>"
+                            "<body>\n<table border=\"1\">\n<thead><tr>")
+            self.file.write("".join(f"<th>{html.escape(str(c))}</th>" for c in chunk.columns))
+            self.file.write("</tr></thead>\n<tbody>\n")
+            self.header = False
+        for row in chunk.itertuples(index=False, name=None):
+            self.file.write("<tr>" + "".join(f"<td>{html.escape('' if pd.isna(v) else str(v))}</td>"
+                                             for v in row) + "</tr>\n")
+
+    def close(self):
+        if not self.header:
+            self.file.write("</tbody>\n</table>\n")
+        self.file.write("</body></html>\n")
+        self.file.close()
+
+class _ExcelWriter:
+    """openpyxl write-only workbook, which streams rows to disk instead of keeping cells in memory"""
+
+    def __init__(self, path: str):
+        from openpyxl import Workbook
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("data")
+        self.rows = 0
+        self.header = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.header:
+            self.sheet.append([str(c) for c in chunk.columns])
+            self.header = False
+        if self.rows + len(chunk) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows; export as CSV or Parquet instead")
+        for row in chunk.itertuples(index=False, name=None):
+            self.sheet.append([None if pd.isna(v) else v for v in row])
+        self.rows += len(chunk)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+_DATASET_WRITERS = {
+    'csv': _CsvWriter,
+    'json': _JsonLinesWriter,
+    'parquet': _ParquetWriter,
+    'html': _HtmlWriter,
+    'xlsx': _ExcelWriter
+}
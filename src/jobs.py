@@ -0,0 +1,247 @@
+"""
+Jobs Module
+Background job execution with job IDs, progress reporting, cancellation and memoized results
+"""
+
+import uuid
+import time
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+from metrics import record_cache_lookup
+from settings import get_setting
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+DEFAULT_POOL = 'default'
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+class Job:
+    """A unit of background work and its observable state"""
+
+    def __init__(self, name: str, memo_key: str = None):
+        """
+        Initialize the Job
+
+        Args:
+            name: Human readable job name
+            memo_key: Key under which the result is memoized
+        """
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.memo_key = memo_key
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = "Queued"
+        self.details: Dict[str, Any] = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def update_progress(self, fraction: float = None, message: str = None, details: Dict[str, Any] = None):
+        """
+        Report progress from inside the job
+
+        Args:
+            fraction: Completed fraction between 0 and 1
+            message: Short status message
+            details: Extra state to merge into job.details
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Job '{self.name}' was cancelled")
+        if fraction is not None:
+            self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if details:
+            self.details.update(details)
+
+    def cancel(self):
+        """Request cancellation (queued jobs never start, running jobs stop at the next progress report)"""
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.status = CANCELLED
+            self.message = "Cancelled"
+            self.finished_at = time.time()
+
+class JobManager:
+    """
+    Runs jobs on thread pools shared by all sessions
+
+    Each kind of job (ingestion, analysis, export) can get a pool of its own,
+    so a queue of slow jobs of one kind does not hold up the others; jobs
+    without a pool run on the default pool.
+
+    Jobs submitted with a memo_key are deduplicated: while a job with the same
+    key is queued, running or finished successfully, the existing job is
+    returned instead of starting new work.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 200, pools: Dict[str, int] = None):
+        """
+        Initialize the JobManager
+
+        Args:
+            max_workers: Number of worker threads of the default pool
+            max_jobs: Number of jobs kept for status queries and memoization
+            pools: Number of worker threads of each named pool
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_jobs = max_jobs
+        self._executors = {DEFAULT_POOL: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")}
+        for pool, workers in (pools or {}).items():
+            self._executors[pool] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"job-{pool}")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._memo: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, name: str = None, memo_key: str = None, pool: str = DEFAULT_POOL,
+               **kwargs) -> Job:
+        """
+        Submit work to run in the background
+
+        The callable is invoked as fn(*args, progress_callback=job.update_progress, **kwargs)
+        in a copy of the caller's context, so context variables such as the
+        session's profiling switch carry over to the worker thread.
+
+        Args:
+            fn: Callable to run
+            name: Human readable job name
+            memo_key: Optional key used to reuse an existing job and its result
+            pool: Name of the pool to run on (the default pool if it is not configured)
+
+        Returns:
+            The submitted (or reused) Job
+        """
+        with self._lock:
+            if memo_key and memo_key in self._memo:
+                existing = self._jobs.get(self._memo[memo_key])
+                if existing is not None and existing.status in (PENDING, RUNNING, DONE):
+                    record_cache_lookup('jobs', True)
+                    return existing
+            if memo_key:
+                record_cache_lookup('jobs', False)
+
+            job = Job(name or getattr(fn, '__name__', 'job'), memo_key)
+            self._jobs[job.id] = job
+            if memo_key:
+                self._memo[memo_key] = job.id
+            self._prune()
+
+            executor = self._executors.get(pool, self._executors[DEFAULT_POOL])
+            job.future = executor.submit(contextvars.copy_context().run, self._run, job, fn, args, kwargs)
+            self.logger.info(f"Job {job.id[:8]} ({job.name}) submitted")
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, memo_key: str) -> Optional[Job]:
+        """Get the job registered under a memo key"""
+        with self._lock:
+            job_id = self._memo.get(memo_key)
+            return self._jobs.get(job_id) if job_id else None
+
+    def forget(self, memo_key: str):
+        """Drop a memoized result so the next submit with this key runs again"""
+        with self._lock:
+            self._memo.pop(memo_key, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job
+
+        Returns:
+            True if the job exists and was still active
+        """
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.cancel()
+        return True
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        if job.cancel_requested:
+            job.status = CANCELLED
+            return None
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.message = "Running"
+        try:
+            job.result = fn(*args, progress_callback=job.update_progress, **kwargs)
+            job.status = DONE
+            job.progress = 1.0
+            job.message = "Done"
+            self.logger.info(f"Job {job.id[:8]} ({job.name}) finished in {time.time() - job.started_at:.2f}s")
+        except JobCancelled:
+            job.status = CANCELLED
+            job.message = "Cancelled"
+            self.logger.info(f"Job {job.id[:8]} ({job.name}) cancelled")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            job.message = "Failed"
+            self.logger.error(f"Job {job.id[:8]} ({job.name}) failed: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+        return job.result
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if job.active:
+                continue
+            del self._jobs[job_id]
+            if job.memo_key and self._memo.get(job.memo_key) == job_id:
+                del self._memo[job.memo_key]
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """
+    Get the process-wide job manager, creating it from config on first use
+
+    Returns:
+        Shared JobManager instance
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                max_workers=get_setting('performance.jobs.max_workers', 2),
+                max_jobs=get_setting('performance.jobs.max_jobs', 200),
+                pools=get_setting('performance.jobs.pools', {'ingest': 4, 'analysis': 4, 'export': 2})
+            )
+        return _manager
@@ -0,0 +1,244 @@
+"""
+Metrics Module
+In-process counters, histograms and stage timers exposed in Prometheus text format
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple, List, Any, Iterable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2, 1024 ** 3)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_key: Tuple[Tuple[str, str], ...], extra: Dict[str, str] = None) -> str:
+    pairs = list(label_key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def size_class(size_bytes: int) -> str:
+    """Bucket a file size into a coarse label for per-size-class latency histograms"""
+    mb = size_bytes / (1024 * 1024)
+    if mb < 1:
+        return "<1MB"
+    if mb < 10:
+        return "1-10MB"
+    if mb < 100:
+        return "10-100MB"
+    return ">=100MB"
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'labels': dict(k), 'value': v} for k, v in self._values.items()]
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            for key, value in self._values.items():
+                yield f"{self.name}{_format_labels(key)} {value}"
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'labels': dict(k), 'count': s['count'], 'sum': s['sum'],
+                     'mean': s['sum'] / s['count'] if s['count'] else 0.0}
+                    for k, s in self._series.items()]
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series['counts']):
+                    yield f"{self.name}_bucket{_format_labels(key, {'le': repr(float(bound))})} {count}"
+                yield f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series['count']}"
+                yield f"{self.name}_sum{_format_labels(key)} {series['sum']}"
+                yield f"{self.name}_count{_format_labels(key)} {series['count']}"
+
+class MetricsRegistry:
+    """Registry of named metrics"""
+
+    def __init__(self, namespace: str = "dataagent"):
+        self.namespace = namespace
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Get or create a counter"""
+        return self._get_or_create(name, lambda full: Counter(full, help_text))
+
+    def histogram(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_create(name, lambda full: Histogram(full, help_text, buckets))
+
+    def _get_or_create(self, name: str, factory):
+        full_name = f"{self.namespace}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = factory(full_name)
+                self._metrics[full_name] = metric
+            return metric
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        """
+        Time a pipeline stage
+
+        Records dataagent_stage_duration_seconds and dataagent_stage_calls_total
+        with the stage name, the given labels and the outcome.
+        """
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.histogram('stage_duration_seconds', "Duration of pipeline stages").observe(
+                elapsed, stage=stage, **labels)
+            self.counter('stage_calls_total', "Calls of pipeline stages").inc(
+                stage=stage, status=status, **labels)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Get a flat list of metric samples for display"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        rows = []
+        for metric in metrics:
+            for sample in metric.samples():
+                labels = ", ".join(f"{k}={v}" for k, v in sample['labels'].items())
+                row = {'metric': metric.name, 'labels': labels}
+                if metric.kind == 'counter':
+                    row['value'] = sample['value']
+                else:
+                    row.update({'count': sample['count'], 'sum': round(sample['sum'], 4),
+                                'mean': round(sample['mean'], 4)})
+                rows.append(row)
+        return rows
+
+_registry = MetricsRegistry()
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return _registry
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache lookup as a hit or miss"""
+    _registry.counter('cache_requests_total', "Cache lookups by cache and result").inc(
+        cache=cache, result='hit' if hit else 'miss')
+
+def timed(stage: str):
+    """Decorator that records a function call as a pipeline stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _registry.timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('/metrics', ''):
+            self.send_error(404)
+            return
+        body = _registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1") -> bool:
+    """
+    Serve /metrics on a local port from a daemon thread (idempotent)
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind (local only by default)
+
+    Returns:
+        True if the server is running
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Metrics endpoint not started on {host}:{port}: {str(e)}")
+            return False
+        thread = threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        logging.getLogger(__name__).info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return True
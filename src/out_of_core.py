@@ -0,0 +1,356 @@
+"""
+Out-of-Core Module
+Large tabular uploads converted once to partitioned Parquet and queried with pushed-down scans
+"""
+
+import os
+import json
+import shutil
+import uuid
+import logging
+import threading
+from typing import Dict, Any, List, Iterator, Callable
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.parquet as pq
+except ImportError:  # Out-of-core mode requires pyarrow
+    pa = None
+    pa_dataset = None
+    pq = None
+
+try:
+    import duckdb
+except ImportError:  # Aggregates and queries fall back to Arrow scans
+    duckdb = None
+
+MANIFEST_FILE = "_manifest.json"
+
+def out_of_core_available() -> bool:
+    """Check whether the Parquet backend is installed"""
+    return pq is not None
+
+def _target_dtype(series: pd.Series) -> str:
+    """Pandas dtype used for a column in every partition, so all parts share one schema"""
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(series):
+        return 'Int64'
+    if pd.api.types.is_float_dtype(series):
+        return 'float64'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime64[ns]'
+    return 'string'
+
+def _normalize_chunk(chunk: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Cast a chunk to the partition dtypes, widening a column to float or text when a later chunk needs it"""
+    for col, dtype in list(dtypes.items()):
+        try:
+            chunk[col] = chunk[col].astype(dtype)
+        except (TypeError, ValueError):
+            widened = 'float64' if dtype in ('Int64', 'boolean') else 'string'
+            try:
+                chunk[col] = chunk[col].astype(widened)
+            except (TypeError, ValueError):
+                widened = 'string'
+                chunk[col] = chunk[col].astype(widened)
+            dtypes[col] = widened
+    return chunk
+
+class ParquetDataset:
+    """
+    Tabular dataset stored as Parquet partitions on disk
+
+    Only metadata is held in memory. Previews read single partitions,
+    aggregates run through DuckDB (or streamed Arrow batches when DuckDB is
+    not installed) with column projection, so memory use does not depend on
+    the size of the file.
+    """
+
+    def __init__(self, path: str, name: str = None):
+        """
+        Open a converted dataset
+
+        Args:
+            path: Directory holding the part files and the manifest
+            name: Original file name
+        """
+        if pq is None:
+            raise ValueError("Out-of-core mode requires pyarrow")
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.name = name or self.manifest.get('name')
+        self.parts = [os.path.join(path, part['file']) for part in self.manifest['parts']]
+        self.part_rows = [part['rows'] for part in self.manifest['parts']]
+        self.schema = pq.read_schema(os.path.join(path, '_common_metadata'))
+        self._dataset = pa_dataset.dataset(self.parts, schema=self.schema, format='parquet')
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, source, path: str, name: str, chunk_rows: int = 250000, encoding: str = 'utf-8',
+                 read_options: Dict[str, Any] = None,
+                 progress_callback: Callable[[int], None] = None) -> "ParquetDataset":
+        """
+        Convert a CSV file to Parquet partitions, one per chunk of rows
+
+        A previous conversion of the same content (same path) is reused.
+
+        Args:
+            source: Binary file object or path of the CSV file
+            path: Output directory (normally derived from the file fingerprint)
+            name: Original file name
+            chunk_rows: Rows per partition
+            encoding: Text encoding of the CSV
+            read_options: Extra read_csv options such as the delimiter ('sep') and
+                header=None for headerless files
+            progress_callback: Called with the number of rows converted so far
+
+        Returns:
+            ParquetDataset over the converted partitions
+        """
+        if pq is None:
+            raise ValueError("Out-of-core mode requires pyarrow")
+        if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            return cls(path, name)
+
+        logger = logging.getLogger(__name__)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.partial"
+        os.makedirs(tmp_path)
+
+        try:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            dtypes, parts, rows = None, [], 0
+            for i, chunk in enumerate(pd.read_csv(source, encoding=encoding, chunksize=chunk_rows,
+                                                       **(read_options or {}))):
+                if read_options and read_options.get('header', 'infer') is None:
+                    # Parquet column names are strings
+                    chunk.columns = [str(col) for col in chunk.columns]
+                if dtypes is None:
+                    dtypes = {col: _target_dtype(chunk[col]) for col in chunk.columns}
+                chunk = _normalize_chunk(chunk, dtypes)
+                file_name = f"part-{i:05d}.parquet"
+                pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False),
+                               os.path.join(tmp_path, file_name))
+                parts.append({'file': file_name, 'rows': len(chunk)})
+                rows += len(chunk)
+                if progress_callback:
+                    progress_callback(rows)
+
+            if dtypes is None:
+                raise ValueError("CSV file contains no rows")
+
+            # Columns widened by later chunks are cast on read through the common schema
+            schema = pa.Schema.from_pandas(pd.DataFrame({col: pd.Series(dtype=dtype)
+                                                         for col, dtype in dtypes.items()}),
+                                           preserve_index=False)
+            pq.write_metadata(schema, os.path.join(tmp_path, '_common_metadata'))
+            with open(os.path.join(tmp_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'name': name, 'rows': rows, 'parts': parts}, f)
+
+            if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+                # Another session finished converting the same file first
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                return cls(path, name)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+            logger.info(f"Converted {name} to {len(parts)} Parquet partitions ({rows} rows)")
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        return cls(path, name)
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self.schema.names)
+
+    @property
+    def dtypes(self) -> pd.Series:
+        return self.schema.empty_table().to_pandas().dtypes
+
+    @property
+    def shape(self):
+        return (len(self), len(self.schema.names))
+
+    def __len__(self) -> int:
+        return int(self.manifest['rows'])
+
+    def memory_usage(self) -> int:
+        """Resident size (only metadata is kept in memory)"""
+        return 0
+
+    def disk_usage(self) -> int:
+        """Size of the Parquet partitions on disk"""
+        return sum(os.path.getsize(part) for part in self.parts)
+
+    def cleanup(self):
+        """Delete the converted partitions (called when the store drops the dataset)"""
+        shutil.rmtree(self.path)
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """First n rows, read from the leading partitions only"""
+        return self.slice(0, n)
+
+    def slice(self, offset: int, limit: int, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Read a range of rows without scanning the whole dataset
+
+        Args:
+            offset: Index of the first row
+            limit: Number of rows
+            columns: Columns to read (all when omitted)
+
+        Returns:
+            DataFrame with the requested rows
+        """
+        tables, start = [], 0
+        for part, rows in zip(self.parts, self.part_rows):
+            end = start + rows
+            if end > offset and start < offset + limit:
+                table = pq.read_table(part, columns=columns, schema=self.schema)
+                tables.append(table.slice(max(offset - start, 0), offset + limit - max(start, offset)))
+            start = end
+            if start >= offset + limit:
+                break
+
+        if not tables:
+            return self.schema.empty_table().to_pandas() if columns is None else \
+                self.schema.empty_table().select(columns).to_pandas()
+        frame = pa.concat_tables(tables).to_pandas()
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        return frame
+
+    def iter_batches(self, columns: List[str] = None, batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """Stream the dataset as DataFrames, reading only the given columns"""
+        for batch in self._dataset.to_batches(columns=columns, batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def read_columns(self, columns: List[str]):
+        """Read whole columns as an Arrow table (only those columns are scanned)"""
+        return self._dataset.to_table(columns=columns)
+
+    def take(self, rows) -> pd.DataFrame:
+        """Rows at the given positions, reading only the row groups that contain them"""
+        if len(rows) == 0:
+            return self.head(0)
+        return self._dataset.take(pa.array(rows, type=pa.int64())).to_pandas()
+
+    def sample(self, n: int = 10000) -> pd.DataFrame:
+        """Evenly spaced rows across the dataset (for plots that need raw values)"""
+        if len(self) <= n:
+            return self._dataset.to_table().to_pandas()
+        indices = np.linspace(0, len(self) - 1, n).astype(np.int64)
+        return self._dataset.take(pa.array(indices)).to_pandas()
+
+    def missing_counts(self) -> Dict[str, int]:
+        """Null count per column, read from the Parquet row group statistics where available"""
+        counts = {name: 0 for name in self.schema.names}
+        unknown = set()
+        for part in self.parts:
+            metadata = pq.ParquetFile(part).metadata
+            for i in range(metadata.num_row_groups):
+                row_group = metadata.row_group(i)
+                for j in range(row_group.num_columns):
+                    column = row_group.column(j)
+                    statistics = column.statistics
+                    if statistics is None or not statistics.has_null_count:
+                        unknown.add(column.path_in_schema)
+                    elif column.path_in_schema in counts:
+                        counts[column.path_in_schema] += statistics.null_count
+
+        if unknown:
+            columns = [col for col in self.schema.names if col in unknown]
+            for col in columns:
+                counts[col] = 0
+            for frame in self.iter_batches(columns=columns):
+                for col in columns:
+                    counts[col] += int(frame[col].isnull().sum())
+        return counts
+
+    def numeric_columns(self) -> List[str]:
+        return [field.name for field in self.schema
+                if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)]
+
+    def describe_numeric(self) -> pd.DataFrame:
+        """
+        Summary statistics of the numeric columns in the layout of DataFrame.describe()
+
+        Uses DuckDB (with approximate quartiles) when installed, otherwise one
+        streamed pass over the numeric columns computing count, mean, std, min and
+        max, with per-batch means and squared deviations merged by Chan's formula.
+        """
+        columns = self.numeric_columns()
+        if not columns:
+            return pd.DataFrame()
+
+        if duckdb is not None:
+            selects = []
+            for col in columns:
+                quoted = '"' + col.replace('"', '""') + '"'
+                selects.append(
+                    f"SELECT '{col.replace(chr(39), chr(39) * 2)}' AS column_name, count({quoted}) AS count, "
+                    f"avg({quoted}) AS mean, stddev_samp({quoted}) AS std, min({quoted}) AS min, "
+                    f"approx_quantile({quoted}, 0.25) AS \"25%\", approx_quantile({quoted}, 0.5) AS \"50%\", "
+                    f"approx_quantile({quoted}, 0.75) AS \"75%\", max({quoted}) AS max FROM data")
+            result = self.query(" UNION ALL ".join(selects))
+            return result.set_index('column_name').T.astype(float)
+
+        stats = {col: {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': np.inf, 'max': -np.inf} for col in columns}
+        for frame in self.iter_batches(columns=columns):
+            for col in columns:
+                values = frame[col].dropna().astype(float)
+                if values.empty:
+                    continue
+                s = stats[col]
+                batch_count = len(values)
+                batch_mean = float(values.mean())
+                count = s['count'] + batch_count
+                delta = batch_mean - s['mean']
+                s['mean'] += delta * batch_count / count
+                s['m2'] += float(((values - batch_mean) ** 2).sum()) + delta * delta * s['count'] * batch_count / count
+                s['count'] = count
+                s['min'] = min(s['min'], float(values.min()))
+                s['max'] = max(s['max'], float(values.max()))
+
+        summary = {}
+        for col, s in stats.items():
+            count = s['count']
+            summary[col] = {'count': count, 'mean': s['mean'] if count else np.nan,
+                            'std': np.sqrt(s['m2'] / (count - 1)) if count > 1 else np.nan,
+                            'min': s['min'] if count else np.nan, 'max': s['max'] if count else np.nan}
+        return pd.DataFrame(summary)
+
+    def query(self, sql: str, params: list = None) -> pd.DataFrame:
+        """
+        Run a SQL query over the dataset with DuckDB
+
+        The dataset is available as the table `data`; filters and column
+        selections are pushed down into the Parquet scan.
+
+        Args:
+            sql: SQL query
+            params: Values for the query's ? placeholders
+
+        Returns:
+            Query result as a DataFrame
+        """
+        if duckdb is None:
+            raise ValueError("SQL queries on large datasets require duckdb")
+        with self._lock:
+            connection = duckdb.connect()
+            try:
+                connection.register('data', self._dataset)
+                return connection.execute(sql, params or []).fetchdf()
+            finally:
+                connection.close()
+
+def parquet_path(fingerprint: str, base_dir: str) -> str:
+    """Directory of the Parquet conversion of a file"""
+    return os.path.join(base_dir, fingerprint)
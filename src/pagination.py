@@ -0,0 +1,349 @@
+"""
+Pagination Module
+Server-side paging, sorting and filtering of stored datasets for the preview, with a shared page cache
+"""
+
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from dataset_collection import DatasetCollection
+from metrics import record_cache_lookup
+from out_of_core import ParquetDataset, duckdb
+from settings import get_setting
+from text_document import TextDocument
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Only used for out-of-core views when DuckDB is not installed
+    pa = None
+    pc = None
+
+class _LRU:
+    """Small thread-safe LRU mapping"""
+
+    def __init__(self, max_items: int, on_evict: Callable[[Any, Any], None] = None):
+        self.max_items = max_items
+        self.on_evict = on_evict
+        self._items: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            evicted = []
+            while len(self._items) > self.max_items:
+                evicted.append(self._items.popitem(last=False))
+        if self.on_evict:
+            for item in evicted:
+                self.on_evict(*item)
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._items.items())
+            self._items.clear()
+        if self.on_evict:
+            for item in evicted:
+                self.on_evict(*item)
+
+class PagedView:
+    """
+    Row order of a stored dataset for a given sort order and filter
+
+    A view keeps no copy of the data. For in-memory datasets it holds the
+    positions of the filtered rows in sort order (or nothing when the view
+    is unsorted and unfiltered), and each page takes its rows from the stored
+    frame. Out-of-core datasets push sorting, filtering and LIMIT/OFFSET
+    down to DuckDB, or read only the sort and filter columns with Arrow when
+    DuckDB is not installed.
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, DatasetCollection, ParquetDataset], sort_by: str = None,
+                 ascending: bool = True, filter_column: str = None, filter_value: str = None):
+        """
+        Initialize the PagedView
+
+        Args:
+            data: Stored tabular dataset
+            sort_by: Column to sort by
+            ascending: Sort direction
+            filter_column: Column to filter on
+            filter_value: Substring (text columns) or value (numeric columns) to keep
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.filter_column = filter_column if filter_value not in (None, '') else None
+        self.filter_value = filter_value
+        self._indices = None
+        self._total = None
+        self._data_rows = len(data)
+
+        if isinstance(data, ParquetDataset):
+            self._parquet = data
+            if duckdb is None:
+                self._prepare_parquet_arrow(data)
+        else:
+            self._parquet = None
+            self._prepare_frame(data)
+
+    @property
+    def total_rows(self) -> int:
+        if self._total is None:
+            self._total = self._count_parquet()
+        return self._total
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory held by the view (its row positions)"""
+        return 0 if self._indices is None else int(self._indices.nbytes)
+
+    def page(self, data, page_index: int, page_size: int) -> pd.DataFrame:
+        """
+        Get one page of rows
+
+        Args:
+            data: The dataset the view was built from (as currently held by the store)
+            page_index: Zero-based page number
+            page_size: Rows per page
+
+        Returns:
+            DataFrame indexed by row position in the view
+        """
+        offset = page_index * page_size
+        if isinstance(data, ParquetDataset) and duckdb is not None:
+            frame = self._query_parquet(data, offset, page_size)
+        elif isinstance(data, ParquetDataset):
+            if self._indices is None:
+                frame = data.slice(offset, page_size)
+            else:
+                frame = data.take(self._indices[offset:offset + page_size])
+        else:
+            if self._indices is None:
+                positions = np.arange(offset, min(offset + page_size, self._total), dtype=np.int64)
+            else:
+                positions = self._indices[offset:offset + page_size]
+            if isinstance(data, DatasetCollection):
+                frame = data.take(positions)
+            else:
+                frame = data.iloc[positions]
+
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        return frame
+
+    @staticmethod
+    def _column(data, name: str) -> pd.Series:
+        values = data.column(name) if isinstance(data, DatasetCollection) else data[name]
+        return values.reset_index(drop=True)
+
+    def _mask(self, column: pd.Series) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            try:
+                return (column == float(self.filter_value)).to_numpy()
+            except ValueError:
+                pass
+        text = column.astype(str).where(column.notna(), '')
+        return text.str.contains(re.escape(self.filter_value), case=False, regex=True).to_numpy()
+
+    def _prepare_frame(self, data):
+        """Compute the filtered rows in sort order from the stored frame, one column at a time"""
+        positions = None
+        if self.filter_column:
+            positions = np.flatnonzero(self._mask(self._column(data, self.filter_column)))
+        if self.sort_by:
+            column = self._column(data, self.sort_by)
+            if positions is not None:
+                column = column.iloc[positions]
+            try:
+                ordered = column.sort_values(ascending=self.ascending, kind='stable', na_position='last')
+            except TypeError:
+                # Mixed types (e.g. numbers and strings in one object column) sort as text
+                ordered = column.astype(str).where(column.notna()).sort_values(
+                    ascending=self.ascending, kind='stable', na_position='last')
+            positions = ordered.index.to_numpy(dtype=np.int64)
+        self._indices = positions
+        self._total = self._data_rows if positions is None else len(positions)
+
+    def _arrow_mask(self, column):
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            try:
+                return pc.fill_null(pc.equal(column, pa.scalar(float(self.filter_value))), False)
+            except ValueError:
+                pass
+        text = pc.cast(column, pa.string())
+        return pc.fill_null(pc.match_substring(text, self.filter_value, ignore_case=True), False)
+
+    def _prepare_parquet_arrow(self, data: ParquetDataset):
+        """Without DuckDB, read only the sort and filter columns and page through row indices"""
+        columns = [c for c in {self.sort_by, self.filter_column} if c]
+        if not columns:
+            self._total = len(data)
+            return
+        table = data.read_columns(columns)
+        table = table.append_column('__row', pa.array(np.arange(table.num_rows, dtype=np.int64)))
+        if self.filter_column:
+            table = table.filter(self._arrow_mask(table[self.filter_column]))
+        if self.sort_by:
+            order = 'ascending' if self.ascending else 'descending'
+            table = table.take(pc.sort_indices(table, sort_keys=[(self.sort_by, order)], null_placement='at_end'))
+        self._indices = table['__row'].to_numpy()
+        self._total = table.num_rows
+
+    def _where_clause(self, data: ParquetDataset) -> Tuple[str, list]:
+        if not self.filter_column:
+            return "", []
+        quoted = '"' + self.filter_column.replace('"', '""') + '"'
+        if self.filter_column in data.numeric_columns():
+            try:
+                return f" WHERE {quoted} = ?", [float(self.filter_value)]
+            except ValueError:
+                pass
+        return f" WHERE CAST({quoted} AS VARCHAR) ILIKE ?", [f"%{self.filter_value}%"]
+
+    def _count_parquet(self) -> int:
+        where, params = self._where_clause(self._parquet)
+        if not where:
+            return len(self._parquet)
+        return int(self._parquet.query(f"SELECT count(*) AS n FROM data{where}", params)['n'].iloc[0])
+
+    def _query_parquet(self, data: ParquetDataset, offset: int, limit: int) -> pd.DataFrame:
+        where, params = self._where_clause(data)
+        if not where and not self.sort_by:
+            return data.slice(offset, limit)
+        order = ""
+        if self.sort_by:
+            quoted = '"' + self.sort_by.replace('"', '""') + '"'
+            order = f" ORDER BY {quoted} {'ASC' if self.ascending else 'DESC'} NULLS LAST"
+        return data.query(f"SELECT * FROM data{where}{order} LIMIT {int(limit)} OFFSET {int(offset)}", params)
+
+class PageCache:
+    """
+    Process-wide cache of preview pages
+
+    Views (row positions in sort order) and rendered pages are cached per
+    dataset key, so paging back and forth or several sessions viewing the
+    same dataset reuse earlier work. The memory held by cached views is
+    counted against the dataset store's budget.
+    """
+
+    def __init__(self, max_views: int = 16, max_pages: int = 256, store=None):
+        """
+        Initialize the PageCache
+
+        Args:
+            max_views: Number of views (sort order and filter per dataset) kept
+            max_pages: Number of rendered pages kept
+            store: DatasetStore the views' memory is counted against (the shared store by default)
+        """
+        self._store = store
+        self._views = _LRU(max_views, on_evict=self._release_view)
+        self._pages = _LRU(max_pages)
+
+    @property
+    def store(self):
+        if self._store is None:
+            from dataset_store import get_dataset_store
+            self._store = get_dataset_store()
+        return self._store
+
+    def _release_view(self, view_key, view):
+        self.store.untrack_memory(f"preview:{view_key}")
+
+    def get_page(self, dataset_key: str, data, page_index: int, page_size: int, sort_by: str = None,
+                 ascending: bool = True, filter_column: str = None,
+                 filter_value: str = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Get a page of a dataset
+
+        Args:
+            dataset_key: Key of the dataset in the store
+            data: The dataset
+            page_index: Zero-based page number
+            page_size: Rows per page
+            sort_by: Column to sort by
+            ascending: Sort direction
+            filter_column: Column to filter on
+            filter_value: Value to filter for
+
+        Returns:
+            Tuple of (page DataFrame, total rows in the view)
+        """
+        view_key = (dataset_key, sort_by, ascending, filter_column, filter_value or None)
+        page_key = view_key + (page_index, page_size)
+
+        cached = self._pages.get(page_key)
+        record_cache_lookup('preview_page', cached is not None)
+        if cached is not None:
+            return cached
+
+        view = self._views.get(view_key)
+        if view is None:
+            view = PagedView(data, sort_by, ascending, filter_column, filter_value)
+            self._views.put(view_key, view)
+            if view.memory_bytes:
+                self.store.track_memory(f"preview:{view_key}", view.memory_bytes)
+
+        result = (view.page(data, page_index, page_size), view.total_rows)
+        self._pages.put(page_key, result)
+        return result
+
+    def clear(self):
+        self._views.clear()
+        self._pages.clear()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_page_cache() -> PageCache:
+    """
+    Get the process-wide page cache, creating it from config on first use
+
+    Returns:
+        Shared PageCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache(
+                max_views=get_setting('performance.preview.max_views', 16),
+                max_pages=get_setting('performance.preview.max_pages', 256)
+            )
+        return _cache
+
+def text_page(text: Union[str, TextDocument], page_index: int, lines_per_page: int) -> Tuple[str, int]:
+    """
+    Get one page of lines from extracted text
+
+    Args:
+        text: Full text, or an indexed document (only the chunks holding the page are decoded)
+        page_index: Zero-based page number
+        lines_per_page: Lines per page
+
+    Returns:
+        Tuple of (page text, total number of lines)
+    """
+    if isinstance(text, TextDocument):
+        first = page_index * lines_per_page
+        return text.read_lines(first, first + lines_per_page), text.line_count
+
+    starts = [0] + [m.end() for m in re.finditer('\n', text)]
+    total = len(starts)
+    first = page_index * lines_per_page
+    if first >= total:
+        return "", total
+    last = first + lines_per_page
+    end = starts[last] if last < total else len(text)
+    return text[starts[first]:end], total
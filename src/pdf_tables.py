@@ -0,0 +1,239 @@
+"""
+PDF Tables Module
+Table and text extraction from PDFs, run page by page on a pool of worker processes, with tables continued across page breaks merged into DataFrames
+"""
+
+import re
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
+import pandas as pd
+import pdfplumber
+
+from settings import get_setting
+
+def _extract_page_range(path: str, first_page: int, last_page: int,
+                        table_settings: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    Detect the tables and extract the text of a range of pages (runs in a worker process)
+
+    Args:
+        path: Path of the PDF file
+        first_page: Index of the first page
+        last_page: Index after the last page
+        table_settings: pdfplumber table settings
+
+    Returns:
+        One dict per page with 'page', 'height', 'text' and 'tables' (each
+        with 'rows', 'top' and 'bottom')
+    """
+    pages = []
+    with pdfplumber.open(path) as pdf:
+        for index in range(first_page, last_page):
+            page = pdf.pages[index]
+            tables = []
+            for table in page.find_tables(table_settings or {}):
+                rows = table.extract()
+                if rows:
+                    tables.append({'rows': rows, 'top': table.bbox[1], 'bottom': table.bbox[3]})
+            pages.append({'page': index, 'height': page.height, 'text': page.extract_text() or '', 'tables': tables})
+            page.flush_cache()  # Release the parsed page objects as we go
+    return pages
+
+def _clean_cell(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = re.sub(r'\s+', ' ', str(value)).strip()
+    return value or None
+
+def _same_header(row: List[Any], header: List[Any]) -> bool:
+    return [_clean_cell(v) for v in row] == [_clean_cell(v) for v in header]
+
+def merge_tables(pages: List[Dict[str, Any]], margin: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Join tables that continue across page breaks
+
+    A table continues the previous one when it starts near the top of the
+    page right after a page whose last table ended near the bottom and both
+    have the same number of columns. A header repeated on the continuation
+    page is dropped.
+
+    Args:
+        pages: Page results in page order (see _extract_page_range)
+        margin: Fraction of the page height counted as "near" the top or bottom
+
+    Returns:
+        Tables with 'rows', 'first_page' and 'last_page'
+    """
+    merged = []
+    previous_end = None  # (page, ended near bottom) of the last table
+
+    for page in pages:
+        for position, table in enumerate(page['tables']):
+            rows = table['rows']
+            width = max(len(r) for r in rows)
+            starts_at_top = position == 0 and table['top'] <= page['height'] * margin
+
+            last = merged[-1] if merged else None
+            if (last is not None and starts_at_top and previous_end == (page['page'] - 1, True)
+                    and last['width'] == width):
+                if _same_header(rows[0], last['rows'][0]):
+                    rows = rows[1:]
+                last['rows'].extend(rows)
+                last['last_page'] = page['page']
+            else:
+                merged.append({'rows': list(rows), 'width': width,
+                               'first_page': page['page'], 'last_page': page['page']})
+
+            is_last_on_page = position == len(page['tables']) - 1
+            ends_at_bottom = table['bottom'] >= page['height'] * (1 - margin)
+            previous_end = (page['page'], is_last_on_page and ends_at_bottom)
+    return merged
+
+def _numeric(column: pd.Series, threshold: float = 0.9) -> pd.Series:
+    """Convert a text column to numbers when nearly all of its values are numeric"""
+    values = column.dropna()
+    if values.empty:
+        return column
+    cleaned = column.str.replace(r'[,\s]', '', regex=True).str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+    converted = pd.to_numeric(cleaned, errors='coerce')
+    if converted.notna().sum() >= threshold * len(values):
+        return converted
+    return column
+
+def table_to_frame(rows: List[List[Any]]) -> Optional[pd.DataFrame]:
+    """
+    Build a DataFrame from extracted table rows
+
+    The first row is the header. Empty rows and columns are dropped and
+    numeric-looking columns are converted to numbers.
+
+    Args:
+        rows: Table rows as lists of cell strings (None for empty cells)
+
+    Returns:
+        DataFrame, or None if the table has no body rows
+    """
+    width = max(len(r) for r in rows)
+    rows = [[_clean_cell(v) for v in r] + [None] * (width - len(r)) for r in rows]
+    rows = [r for r in rows if any(v is not None for v in r)]
+    if len(rows) < 2:
+        return None
+
+    header, seen = [], {}
+    for i, name in enumerate(rows[0]):
+        name = name or f"column_{i + 1}"
+        seen[name] = seen.get(name, 0) + 1
+        header.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+
+    frame = pd.DataFrame(rows[1:], columns=header)
+    frame = frame.dropna(axis=1, how='all')
+    for col in frame.columns:
+        frame[col] = _numeric(frame[col])
+    return frame
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit the server's threads and locks
+            _pool = ProcessPoolExecutor(
+                max_workers=get_setting('file_processing.pdf.max_workers', 4),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor, futures: List[Future], terminate: bool = False):
+    """
+    Replace a broken or stuck pool with a fresh one on next use
+
+    Args:
+        pool: The pool to discard
+        futures: Tasks submitted to it that are no longer wanted (cancelled if not started)
+        terminate: Also kill its workers (shutdown alone leaves a hung task running)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    processes = list((getattr(pool, '_processes', None) or {}).values()) if terminate else []
+    # shutdown(cancel_futures=True) needs Python 3.9
+    for future in futures:
+        future.cancel()
+    pool.shutdown(wait=False)
+    for process in processes:
+        process.terminate()
+
+def _extract_parallel(path: str, ranges: List[tuple], table_settings: Dict[str, Any],
+                      timeout: float) -> List[Dict[str, Any]]:
+    """Run the page ranges on the shared pool, retrying once on a fresh pool if a worker died"""
+    logger = logging.getLogger(__name__)
+    for attempt in range(2):
+        pool = _get_pool()
+        futures = []
+        try:
+            futures = [pool.submit(_extract_page_range, path, first, last, table_settings) for first, last in ranges]
+            return [page for future in futures for page in future.result(timeout=timeout)]
+        except BrokenProcessPool:
+            _discard_pool(pool, futures)
+            if attempt:
+                raise
+            logger.warning("PDF worker pool broke, retrying on a new pool")
+        except FutureTimeout:
+            _discard_pool(pool, futures, terminate=True)
+            raise TimeoutError(f"PDF page extraction took longer than {timeout}s")
+
+def extract_pdf(path: str, pages_per_task: int = None, min_rows: int = None,
+                margin: float = None, table_settings: Dict[str, Any] = None,
+                timeout: float = None) -> Dict[str, Any]:
+    """
+    Extract the tables of a PDF as DataFrames, and its text
+
+    Pages are split into ranges that are processed in parallel worker
+    processes; short documents are processed in the calling process. A pool
+    whose worker died is replaced and the work retried once; a range that
+    does not finish within the timeout stops the extraction.
+
+    Args:
+        path: Path of the PDF file
+        pages_per_task: Pages handled by one worker task (file_processing.pdf.pages_per_task)
+        min_rows: Smallest number of body rows kept as a table (file_processing.pdf.min_table_rows)
+        margin: Page fraction near the top/bottom that marks a continued table
+        table_settings: pdfplumber table settings
+        timeout: Seconds to wait for one page range (file_processing.pdf.task_timeout_s)
+
+    Returns:
+        Dict with 'tables' (dicts with 'frame', 'first_page' and 'last_page',
+        1-based) and 'text' (the text of all pages)
+    """
+    logger = logging.getLogger(__name__)
+    pages_per_task = pages_per_task or get_setting('file_processing.pdf.pages_per_task', 8)
+    min_rows = min_rows or get_setting('file_processing.pdf.min_table_rows', 2)
+    margin = margin if margin is not None else get_setting('file_processing.pdf.continuation_margin', 0.15)
+    timeout = timeout or get_setting('file_processing.pdf.task_timeout_s', 300)
+
+    with pdfplumber.open(path) as pdf:
+        page_count = len(pdf.pages)
+
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    if len(ranges) <= 1:
+        pages = [page for first, last in ranges for page in _extract_page_range(path, first, last, table_settings)]
+    else:
+        pages = _extract_parallel(path, ranges, table_settings, timeout)
+
+    tables = []
+    for table in merge_tables(pages, margin):
+        frame = table_to_frame(table['rows'])
+        if frame is not None and len(frame) >= min_rows:
+            tables.append({'frame': frame, 'first_page': table['first_page'] + 1,
+                           'last_page': table['last_page'] + 1})
+
+    logger.info(f"Found {len(tables)} tables in {page_count} pages using {len(ranges)} tasks")
+    return {'tables': tables, 'text': "\n".join(page['text'] for page in pages if page['text'])}
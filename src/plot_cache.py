@@ -0,0 +1,152 @@
+"""
+Plot Cache Module
+Content-addressed cache of rendered plots keyed by dataset fingerprint, plot spec and render parameters
+"""
+
+import os
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable
+
+import matplotlib
+
+from metrics import record_cache_lookup
+from settings import get_setting
+from singleflight import SingleFlight, request_key
+
+class PlotCache:
+    """
+    Disk cache of plot images
+
+    Each plot is stored under a key derived from the dataset fingerprint,
+    the plot spec (kind, columns, options) and the render parameters, so the
+    same plot of the same data is rendered once and shared by every session,
+    and survives restarts. The least recently used files are evicted once the
+    cache grows beyond max_size_mb.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 500):
+        """
+        Initialize the PlotCache
+
+        Args:
+            cache_dir: Directory holding the plot files
+            max_size_mb: Total size above which old plots are evicted
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._renders = SingleFlight()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def key(self, fingerprint: str, spec: Dict[str, Any], render_params: Dict[str, Any]) -> str:
+        """Cache key of a plot"""
+        return request_key(fingerprint=fingerprint, spec=spec, render=render_params,
+                           matplotlib=matplotlib.__version__)
+
+    def get_or_render(self, fingerprint: str, spec: Dict[str, Any], render_params: Dict[str, Any],
+                      render: Callable[[str], None]) -> str:
+        """
+        Return the path of a cached plot, rendering it on a miss
+
+        Args:
+            fingerprint: Dataset fingerprint
+            spec: Plot kind, columns and options
+            render_params: Figure size, dpi and other rendering settings
+            render: Called with a temporary path to write the image to
+
+        Returns:
+            Path of the plot image
+        """
+        key = self.key(fingerprint, spec, render_params)
+        path = self._path(key)
+
+        with self._lock:
+            hit = key in self._files and os.path.exists(path)
+            if hit:
+                self._files.move_to_end(key)
+        record_cache_lookup('plots', hit)
+        if hit:
+            os.utime(path)  # Keeps the LRU order across restarts
+            return path
+
+        # Sessions asking for the same plot at once share one render
+        self._renders.do(key, lambda: self._render(key, path, render))
+        return path
+
+    def _render(self, key: str, path: str, render: Callable[[str], None]):
+        if os.path.exists(path):
+            return
+        # Render to a temporary file and rename so readers never see a partial image
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp.png"
+        try:
+            render(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        with self._lock:
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _scan(self):
+        """Index plots left by earlier runs, oldest first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp.png'):
+                os.unlink(path)
+            elif name.endswith('.png'):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_size_bytes and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+            self.logger.info(f"Evicted cached plot {key[:12]}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Number and total size of cached plots"""
+        with self._lock:
+            return {'plots': len(self._files), 'size_mb': round(self._total_bytes / 1024 ** 2, 2)}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_plot_cache() -> PlotCache:
+    """
+    Get the process-wide plot cache, creating it from config on first use
+
+    Returns:
+        Shared PlotCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PlotCache(
+                cache_dir=get_setting('performance.plot_cache.dir', os.path.join('data', 'cache', 'plots')),
+                max_size_mb=get_setting('performance.plot_cache.max_size_mb', 500)
+            )
+        return _cache
@@ -0,0 +1,227 @@
+"""
+Preflight Module
+Cheap inspection of an upload (size and first few KB) to validate it and choose an ingestion strategy before parsing
+"""
+
+import csv
+import io
+import codecs
+from typing import Dict, Any
+import pandas as pd
+
+from compression import open_compressed, detect_compression, data_file_type
+
+EAGER = 'eager'
+CHUNKED = 'chunked'
+OUT_OF_CORE = 'out_of_core'
+
+TEXT_TABULAR_TYPES = {'CSV', 'JSONL', 'NDJSON'}
+
+# Typical expansion of compressed text when the format does not record the original size
+COMPRESSION_RATIO_GUESS = 5
+
+def detect_encoding(sample: bytes) -> str:
+    """Pick the first of the supported encodings that decodes the sample"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ('utf-8', 'cp1252', 'latin-1'):
+        try:
+            # The sample may end in the middle of a multi-byte character
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value.replace(',', ''))
+        return True
+    except ValueError:
+        return False
+
+def sniff_header(text: str, delimiter: str, max_rows: int = 50) -> bool:
+    """
+    Decide whether the first row of delimited text is a header
+
+    A header is assumed unless the evidence against it is unambiguous:
+    every column whose body values are all numeric also has a numeric first
+    row (e.g. '1,2\\n3,4'). csv.Sniffer.has_header is not used because it
+    reports all-text headers such as 'name,city' as data.
+
+    Args:
+        text: Complete lines of the sample
+        delimiter: Field delimiter
+        max_rows: Body rows inspected
+
+    Returns:
+        True if the first row should be read as the header
+    """
+    rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row]
+    if len(rows) < 2:
+        return True
+    first, body = rows[0], rows[1:max_rows + 1]
+
+    numeric_columns = []
+    for i in range(len(first)):
+        values = [row[i].strip() for row in body if i < len(row) and row[i].strip()]
+        if values and all(_is_number(v) for v in values):
+            numeric_columns.append(i)
+
+    if not numeric_columns:
+        return True
+    # Blank first-row cells above numbers are unnamed header columns (e.g. a saved index)
+    return not all(first[i].strip() and _is_number(first[i].strip()) for i in numeric_columns)
+
+def _complete_lines(text: str) -> str:
+    """Drop the trailing partial line of a sample"""
+    cut = text.rfind('\n')
+    return text[:cut + 1] if cut >= 0 else text
+
+def sniff_upload(uploaded_file, sample_bytes: int = 64 * 1024, max_file_size_mb: float = None,
+                 eager_limit_mb: float = 64, out_of_core_limit_mb: float = 256,
+                 out_of_core_available: bool = True) -> Dict[str, Any]:
+    """
+    Inspect an upload without parsing it
+
+    Reads at most sample_bytes (decompressed) from the start of the file.
+    For delimited text it infers encoding, delimiter, header and column
+    types, and extrapolates the row count and in-memory size from the
+    sample's bytes per row.
+
+    Args:
+        uploaded_file: Uploaded file object
+        sample_bytes: Number of bytes inspected
+        max_file_size_mb: Uploads larger than this are rejected
+        eager_limit_mb: Estimated in-memory size up to which the file is loaded at once
+        out_of_core_limit_mb: Estimated in-memory size above which the file is processed out of core
+        out_of_core_available: Whether the out-of-core backend is installed
+
+    Returns:
+        Report dict with 'name', 'file_type', 'size_bytes', 'compression', 'strategy',
+        'warnings', 'error' (reason for rejection or None) and, for delimited text,
+        'encoding', 'delimiter', 'has_header', 'columns', 'dtypes', 'estimated_rows'
+        and 'estimated_memory_bytes'
+    """
+    size = getattr(uploaded_file, 'size', 0) or 0
+    report = {
+        'name': uploaded_file.name,
+        'file_type': data_file_type(uploaded_file.name),
+        'size_bytes': size,
+        'compression': detect_compression(uploaded_file),
+        'strategy': EAGER,
+        'warnings': [],
+        'error': None
+    }
+
+    # Archive members were checked as part of their archive
+    is_member = getattr(uploaded_file, 'source', None) is not None
+    if max_file_size_mb is not None and not is_member and size > max_file_size_mb * 1024 * 1024:
+        report['error'] = f"File is {size / 1024 ** 2:.1f} MB, above the {max_file_size_mb:g} MB limit"
+        return report
+
+    if report['compression'] == 'zip':
+        report['file_type'] = 'ZIP'
+        return report  # Members are checked when the archive is expanded
+
+    stream = open_compressed(uploaded_file)
+    uncompressed_size = getattr(stream, 'size', size) or size
+    if report['compression'] in ('bz2', 'xz'):
+        uncompressed_size = size * COMPRESSION_RATIO_GUESS
+        report['warnings'].append("Uncompressed size is estimated from a typical compression ratio")
+    report['uncompressed_bytes'] = uncompressed_size
+
+    if report['file_type'] not in TEXT_TABULAR_TYPES:
+        return report
+
+    try:
+        stream.seek(0)
+        sample = stream.read(sample_bytes)
+    finally:
+        if stream is not uploaded_file:
+            stream.close()
+        uploaded_file.seek(0)
+
+    if not sample.strip():
+        report['error'] = "File is empty"
+        return report
+
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=False)
+    truncated = len(sample) < uncompressed_size
+    lines_text = _complete_lines(text) if truncated else text
+    report['encoding'] = encoding
+
+    if report['file_type'] == 'CSV':
+        try:
+            dialect = csv.Sniffer().sniff(lines_text[:8192], delimiters=',;\t|')
+            delimiter = dialect.delimiter
+        except csv.Error:
+            delimiter = ','
+            report['warnings'].append("Delimiter could not be inferred, assuming ','")
+        has_header = sniff_header(lines_text, delimiter)
+        report['delimiter'] = delimiter
+        report['has_header'] = has_header
+
+        try:
+            frame = pd.read_csv(io.StringIO(lines_text), sep=delimiter, header=0 if has_header else None)
+        except Exception as e:
+            report['error'] = f"Sample could not be parsed as CSV: {str(e)}"
+            return report
+    else:
+        try:
+            frame = pd.read_json(io.StringIO(lines_text), lines=True)
+        except ValueError as e:
+            report['error'] = f"Sample could not be parsed as JSON lines: {str(e)}"
+            return report
+
+    if frame.empty:
+        report['warnings'].append("No complete rows in the sample")
+        return report
+
+    sample_rows = len(frame)
+    bytes_per_row = len(lines_text.encode(encoding, errors='replace')) / sample_rows
+    estimated_rows = int(uncompressed_size / bytes_per_row) if truncated else sample_rows
+    memory_per_row = frame.memory_usage(index=False, deep=True).sum() / sample_rows
+    estimated_memory = int(memory_per_row * estimated_rows)
+
+    report['columns'] = [str(c) for c in frame.columns]
+    report['dtypes'] = {str(c): str(t) for c, t in frame.dtypes.items()}
+    report['estimated_rows'] = estimated_rows
+    report['estimated_memory_bytes'] = estimated_memory
+    report['strategy'] = choose_strategy(estimated_memory, report['file_type'], eager_limit_mb,
+                                         out_of_core_limit_mb, out_of_core_available)
+
+    if report['strategy'] == CHUNKED and estimated_memory > out_of_core_limit_mb * 1024 * 1024:
+        report['warnings'].append(f"Estimated {estimated_memory / 1024 ** 2:.0f} MB in memory; "
+                                  "install pyarrow to process files this large out of core")
+    return report
+
+def choose_strategy(estimated_memory_bytes: int, file_type: str, eager_limit_mb: float,
+                    out_of_core_limit_mb: float, out_of_core_available: bool) -> str:
+    """
+    Choose how to ingest a delimited text file from its estimated in-memory size
+
+    Small files are read at once, mid-sized ones in chunks with compact
+    dtypes, and the largest are converted to Parquet and processed out of core.
+    """
+    if estimated_memory_bytes <= eager_limit_mb * 1024 * 1024:
+        return EAGER
+    if estimated_memory_bytes > out_of_core_limit_mb * 1024 * 1024 and out_of_core_available and file_type == 'CSV':
+        return OUT_OF_CORE
+    return CHUNKED
+
+def summarize_report(report: Dict[str, Any]) -> str:
+    """One-line description of a preflight report for the UI and logs"""
+    parts = [f"{report['file_type']}", f"{report['size_bytes'] / 1024 ** 2:.1f} MB"]
+    if report.get('compression'):
+        parts.append(f"{report['compression']} compressed")
+    if 'estimated_rows' in report:
+        parts.append(f"~{report['estimated_rows']:,} rows")
+        parts.append(f"~{report['estimated_memory_bytes'] / 1024 ** 2:.0f} MB in memory")
+    if report.get('delimiter'):
+        parts.append(f"delimiter {report['delimiter']!r}")
+    if report.get('encoding'):
+        parts.append(report['encoding'])
+    parts.append(f"strategy: {report['strategy'].replace('_', ' ')}")
+    return ", ".join(parts)
@@ -0,0 +1,91 @@
+"""
+Prewarm Module
+Background jobs that compute insights right after ingestion so first clicks are served from cache
+"""
+
+import logging
+from typing import Dict, Any, List
+import pandas as pd
+
+from dataset_collection import DatasetCollection
+from dataset_store import get_dataset_store
+from out_of_core import ParquetDataset
+from jobs import get_job_manager, Job
+
+def _generation_key(agent) -> str:
+    """Model settings that change the generated answer"""
+    return f"{agent.model}:{agent.max_tokens}:{agent.temperature}"
+
+def summary_job_key(file_info: Dict[str, Any], agent) -> str:
+    """Memo key of the summary report job for a dataset and the agent's model settings"""
+    return f"summary:{file_info['fingerprint']}:{_generation_key(agent)}"
+
+def suggestions_job_key(file_info: Dict[str, Any], agent) -> str:
+    """Memo key of the suggested questions job for a dataset and the agent's model settings"""
+    return f"suggest:{file_info['fingerprint']}:{_generation_key(agent)}"
+
+def run_summary_report(agent, data, file_info, progress_callback=None) -> str:
+    """Background job: generate the AI summary report"""
+    if progress_callback:
+        progress_callback(0.1, "Waiting for the AI model")
+    return agent.generate_summary_report(data, file_info)
+
+def run_suggest_questions(agent, data, file_info, progress_callback=None) -> str:
+    """Background job: generate suggested questions"""
+    if progress_callback:
+        progress_callback(0.1, "Waiting for the AI model")
+    return agent.suggest_questions(data, file_info)
+
+def warm_dataset_artifacts(agent, processor, data, file_info, progress_callback=None) -> Dict[str, Any]:
+    """
+    Background job: compute the column profile and the prompt context
+
+    Both are stored as dataset artifacts in the shared store, where the
+    preview and every later AI request pick them up.
+    """
+    store = get_dataset_store()
+    fingerprint = file_info['fingerprint']
+    profile = None
+
+    if isinstance(data, (pd.DataFrame, DatasetCollection, ParquetDataset)):
+        if progress_callback:
+            progress_callback(0.2, "Profiling columns")
+        profile = store.get_artifact(fingerprint, 'column_profile', lambda: processor.profile_columns(data))
+
+    if progress_callback:
+        progress_callback(0.6, "Preparing AI context")
+    agent.prepare_context(data, file_info)
+
+    return {'column_profile': profile}
+
+def start_prewarm(agent, processor, data, file_info: Dict[str, Any]) -> List[Job]:
+    """
+    Submit the prewarm jobs for a freshly ingested dataset
+
+    The summary and suggestion jobs use the same memo keys as the buttons in
+    the app, so clicking them afterwards returns the finished job. Their
+    answers are also stored in the semantic cache.
+
+    Args:
+        agent: AIAgent used for the LLM calls
+        processor: DataProcessor used for profiling
+        data: Processed data
+        file_info: Information about the dataset (must include its fingerprint)
+
+    Returns:
+        The submitted (or already existing) jobs
+    """
+    manager = get_job_manager()
+    logging.getLogger(__name__).info(f"Prewarming insights for {file_info.get('name')}")
+
+    return [
+        manager.submit(warm_dataset_artifacts, agent, processor, data, file_info,
+                       name="Prewarm profile and context", memo_key=f"prewarm:{file_info['fingerprint']}",
+                       pool='analysis'),
+        manager.submit(run_suggest_questions, agent, data, file_info,
+                       name="Suggested questions", memo_key=suggestions_job_key(file_info, agent),
+                       pool='analysis'),
+        manager.submit(run_summary_report, agent, data, file_info,
+                       name="Summary report", memo_key=summary_job_key(file_info, agent),
+                       pool='analysis')
+    ]
@@ -0,0 +1,186 @@
+"""
+Profiling Module
+Opt-in CPU and peak-memory profiling of expensive calls, saved per dataset fingerprint
+"""
+
+import os
+import json
+import time
+import uuid
+import cProfile
+import logging
+import threading
+import tracemalloc
+import contextvars
+from functools import wraps
+from typing import Callable, Optional, Dict, List
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # Fall back to the deterministic cProfile when pyinstrument is not installed
+    SamplingProfiler = None
+
+PROFILES_DIR = os.path.join("logs", "profiles")
+
+# Process default (PROFILING_ENABLED); sessions override it through the context variable
+PROFILING_DEFAULT = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+_enabled: contextvars.ContextVar = contextvars.ContextVar('profiling_enabled', default=None)
+
+_tracemalloc_lock = threading.Lock()
+_active_calls: List[Dict[str, bool]] = []
+_started_tracing = False
+
+def profiling_enabled() -> bool:
+    """Check whether profiling is switched on for the current session"""
+    enabled = _enabled.get()
+    return PROFILING_DEFAULT if enabled is None else enabled
+
+def set_profiling_enabled(enabled: bool):
+    """
+    Switch profiling on or off for the current session
+
+    The setting lives in a context variable, so it applies to the calling
+    thread and to background jobs it submits (JobManager and the file worker
+    pool run work in a copy of the submitting context), not to other sessions.
+    """
+    if enabled != profiling_enabled():
+        logging.getLogger(__name__).info(f"Profiling {'enabled' if enabled else 'disabled'} for this session")
+    _enabled.set(enabled)
+
+def _start_tracemalloc() -> Dict[str, bool]:
+    """
+    Start tracing for one profiled call
+
+    The peak is only reset when no other profiled call is running; calls
+    that overlap are marked so their shared, process-wide peak is not
+    reported as their own.
+    """
+    global _started_tracing
+    with _tracemalloc_lock:
+        call = {'overlapped': bool(_active_calls)}
+        for other in _active_calls:
+            other['overlapped'] = True
+        if not _active_calls:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        _active_calls.append(call)
+        return call
+
+def _stop_tracemalloc(call: Dict[str, bool]) -> int:
+    """Finish tracing for one profiled call and return the peak traced memory since it started"""
+    global _started_tracing
+    with _tracemalloc_lock:
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        _active_calls.remove(call)
+        if not _active_calls and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return peak
+
+def _start_profiler():
+    """Start a CPU profiler for the current thread (None if another one is already active)"""
+    try:
+        if SamplingProfiler is not None:
+            profiler = SamplingProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    except (RuntimeError, ValueError) as e:
+        logging.getLogger(__name__).warning(f"CPU profiler not started: {str(e)}")
+        return None
+
+def _stop_profiler(profiler):
+    if profiler is None:
+        return
+    if SamplingProfiler is not None:
+        profiler.stop()
+    else:
+        profiler.disable()
+
+def profiled(stage: str, fingerprint_fn: Callable[..., Optional[str]] = None):
+    """
+    Decorator that profiles a call when profiling is enabled
+
+    Each profiled call writes a CPU profile (pyinstrument HTML when available,
+    otherwise a cProfile .prof file) and a JSON summary with wall time and
+    tracemalloc peak memory to logs/profiles/, named after the stage and the
+    dataset fingerprint. tracemalloc peaks are process-wide: a call that
+    overlapped another profiled call reports its peak as
+    process_peak_memory_bytes instead of peak_memory_bytes.
+
+    Args:
+        stage: Name used in the artifact file names
+        fingerprint_fn: Called with the function's arguments to get the dataset fingerprint
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled():
+                return func(*args, **kwargs)
+
+            logger = logging.getLogger(__name__)
+            fingerprint = None
+            if fingerprint_fn:
+                try:
+                    fingerprint = fingerprint_fn(*args, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Could not fingerprint data for profile: {str(e)}")
+
+            call = _start_tracemalloc()
+            start = time.perf_counter()
+            profiler = _start_profiler()
+            status = 'ok'
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                _stop_profiler(profiler)
+                wall_seconds = time.perf_counter() - start
+                peak_bytes = _stop_tracemalloc(call)
+                _save_profile(stage, fingerprint, profiler, wall_seconds, peak_bytes, status, call['overlapped'])
+        return wrapper
+    return decorator
+
+def _save_profile(stage: str, fingerprint: Optional[str], profiler, wall_seconds: float,
+                  peak_bytes: int, status: str, overlapped: bool = False):
+    """Write the profile artifacts for one call"""
+    logger = logging.getLogger(__name__)
+    try:
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(PROFILES_DIR, f"{stage}_{(fingerprint or 'unknown')[:16]}_{timestamp}_{uuid.uuid4().hex[:6]}")
+
+        profile_path = None
+        if profiler is not None and SamplingProfiler is not None:
+            profile_path = f"{base}.html"
+            with open(profile_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        elif profiler is not None:
+            profile_path = f"{base}.prof"
+            profiler.dump_stats(profile_path)
+
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'stage': stage,
+                'fingerprint': fingerprint,
+                'status': status,
+                'wall_seconds': round(wall_seconds, 4),
+                'peak_memory_bytes': None if overlapped else peak_bytes,
+                'process_peak_memory_bytes': peak_bytes if overlapped else None,
+                'profiler': 'pyinstrument' if SamplingProfiler is not None else 'cProfile',
+                'profile_file': os.path.basename(profile_path) if profile_path else None,
+                'timestamp': timestamp
+            }, f, indent=2)
+
+        scope = "process-wide peak, overlapping profiled calls" if overlapped else "peak"
+        logger.info(f"Profile for {stage} saved to {base}.json "
+                    f"({wall_seconds:.2f}s, {scope} {peak_bytes / 1024 ** 2:.1f} MB)")
+    except Exception as e:
+        logger.error(f"Failed to save profile for {stage}: {str(e)}")
@@ -0,0 +1,211 @@
+"""
+Semantic Cache Module
+Per-dataset cache of answers that also matches rephrased questions using character n-gram TF-IDF similarity
+"""
+
+import math
+import re
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional
+
+from metrics import get_metrics, record_cache_lookup
+from settings import get_setting
+
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'in', 'on', 'of', 'for', 'to', 'and', 'or',
+    'this', 'that', 'these', 'those', 'it', 'its', 'me', 'my', 'please', 'can', 'could', 'you',
+    'what', 'which', 'does', 'do', 'data', 'dataset', 'tell', 'show', 'give'
+}
+
+NEGATIONS = {'not', 'no', 'never', 'without', 'except', 'excluding'}
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question for similarity matching
+
+    Lowercases, strips punctuation and drops filler words so that
+    "What are the main trends?" and "main trends in this data?" compare equal.
+    """
+    words = re.findall(r"[a-z0-9_]+", question.lower())
+    kept = [w for w in words if w not in STOPWORDS]
+    return " ".join(kept or words)
+
+def _critical_tokens(normalized: str) -> set:
+    """Tokens that change the meaning of a question if they differ (numbers and negations)"""
+    return {w for w in normalized.split() if w.isdigit() or w in NEGATIONS}
+
+def char_ngrams(text: str, min_n: int = 3, max_n: int = 5) -> Counter:
+    """Count character n-grams of each word padded with spaces"""
+    grams = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+class _DatasetIndex:
+    """TF-IDF index of the questions asked about one dataset"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.document_frequency = Counter()
+
+    def add(self, normalized: str, question: str, answer: str):
+        if normalized in self.entries:
+            self.entries[normalized]['answer'] = answer
+            self.entries.move_to_end(normalized)
+            return
+
+        grams = char_ngrams(normalized)
+        self.entries[normalized] = {'question': question, 'answer': answer, 'grams': grams}
+        self.document_frequency.update(grams.keys())
+
+        while len(self.entries) > self.max_entries:
+            _, oldest = self.entries.popitem(last=False)
+            self.document_frequency.subtract(oldest['grams'].keys())
+            self.document_frequency += Counter()  # drop zero counts
+
+    def best_match(self, normalized: str):
+        if normalized in self.entries:
+            return self.entries[normalized], 1.0
+
+        query = self._weights(char_ngrams(normalized))
+        best, best_score = None, 0.0
+        for entry in self.entries.values():
+            score = self._cosine(query, self._weights(entry['grams']))
+            if score > best_score:
+                best, best_score = entry, score
+        return best, best_score
+
+    def _weights(self, grams: Counter) -> Dict[str, float]:
+        total = len(self.entries) + 1
+        return {g: (1 + math.log(tf)) * (math.log(total / (1 + self.document_frequency.get(g, 0))) + 1)
+                for g, tf in grams.items()}
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        if not a or not b:
+            return 0.0
+        if len(a) > len(b):
+            a, b = b, a
+        dot = sum(weight * b.get(gram, 0.0) for gram, weight in a.items())
+        norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+        return dot / norm if norm else 0.0
+
+class SemanticCache:
+    """
+    Answer cache keyed by dataset that matches near-duplicate questions
+
+    Lookups above return_threshold reuse the earlier answer directly; lookups
+    between suggest_threshold and return_threshold are offered to the user
+    as a suggestion.
+    """
+
+    def __init__(self, return_threshold: float = 0.9, suggest_threshold: float = 0.7,
+                 max_entries_per_dataset: int = 200, max_datasets: int = 100):
+        """
+        Initialize the SemanticCache
+
+        Args:
+            return_threshold: Similarity at which a cached answer is returned
+            suggest_threshold: Similarity at which a cached answer is suggested
+            max_entries_per_dataset: Questions kept per dataset
+            max_datasets: Datasets kept before the least recently used is dropped
+        """
+        self.logger = logging.getLogger(__name__)
+        self.return_threshold = return_threshold
+        self.suggest_threshold = suggest_threshold
+        self.max_entries_per_dataset = max_entries_per_dataset
+        self.max_datasets = max_datasets
+        self._indexes: "OrderedDict[str, _DatasetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: str, question: str, record_stats: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Find a previous answer to the same or a similar question
+
+        Args:
+            namespace: Dataset fingerprint (optionally combined with the model name)
+            question: The new question
+            record_stats: Whether to count this lookup in the hit/miss metrics
+
+        Returns:
+            Dict with 'question', 'answer', 'similarity' and 'action' ('return' or
+            'suggest'), or None when nothing is similar enough
+        """
+        normalized = normalize_question(question)
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None or not index.entries:
+                if record_stats:
+                    record_cache_lookup('semantic', False)
+                return None
+            self._indexes.move_to_end(namespace)
+            entry, similarity = index.best_match(normalized)
+
+        if (entry is not None and similarity >= self.return_threshold
+                and _critical_tokens(normalize_question(entry['question'])) == _critical_tokens(normalized)):
+            action = 'return'
+        elif entry is not None and similarity >= self.suggest_threshold:
+            action = 'suggest'
+        else:
+            action = None
+
+        if record_stats:
+            record_cache_lookup('semantic', action == 'return')
+            if action == 'suggest':
+                get_metrics().counter('semantic_cache_suggestions_total',
+                                      "Similar earlier questions offered as suggestions").inc()
+
+        if action is None:
+            return None
+
+        return {'question': entry['question'], 'answer': entry['answer'],
+                'similarity': round(similarity, 3), 'action': action}
+
+    def add(self, namespace: str, question: str, answer: str):
+        """Store an answer for a question about a dataset"""
+        normalized = normalize_question(question)
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = _DatasetIndex(self.max_entries_per_dataset)
+                self._indexes[namespace] = index
+            self._indexes.move_to_end(namespace)
+            index.add(normalized, question, answer)
+
+            while len(self._indexes) > self.max_datasets:
+                self._indexes.popitem(last=False)
+
+    def clear(self, namespace: str = None):
+        """Forget one dataset's answers, or everything"""
+        with self._lock:
+            if namespace is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(namespace, None)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    Get the process-wide semantic cache, creating it from config on first use
+
+    Returns:
+        Shared SemanticCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                return_threshold=get_setting('analysis.ai.semantic_cache.return_threshold', 0.9),
+                suggest_threshold=get_setting('analysis.ai.semantic_cache.suggest_threshold', 0.7),
+                max_entries_per_dataset=get_setting('analysis.ai.semantic_cache.max_entries_per_dataset', 200),
+                max_datasets=get_setting('analysis.ai.semantic_cache.max_datasets', 100)
+            )
+        return _cache
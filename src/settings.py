@@ -0,0 +1,71 @@
+"""
+Settings Module
+Loads the YAML configuration file and provides dotted-path access to settings
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; defaults are used without it
+    yaml = None
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+_config_cache: Dict[str, Any] = None
+_config_lock = threading.Lock()
+
+def load_config(config_path: str = None) -> Dict[str, Any]:
+    """
+    Load the application configuration (cached after the first call)
+
+    Args:
+        config_path: Optional path to a YAML config file. Defaults to the
+            CONFIG_PATH environment variable or config/config.yaml
+
+    Returns:
+        Dictionary with configuration values (empty if unavailable)
+    """
+    global _config_cache
+
+    with _config_lock:
+        if _config_cache is not None and config_path is None:
+            return _config_cache
+
+        path = Path(config_path or os.getenv("CONFIG_PATH") or DEFAULT_CONFIG_PATH)
+        config = {}
+
+        if yaml is None:
+            logging.getLogger(__name__).warning("PyYAML not installed, using default settings")
+        elif path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Failed to load config from {path}: {str(e)}")
+
+        if config_path is None:
+            _config_cache = config
+        return config
+
+def get_setting(key_path: str, default: Any = None) -> Any:
+    """
+    Get a configuration value by dotted path
+
+    Args:
+        key_path: Dotted path such as 'security.session_timeout_minutes'
+        default: Value returned when the setting is missing
+
+    Returns:
+        The configured value or the default
+    """
+    value = load_config()
+    for part in key_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
@@ -0,0 +1,73 @@
+"""
+Single-Flight Module
+Coalesces concurrent identical calls so only one of them does the work
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+def request_key(**params) -> str:
+    """
+    Build a stable key from request parameters
+
+    Args:
+        **params: JSON-serializable request parameters (model, messages, ...)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SingleFlight:
+    """
+    Deduplicates in-flight calls by key
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait on the same future and receive the same result or
+    exception. Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Request key
+            fn: Function performing the call
+
+        Returns:
+            Tuple of (result, shared) where shared is True if another caller did the work
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of calls currently running"""
+        with self._lock:
+            return len(self._calls)
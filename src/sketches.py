@@ -0,0 +1,209 @@
+"""
+Sketches Module
+Bounded-memory streaming summaries for categorical columns: top-k heavy hitters, approximate distinct counts and string lengths
+"""
+
+import math
+from typing import Dict, Any, Iterable, List, Tuple, Union
+import numpy as np
+import pandas as pd
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters sketch in its mergeable form
+
+    Keeps at most `capacity` counters. Whole chunks are folded in at once: the
+    chunk's counts are truncated to `capacity` entries and merged with the
+    tracked counters, and a value missing from either side is charged that
+    side's floor (the largest count it may have had without being tracked).
+    The top `capacity` merged counters are kept. Each merge costs
+    O(capacity + distinct values in the chunk) in vectorized pandas instead of
+    a Python loop over values, every estimated count is an upper bound on the
+    true frequency, and count - error is a lower bound.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.floor = 0  # Upper bound on the frequency of any value that is not tracked
+        self.total = 0
+
+    def update(self, value, count: int = 1):
+        """Add count occurrences of a value"""
+        self.update_counts([(value, count)])
+
+    def update_counts(self, counts: Union[pd.Series, Iterable[Tuple[Any, int]]]):
+        """
+        Add pre-aggregated counts
+
+        Args:
+            counts: Series of counts indexed by value (e.g. from value_counts)
+                or (value, count) pairs
+        """
+        if not isinstance(counts, pd.Series):
+            aggregated: Dict[Any, int] = {}
+            for value, count in counts:
+                aggregated[value] = aggregated.get(value, 0) + int(count)
+            counts = pd.Series(list(aggregated.values()), index=pd.Index(list(aggregated), dtype=object),
+                               dtype=np.int64)
+        if counts.empty:
+            return
+
+        counts = counts.astype(np.int64).sort_values(ascending=False, kind='stable')
+        total = int(counts.sum())
+        floor = 0
+        if len(counts) > self.capacity:
+            floor = int(counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity]
+        self._merge(counts, pd.Series(0, index=counts.index, dtype=np.int64), floor, total)
+
+    def merge(self, other: "SpaceSaving"):
+        """Fold another sketch into this one"""
+        if other.counts.empty:
+            return
+        self._merge(other.counts, other.errors, other.floor, other.total)
+
+    def _merge(self, counts: pd.Series, errors: pd.Series, floor: int, total: int):
+        """Combine this summary with another one given as counters, errors and floor"""
+        self.total += total
+        if self.counts.empty and self.floor == 0:
+            merged_counts, merged_errors = counts.copy(), errors.copy()
+        else:
+            index = self.counts.index.append(counts.index).unique()
+            merged_counts = (self.counts.reindex(index, fill_value=self.floor)
+                             + counts.reindex(index, fill_value=floor))
+            merged_errors = (self.errors.reindex(index, fill_value=self.floor)
+                             + errors.reindex(index, fill_value=floor))
+
+        # A value tracked by neither side may have been just under both floors
+        self.floor += floor
+        if len(merged_counts) > self.capacity:
+            merged_counts = merged_counts.sort_values(ascending=False, kind='stable')
+            self.floor = max(self.floor, int(merged_counts.iloc[self.capacity]))
+            merged_counts = merged_counts.iloc[:self.capacity]
+        self.counts = merged_counts.astype(np.int64)
+        self.errors = merged_errors.reindex(self.counts.index).astype(np.int64)
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """The k most frequent values with their estimated counts and error bounds"""
+        ranked = self.counts.sort_values(ascending=False, kind='stable').iloc[:k]
+        errors = self.errors.reindex(ranked.index)
+        return [{'value': value, 'count': int(count), 'error': int(error)}
+                for value, count, error in zip(ranked.index, ranked.to_numpy(), errors.to_numpy())]
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter over 64-bit hashes
+
+    Uses 2**precision one-byte registers (4 KB at the default precision) with a
+    standard error of about 1.04 / sqrt(2**precision), roughly 1.6%.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray):
+        """Add an array of uint64 hashes"""
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        remaining_bits = 64 - self.precision
+        index = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        with np.errstate(divide='ignore'):
+            highest_bit = np.floor(np.log2(rest.astype(np.float64)))
+        rank = np.where(rest == 0, remaining_bits + 1, remaining_bits - highest_bit).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        """Fold another sketch with the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+class CategoricalSketch:
+    """Streaming profile of one categorical column"""
+
+    def __init__(self, top_k_capacity: int = 100, precision: int = 12):
+        self.heavy_hitters = SpaceSaving(top_k_capacity)
+        self.distinct = HyperLogLog(precision)
+        self.non_null = 0
+        self.missing = 0
+        self.length_count = 0
+        self.length_sum = 0
+        self.length_min = None
+        self.length_max = None
+
+    def update(self, values: pd.Series):
+        """Add one chunk of values"""
+        present = values.dropna()
+        self.missing += len(values) - len(present)
+        self.non_null += len(present)
+        if present.empty:
+            return
+
+        # The chunk is aggregated and merged in one vectorized step rather than value by value
+        self.heavy_hitters.update_counts(present.value_counts())
+        self.distinct.update_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+
+        lengths = present.astype(str).str.len()
+        self.length_count += len(lengths)
+        self.length_sum += int(lengths.sum())
+        chunk_min, chunk_max = int(lengths.min()), int(lengths.max())
+        self.length_min = chunk_min if self.length_min is None else min(self.length_min, chunk_min)
+        self.length_max = chunk_max if self.length_max is None else max(self.length_max, chunk_max)
+
+    def merge(self, other: "CategoricalSketch"):
+        """Fold the sketch of another part of the same column into this one"""
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.distinct.merge(other.distinct)
+        self.non_null += other.non_null
+        self.missing += other.missing
+        self.length_count += other.length_count
+        self.length_sum += other.length_sum
+        for attr, pick in (('length_min', min), ('length_max', max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+
+    def result(self, k: int) -> Dict[str, Any]:
+        """Summarize the column with its k most frequent values"""
+        return {
+            'non_null': self.non_null,
+            'missing': self.missing,
+            'approx_distinct': min(self.distinct.estimate(), self.non_null),
+            'top_values': [{**item, 'value': str(item['value'])} for item in self.heavy_hitters.top(k)],
+            'string_length': {
+                'min': self.length_min,
+                'max': self.length_max,
+                'mean': round(self.length_sum / self.length_count, 2) if self.length_count else None
+            }
+        }
+
+def sketch_column(values: pd.Series, chunk_size: int = 100_000, top_k_capacity: int = 100) -> CategoricalSketch:
+    """
+    Build a categorical sketch by streaming a column in chunks
+
+    Args:
+        values: Column values
+        chunk_size: Rows processed per chunk
+        top_k_capacity: Counters kept by the heavy hitters sketch
+
+    Returns:
+        CategoricalSketch for the column
+    """
+    sketch = CategoricalSketch(top_k_capacity)
+    for start in range(0, len(values), chunk_size):
+        sketch.update(values.iloc[start:start + chunk_size])
+    return sketch
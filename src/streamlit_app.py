@@ -4,8 +4,13 @@ A multi-modal AI-powered data analyst that processes various file types
 """
 
 import streamlit as st
+import pandas as pd
 import os
+import json
+import hashlib
+import functools
 from dotenv import load_dotenv
+from packaging.version import Version
 import sys
 import logging
 from pathlib import Path
@@ -15,7 +20,23 @@ sys.path.append(str(Path(__file__).parent))
 
 from data_processor import DataProcessor
 from ai_agent import AIAgent
-from utils import setup_logging, initialize_session_state
+from compression import data_file_type, member_fingerprint
+from conversation import Conversation
+from dataset_collection import DatasetCollection
+from out_of_core import ParquetDataset
+from dataset_store import get_dataset_store, compute_fingerprint, combine_fingerprints
+from exporters import export_report, export_dataset, REPORT_FORMATS, DATASET_FORMATS
+from jobs import get_job_manager
+from metrics import get_metrics, start_metrics_server
+from plot_cache import get_plot_cache
+from pagination import get_page_cache, text_page
+from preflight import summarize_report
+from text_document import TextDocument
+from prewarm import (start_prewarm, run_summary_report, run_suggest_questions,
+                     summary_job_key, suggestions_job_key)
+from profiling import PROFILING_DEFAULT, set_profiling_enabled
+from settings import get_setting
+from utils import setup_logging, initialize_session_state, trim_chat_history
 
 # Load environment variables
 load_dotenv()
@@ -37,6 +58,11 @@ def main():
     
     # Initialize session state
     initialize_session_state()
+    dataset_store = get_dataset_store()
+    dataset_store.touch_session(st.session_state.session_id)
+    
+    if get_setting('performance.metrics.enabled', True):
+        start_metrics_server(int(os.getenv("METRICS_PORT", get_setting('performance.metrics.port', 9464))))
     
     # Sidebar configuration
     with st.sidebar:
@@ -65,10 +91,36 @@ def main():
         
         max_tokens = st.slider("Max Tokens", 100, 1000, 500)
         temperature = st.slider("Temperature", 0.0, 1.0, 0.7, 0.1)
+        conversation_mode = st.checkbox(
+            "💬 Conversation mode",
+            value=get_setting('analysis.ai.conversation.enabled', True),
+            help="Include earlier questions and answers (summarized when older) in follow-up questions"
+        )
+        prewarm = st.checkbox(
+            "⚡ Prewarm insights",
+            value=get_setting('analysis.ai.prewarm.enabled', False),
+            help="Right after upload, compute the column profile, suggested questions and "
+                 "summary report in the background"
+        )
         
         # File upload settings
         st.subheader("📁 Upload Settings")
-        max_file_size = st.number_input("Max File Size (MB)", 1, 100, 50)
+        size_limit = get_setting('file_processing.max_file_size_mb', 50)
+        max_file_size = st.number_input("Max File Size (MB)", 1, size_limit, size_limit,
+                                        help="Larger files are rejected before they are parsed; "
+                                             "large CSV files are read in chunks or stored out of core")
+        
+        # Performance diagnostics
+        with st.expander("🩺 Diagnostics", expanded=False):
+            profile_requests = st.checkbox(
+                "🔬 Profile requests",
+                value=PROFILING_DEFAULT,
+                key="profile_requests",
+                help="Save CPU and peak-memory profiles of this session's file processing, "
+                     "EDA and analysis to logs/profiles/"
+            )
+            set_profiling_enabled(profile_requests)
+            display_diagnostics(dataset_store)
     
     # Main interface
     st.title("🦾 Data Analyst Agent")
@@ -87,12 +139,7 @@ def main():
     # Initialize components
     try:
         data_processor = DataProcessor()
-        ai_agent = AIAgent(
-            api_key=os.getenv("TOGETHER_API_KEY"),
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
+        ai_agent = get_ai_agent(os.getenv("TOGETHER_API_KEY"), model, max_tokens, temperature)
     except Exception as e:
         st.error(f"❌ Failed to initialize components: {str(e)}")
         logger.error(f"Initialization error: {str(e)}")
@@ -101,47 +148,66 @@ def main():
     # File upload section
     st.header("📤 Upload Your Data")
     
-    uploaded_file = st.file_uploader(
-        "Choose a file to analyze",
-        type=['csv', 'xlsx', 'xls', 'txt', 'pdf', 'png', 'jpg', 'jpeg'],
-        help="Supported formats: CSV, Excel, Text, PDF, Images"
+    uploaded_files = st.file_uploader(
+        "Choose one or more files to analyze",
+        type=['csv', 'json', 'jsonl', 'xlsx', 'xls', 'txt', 'pdf', 'png', 'jpg', 'jpeg',
+              'gz', 'bz2', 'xz', 'zip'],
+        accept_multiple_files=True,
+        help="Supported formats: CSV, JSON, Excel, Text, PDF, Images, also gzip/bz2/xz compressed "
+             "or in zip archives. Tabular files with the same columns are analyzed together."
     )
     
-    if uploaded_file is not None:
-        # Display file information
+    if uploaded_files:
+        # Display upload information
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("📄 File Name", uploaded_file.name)
+            if len(uploaded_files) == 1:
+                st.metric("📄 File Name", uploaded_files[0].name)
+            else:
+                st.metric("📄 Files", len(uploaded_files))
         with col2:
-            st.metric("📏 File Size", f"{uploaded_file.size / 1024:.1f} KB")
+            st.metric("📏 File Size", f"{sum(f.size for f in uploaded_files) / 1024:.1f} KB")
         with col3:
-            file_type = uploaded_file.name.split('.')[-1].upper()
-            st.metric("🏷️ File Type", file_type)
+            file_types = sorted({f.name.split('.')[-1].upper() for f in uploaded_files})
+            st.metric("🏷️ File Type", ", ".join(file_types))
+        
+        # Check sizes and sniff formats before any parsing
+        uploaded_files = preflight_uploads(uploaded_files, data_processor, max_file_size)
         
-        # Process the file
+        # Process the files (datasets are shared across sessions by content hash)
         try:
-            with st.spinner("🔄 Processing file..."):
-                processed_data = data_processor.process_file(uploaded_file)
+            datasets = (load_datasets(uploaded_files, data_processor, dataset_store, max_file_size)
+                        if uploaded_files else [])
+            
+            if datasets:
+                selected = 0
+                if len(datasets) > 1:
+                    selected = st.selectbox(
+                        "🗂️ Active dataset",
+                        range(len(datasets)),
+                        format_func=lambda i: datasets[i]['file_info']['name']
+                    )
                 
-                if processed_data:
-                    st.session_state.processed_data = processed_data
-                    st.session_state.file_info = {
-                        'name': uploaded_file.name,
-                        'type': file_type,
-                        'size': uploaded_file.size
-                    }
-                    
-                    st.success("✅ File processed successfully!")
-                    
-                    # Display data preview based on file type
-                    display_data_preview(processed_data, file_type)
+                active = datasets[selected]
+                st.session_state.dataset_key = active['key']
+                st.session_state.file_info = active['file_info']
+                
+                # Compute profile, context, suggestions and summary in the background
+                if prewarm and active['key'] not in st.session_state.prewarmed:
+                    start_prewarm(ai_agent, data_processor, get_active_data(), active['file_info'])
+                    st.session_state.prewarmed.add(active['key'])
+                
+                st.success("✅ File processed successfully!")
+                
+                # Display data preview based on file type
+                display_data_preview(get_active_data(), active['file_info']['type'], data_processor)
                     
         except Exception as e:
             st.error(f"❌ Error processing file: {str(e)}")
             logger.error(f"File processing error: {str(e)}")
     
     # Query interface
-    if 'processed_data' in st.session_state:
+    if get_active_data() is not None:
         st.header("❓ Ask Questions About Your Data")
         
         # Text input for questions
@@ -151,6 +217,14 @@ def main():
             key="question_input"
         )
         
+        # Offer earlier answers to similar questions about the same dataset
+        if user_question:
+            similar = ai_agent.find_similar_question(user_question, st.session_state.file_info)
+            if similar and similar['action'] == 'suggest':
+                with st.expander(f"♻️ A similar question was answered before "
+                                 f"({similar['similarity']:.0%} match): {similar['question'][:60]}"):
+                    st.write(similar['answer'])
+        
         # Voice input section
         with st.expander("🎙️ Voice Input (Experimental)"):
             if st.button("🔴 Record Voice Question"):
@@ -167,9 +241,10 @@ def main():
             with st.spinner("🤔 Analyzing your question..."):
                 try:
                     response = ai_agent.analyze_data(
-                        st.session_state.processed_data,
+                        get_active_data(),
                         user_question,
-                        st.session_state.file_info
+                        st.session_state.file_info,
+                        conversation=get_conversation() if conversation_mode else None
                     )
                     
                     # Display response
@@ -185,6 +260,10 @@ def main():
                         'response': response,
                         'file': st.session_state.file_info['name']
                     })
+                    st.session_state.chat_history = trim_chat_history(
+                        st.session_state.chat_history,
+                        get_setting('analysis.ai.max_chat_history', 50)
+                    )
                     
                 except Exception as e:
                     st.error(f"❌ Analysis error: {str(e)}")
@@ -194,6 +273,9 @@ def main():
         if 'chat_history' in st.session_state and st.session_state.chat_history:
             st.header("💬 Chat History")
             
+            if conversation_mode and st.button("🧹 Start new conversation"):
+                get_conversation().clear()
+            
             for i, chat in enumerate(reversed(st.session_state.chat_history)):
                 with st.expander(f"💭 {chat['question'][:50]}..."):
                     st.write(f"**File:** {chat['file']}")
@@ -201,36 +283,405 @@ def main():
                     st.write(f"**Response:** {chat['response']}")
     
     # Additional features section
-    if 'processed_data' in st.session_state:
+    if get_active_data() is not None:
         st.header("🔧 Additional Features")
         
-        col1, col2 = st.columns(2)
+        dataset_key = st.session_state.dataset_key
+        eda_key = f"eda:{dataset_key}"
+        summary_key = summary_job_key(st.session_state.file_info, ai_agent)
+        suggest_key = suggestions_job_key(st.session_state.file_info, ai_agent)
+        
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             if st.button("📊 Generate EDA Report"):
-                generate_eda_report(st.session_state.processed_data, data_processor)
+                job = get_job_manager().submit(
+                    data_processor.generate_eda_report, get_active_data(), fingerprint=dataset_key,
+                    name="EDA report", memo_key=eda_key, pool='analysis'
+                )
+                st.session_state.jobs[eda_key] = job.id
         
         with col2:
+            if st.button("📝 Generate Summary Report"):
+                job = get_job_manager().submit(
+                    run_summary_report, ai_agent, get_active_data(), st.session_state.file_info,
+                    name="Summary report", memo_key=summary_key, pool='analysis'
+                )
+                st.session_state.jobs[summary_key] = job.id
+        
+        with col3:
+            if st.button("💡 Suggest Questions"):
+                job = get_job_manager().submit(
+                    run_suggest_questions, ai_agent, get_active_data(), st.session_state.file_info,
+                    name="Suggested questions", memo_key=suggest_key, pool='analysis'
+                )
+                st.session_state.jobs[suggest_key] = job.id
+        
+        with col4:
             if st.button("💾 Download Analysis"):
-                download_analysis()
+                submit_report_export('md')
+        
+        # Background job results (kept across reruns)
+        suggest_job = get_session_job(suggest_key)
+        if suggest_job is not None and render_job_status(suggest_job, "💡 Suggested questions"):
+            st.subheader("💡 Suggested Questions")
+            st.write(suggest_job.result)
+        
+        summary_job = get_session_job(summary_key)
+        if summary_job is not None and render_job_status(summary_job, "📝 Summary report"):
+            st.subheader("📝 Summary Report")
+            st.write(summary_job.result)
+        
+        eda_job = get_session_job(eda_key)
+        if eda_job is not None and render_job_status(eda_job, "📊 EDA report"):
+            display_eda_report(eda_job.result)
+        
+        display_exports(get_active_data(), dataset_key)
+
+# Streamlit 1.52+ reads callable download data only when the button is clicked
+LAZY_DOWNLOADS = Version(st.__version__) >= Version("1.52.0")
+
+@st.cache_resource(show_spinner=False)
+def get_ai_agent(api_key, model, max_tokens, temperature):
+    """Create the AI agent once per settings combination and share it across reruns"""
+    return AIAgent(api_key=api_key, model=model, max_tokens=max_tokens, temperature=temperature)
+
+def preflight_uploads(uploaded_files, processor, max_file_size_mb):
+    """
+    Run the preflight check on each upload, reporting rejections and warnings
+    
+    Returns:
+        The uploads that passed the check
+    """
+    accepted, reports = [], []
+    for uploaded_file in uploaded_files:
+        report = processor.preflight(uploaded_file, max_file_size_mb)
+        reports.append(report)
+        if report['error']:
+            st.error(f"❌ {uploaded_file.name}: {report['error']}")
+            continue
+        for warning in report['warnings']:
+            st.warning(f"⚠️ {uploaded_file.name}: {warning}")
+        accepted.append(uploaded_file)
+    
+    with st.expander("🔎 File checks", expanded=False):
+        for report in reports:
+            st.caption(f"**{report['name']}**: {summarize_report(report)}")
+    return accepted
+
+def ingest_files(uploaded_files, fingerprints, processor, store, progress_callback=None, max_file_size_mb=None):
+    """
+    Background job: process uploaded files in parallel and register the resulting datasets
+    
+    Returns:
+        Dict with the list of 'datasets' (key and file_info) and per-file 'errors'
+    """
+    # Zip archives are ingested member by member; members are keyed off the archive's fingerprint
+    upload_fingerprints = fingerprints
+    uploads = processor.expand_archives(uploaded_files)
+    fingerprints = dict(upload_fingerprints)
+    for upload in uploads:
+        if upload.name not in fingerprints:
+            fingerprints[upload.name] = member_fingerprint(upload_fingerprints[upload.source], upload.name)
+    
+    file_status = {f.name: 'queued' for f in uploads}
+    finished = 0
+    
+    def on_file_progress(name, state, error):
+        nonlocal finished
+        file_status[name] = f"failed: {error}" if error else state
+        if state != 'processing':
+            finished += 1
+        if progress_callback:
+            progress_callback(finished / len(uploads),
+                              f"Processed {finished}/{len(uploads)} files",
+                              {'files': dict(file_status)})
+    
+    results, errors = processor.process_files(uploads, progress_callback=on_file_progress,
+                                              max_file_size_mb=max_file_size_mb, fingerprints=fingerprints)
+    sizes = {f.name: f.size for f in uploads}
+    file_types = {f.name: data_file_type(f.name) for f in uploads}
+    
+    # Tables and text extracted from one PDF are named 'report.pdf/table_1_p2', 'report.pdf/text' and keyed off the PDF
+    for name in results:
+        if name not in fingerprints:
+            source = name.rpartition('/')[0]
+            fingerprints[name] = member_fingerprint(fingerprints[source], name)
+            sizes[name] = sizes[source]
+            file_types[name] = file_types[source]
+    
+    datasets = []
+    for names, data in processor.combine_datasets(results):
+        if len(names) > 1:
+            key = combine_fingerprints(fingerprints[name] for name in names)
+            types = {file_types[name] for name in names}
+            file_info = {
+                'name': f"{names[0]} + {len(names) - 1} more",
+                'type': types.pop() if len(types) == 1 else 'TABULAR',
+                'size': sum(sizes[name] for name in names),
+                'files': names,
+                'fingerprint': key
+            }
+        else:
+            key = fingerprints[names[0]]
+            file_info = {
+                'name': names[0],
+                'type': file_types[names[0]],
+                'size': sizes[names[0]],
+                'fingerprint': key
+            }
+        
+        store.put(key, data)
+        datasets.append({'key': key, 'file_info': file_info})
+    
+    if not errors:
+        store.remember_upload(combine_fingerprints(upload_fingerprints.values()), datasets)
+    return {'datasets': datasets, 'errors': errors}
+
+def upload_fingerprints(uploaded_files):
+    """
+    Content hashes of the uploads, computed once per uploaded file rather than on every rerun
+    
+    Hashes are cached in the session by the uploader's file_id and the file size;
+    entries of files that are no longer uploaded are dropped.
+    
+    Returns:
+        Dict of fingerprints by file name
+    """
+    cache = st.session_state.upload_fingerprints
+    fingerprints, current = {}, set()
+    for f in uploaded_files:
+        file_id = getattr(f, 'file_id', None)
+        if file_id is None:
+            fingerprints[f.name] = compute_fingerprint(f)
+            continue
+        cache_key = (file_id, f.size)
+        current.add(cache_key)
+        if cache_key not in cache:
+            cache[cache_key] = compute_fingerprint(f)
+        fingerprints[f.name] = cache[cache_key]
+    
+    for cache_key in set(cache) - current:
+        del cache[cache_key]
+    return fingerprints
+
+def load_datasets(uploaded_files, processor, store, max_file_size_mb=None):
+    """
+    Load uploaded files through the shared store, ingesting them in a background job if needed
+    
+    Returns:
+        List of dicts with the dataset 'key' and its 'file_info', or None while ingestion is running
+    """
+    session_id = st.session_state.session_id
+    fingerprints = upload_fingerprints(uploaded_files)
+    upload_key = combine_fingerprints(fingerprints.values())
+    
+    datasets = store.lookup_upload(upload_key, session_id)
+    if datasets is not None:
+        return datasets
+    
+    manager = get_job_manager()
+    memo_key = f"ingest:{upload_key}"
+    
+    job = manager.find(memo_key)
+    
+    # A finished ingestion whose datasets were dropped from the store has to run again
+    if job is not None and job.result and not all(store.contains(d['key']) for d in job.result['datasets']):
+        manager.forget(memo_key)
+        job = None
+    
+    if job is None:
+        job = manager.submit(
+            ingest_files, uploaded_files, fingerprints, processor, store, max_file_size_mb=max_file_size_mb,
+            name=f"Ingest {len(uploaded_files)} file(s)", memo_key=memo_key, pool='ingest'
+        )
+    st.session_state.jobs[memo_key] = job.id
+    
+    if not render_job_status(job, "🔄 Processing files"):
+        if not job.active and st.button("🔁 Retry processing"):
+            manager.submit(
+                ingest_files, uploaded_files, fingerprints, processor, store, max_file_size_mb=max_file_size_mb,
+                name=f"Ingest {len(uploaded_files)} file(s)", memo_key=memo_key, pool='ingest'
+            )
+            st.rerun()
+        return None
+    
+    for name, error in job.result['errors'].items():
+        st.error(f"❌ {name}: {error}")
+    
+    for dataset in job.result['datasets']:
+        store.attach(session_id, dataset['key'])
+    return job.result['datasets']
+
+def get_session_job(memo_key):
+    """Get a background job started from this session"""
+    job_id = st.session_state.jobs.get(memo_key)
+    return get_job_manager().get(job_id) if job_id else None
+
+@st.fragment(run_every=get_setting('performance.jobs.poll_interval_seconds', 1.0))
+def render_job_progress(job_id, label):
+    """
+    Poll a running background job on its own, without rerunning the rest of the page
+    
+    Once the job stops the whole app is rerun so its result is rendered.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None or not job.active:
+        st.rerun()
+    
+    st.progress(job.progress, text=f"{label}: {job.message}")
+    for name, state in job.details.get('files', {}).items():
+        st.caption(f"{name}: {state}")
+    if st.button("✖️ Cancel", key=f"cancel_{job.id}"):
+        job.cancel()
+
+def render_job_status(job, label):
+    """
+    Show the state of a background job
+    
+    Returns:
+        True if the job finished successfully and its result can be displayed
+    """
+    if job.active:
+        render_job_progress(job.id, label)
+        return False
+    
+    if job.status == 'failed':
+        st.error(f"❌ {label} failed: {job.error}")
+        return False
+    
+    if job.status == 'cancelled':
+        st.warning(f"⚠️ {label} was cancelled")
+        return False
+    
+    return True
+
+def display_diagnostics(store):
+    """Show stage timings, counters and store usage collected in this process"""
+    store_stats = store.stats()
+    st.caption(f"Datasets: {store_stats['resident_datasets']}/{store_stats['datasets']} in memory, "
+               f"{store_stats['resident_bytes'] / 1024 ** 2:.1f} of "
+               f"{store_stats['memory_budget_bytes'] / 1024 ** 2:.0f} MB, "
+               f"{store_stats['sessions']} sessions")
+    plot_stats = get_plot_cache().stats()
+    st.caption(f"Plot cache: {plot_stats['plots']} plots, {plot_stats['size_mb']} MB")
+    
+    rows = get_metrics().snapshot()
+    if rows:
+        st.dataframe(rows, use_container_width=True)
+    else:
+        st.caption("No metrics recorded yet")
+    
+    if get_setting('performance.metrics.enabled', True):
+        port = os.getenv("METRICS_PORT", get_setting('performance.metrics.port', 9464))
+        st.caption(f"Prometheus endpoint: http://127.0.0.1:{port}/metrics")
+
+def get_conversation():
+    """Get the conversation state for the active dataset"""
+    dataset_key = st.session_state.dataset_key
+    if dataset_key not in st.session_state.conversations:
+        st.session_state.conversations[dataset_key] = Conversation(
+            window_turns=get_setting('analysis.ai.conversation.window_turns', 4),
+            max_summary_chars=get_setting('analysis.ai.conversation.max_summary_chars', 2000),
+            max_turn_chars=get_setting('analysis.ai.conversation.max_turn_chars', 2000)
+        )
+    return st.session_state.conversations[dataset_key]
 
-def display_data_preview(data, file_type):
-    """Display preview of processed data"""
+def get_active_data():
+    """Get the current session's dataset from the shared dataset store"""
+    dataset_key = st.session_state.get('dataset_key')
+    if not dataset_key:
+        return None
+    return get_dataset_store().get(dataset_key, st.session_state.session_id)
+
+def display_data_preview(data, file_type, processor):
+    """Display a paginated preview of processed data"""
     st.subheader("👀 Data Preview")
+    dataset_key = st.session_state.dataset_key
     
-    if file_type in ['CSV', 'XLSX', 'XLS']:
-        st.dataframe(data.head(10))
+    if isinstance(data, (pd.DataFrame, DatasetCollection, ParquetDataset)):
+        if isinstance(data, DatasetCollection):
+            st.caption(f"Combined from {len(data.names)} files: {', '.join(data.names)}")
+        elif isinstance(data, ParquetDataset):
+            st.caption(f"Large file stored out of core: {len(data):,} rows in {len(data.parts)} Parquet partitions "
+                       f"({data.disk_usage() / 1024 ** 2:.1f} MB on disk)")
+        
+        display_paginated_table(data, dataset_key)
         
-        # Basic statistics
-        if len(data.select_dtypes(include='number').columns) > 0:
-            st.subheader("📈 Basic Statistics")
-            st.dataframe(data.describe())
+        # Column statistics come from the shared column profile instead of a fresh describe()
+        profile = get_dataset_store().get_artifact(dataset_key, 'column_profile',
+                                                   lambda: processor.profile_columns(data))
+        if profile:
+            st.subheader("📈 Column Profile")
+            rows = {}
+            for col, column_profile in profile.items():
+                row = {k: v for k, v in column_profile.items() if k != 'statistics'}
+                row.update(column_profile.get('statistics', {}))
+                rows[col] = row
+            st.dataframe(pd.DataFrame.from_dict(rows, orient='index'), use_container_width=True)
+    
+    elif isinstance(data, (str, TextDocument)):
+        label = "Extracted Text" if file_type in ['PNG', 'JPG', 'JPEG'] else "Text Content"
+        lines_per_page = get_setting('performance.preview.text_lines_per_page', 50)
+        page_index = st.session_state.get(f"text_page_{dataset_key}", 1) - 1
+        text, total_lines = text_page(data, page_index, lines_per_page)
+        total_pages = max(1, -(-total_lines // lines_per_page))
+        if page_index >= total_pages:
+            st.session_state[f"text_page_{dataset_key}"] = total_pages
+            text, total_lines = text_page(data, total_pages - 1, lines_per_page)
+        st.number_input(f"Page (of {total_pages})", 1, total_pages, key=f"text_page_{dataset_key}")
+        st.text_area(label, text, height=300)
+        if isinstance(data, TextDocument):
+            st.caption(f"{total_lines:,} lines, {len(data):,} characters ({data.encoding}, "
+                       f"{data.disk_usage() / 1024 ** 2:.1f} MB on disk, read page by page)")
+        else:
+            st.caption(f"{total_lines:,} lines, {len(data):,} characters")
+
+def display_paginated_table(data, dataset_key):
+    """Show one page of a tabular dataset with server-side sorting and filtering"""
+    columns = [str(c) for c in data.columns]
+    
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_by = st.selectbox("Sort by", ["(none)"] + columns, key=f"preview_sort_{dataset_key}")
+    with col2:
+        ascending = st.radio("Order", ["Asc", "Desc"], horizontal=True,
+                             key=f"preview_order_{dataset_key}") == "Asc"
+    with col3:
+        filter_column = st.selectbox("Filter column", ["(none)"] + columns, key=f"preview_filter_col_{dataset_key}")
+    with col4:
+        filter_value = st.text_input("Contains / equals", key=f"preview_filter_{dataset_key}")
     
-    elif file_type in ['TXT', 'PDF']:
-        st.text_area("Text Content", data[:1000] + "..." if len(data) > 1000 else data)
+    sort_by = None if sort_by == "(none)" else sort_by
+    filter_column = None if filter_column == "(none)" else filter_column
+    page_sizes = get_setting('performance.preview.page_sizes', [10, 25, 50, 100])
+    page_size = st.session_state.get(f"preview_page_size_{dataset_key}", page_sizes[0])
+    page_number = st.session_state.get(f"preview_page_{dataset_key}", 1)
     
-    elif file_type in ['PNG', 'JPG', 'JPEG']:
-        st.text_area("Extracted Text", data[:500] + "..." if len(data) > 500 else data)
+    def fetch(page_number):
+        return get_page_cache().get_page(
+            dataset_key, data, page_number - 1, page_size, sort_by=sort_by, ascending=ascending,
+            filter_column=filter_column, filter_value=filter_value or None
+        )
+    
+    page, total_rows = fetch(page_number)
+    total_pages = max(1, -(-total_rows // page_size))
+    if page_number > total_pages:
+        # A filter or larger page size left fewer pages than the page being shown
+        page_number = total_pages
+        st.session_state[f"preview_page_{dataset_key}"] = page_number
+        page, total_rows = fetch(page_number)
+    st.dataframe(page, use_container_width=True)
+    
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        st.number_input(f"Page (of {total_pages:,})", 1, total_pages, key=f"preview_page_{dataset_key}")
+    with col2:
+        st.selectbox("Rows per page", page_sizes, key=f"preview_page_size_{dataset_key}")
+    with col3:
+        first = (page_number - 1) * page_size
+        st.caption(f"Rows {first + 1:,}–{first + len(page):,} of {total_rows:,}" if len(page)
+                   else f"No rows ({total_rows:,} in view)")
 
 def record_voice_input():
     """Record and process voice input"""
@@ -239,48 +690,104 @@ def record_voice_input():
     st.info("🎙️ Voice input feature coming soon!")
     return None
 
-def generate_eda_report(data, processor):
-    """Generate exploratory data analysis report"""
-    try:
-        with st.spinner("📊 Generating EDA report..."):
-            report = processor.generate_eda_report(data)
-            
-            st.subheader("📊 Exploratory Data Analysis")
-            
-            # Display visualizations if available
-            if 'plots' in report:
-                for plot_name, plot_path in report['plots'].items():
-                    if os.path.exists(plot_path):
-                        st.image(plot_path, caption=plot_name)
-            
-            # Display summary statistics
-            if 'summary' in report:
-                st.write("**Summary Statistics:**")
-                st.json(report['summary'])
-                
-    except Exception as e:
-        st.error(f"❌ EDA generation error: {str(e)}")
+def display_eda_report(report):
+    """Display an exploratory data analysis report"""
+    st.subheader("📊 Exploratory Data Analysis")
+    
+    # Display visualizations if available
+    if 'plots' in report:
+        for plot_name, plot_path in report['plots'].items():
+            if os.path.exists(plot_path):
+                st.image(plot_path, caption=plot_name)
+    
+    # Display summary statistics
+    if 'summary' in report:
+        st.write("**Summary Statistics:**")
+        st.json(report['summary'])
+
+def report_export_key(fmt):
+    """
+    Memo key of a report export; a new question produces a new report
+
+    The history length stops changing once it is trimmed, so the key also
+    fingerprints the latest interaction.
+    """
+    history = st.session_state.get('chat_history', [])
+    last = json.dumps(history[-1], sort_keys=True, default=str) if history else ""
+    fingerprint = hashlib.sha256(last.encode('utf-8')).hexdigest()[:16]
+    return f"export:report:{st.session_state.session_id}:{len(history)}:{fingerprint}:{fmt}"
 
-def download_analysis():
-    """Prepare analysis for download"""
-    if 'chat_history' in st.session_state:
-        # Create downloadable analysis report
-        report_content = "# Data Analysis Report\n\n"
+def submit_report_export(fmt):
+    """Write the analysis report to a file in the background"""
+    if not st.session_state.get('chat_history'):
+        st.warning("⚠️ No analysis history to download")
+        return
+    key = report_export_key(fmt)
+    job = get_job_manager().submit(
+        export_report, list(st.session_state.chat_history), dict(st.session_state.file_info), fmt,
+        name="Report export", memo_key=key, pool='export'
+    )
+    st.session_state.jobs['export:report'] = job.id
+
+def display_exports(data, dataset_key):
+    """Export the analysis report and the dataset, and serve finished exports from disk"""
+    with st.expander("📦 Export"):
+        col1, col2 = st.columns(2)
         
-        for i, chat in enumerate(st.session_state.chat_history):
-            report_content += f"## Question {i+1}\n"
-            report_content += f"**File:** {chat['file']}\n"
-            report_content += f"**Question:** {chat['question']}\n"
-            report_content += f"**Response:** {chat['response']}\n\n"
+        with col1:
+            report_format = st.selectbox("Report format", list(REPORT_FORMATS), key="export_report_fmt")
+            if st.button("📝 Export report"):
+                submit_report_export(report_format)
         
-        st.download_button(
-            label="📥 Download Report",
-            data=report_content,
-            file_name="data_analysis_report.md",
-            mime="text/markdown"
-        )
+        with col2:
+            tabular = isinstance(data, (pd.DataFrame, DatasetCollection, ParquetDataset))
+            dataset_format = st.selectbox("Dataset format", list(DATASET_FORMATS), key="export_dataset_fmt",
+                                          disabled=not tabular)
+            if st.button("📤 Export dataset", disabled=not tabular):
+                name = Path(st.session_state.file_info['name']).stem or 'dataset'
+                # JobManager.submit takes its own name argument, so the file name is bound here
+                job = get_job_manager().submit(
+                    functools.partial(export_dataset, name=name), data, dataset_format,
+                    name="Dataset export", chunk_rows=get_setting('export.chunk_rows', 50000),
+                    memo_key=f"export:{dataset_key}:{dataset_format}", pool='export'
+                )
+                st.session_state.jobs['export:dataset'] = job.id
+    
+    report_job = get_session_job('export:report')
+    if report_job is not None and render_job_status(report_job, "📝 Report export"):
+        offer_download(report_job, "data_analysis_report", REPORT_FORMATS, "📥 Download Report")
+    
+    dataset_job = get_session_job('export:dataset')
+    if dataset_job is not None and render_job_status(dataset_job, "📤 Dataset export"):
+        offer_download(dataset_job, "dataset_export", DATASET_FORMATS, "📥 Download Dataset")
+
+def offer_download(job, base_name, formats, label):
+    """
+    Serve a finished export from its file instead of an in-memory copy
+
+    The file is read only when the button is clicked, not on every rerun.
+    Exports removed by the export directory cleanup are forgotten, so the
+    next export request writes the file again.
+    """
+    path = job.result
+    if not path or not os.path.exists(path):
+        if job.memo_key:
+            get_job_manager().forget(job.memo_key)
+        st.warning("⚠️ Export file is no longer available, export again")
+        return
+    fmt = Path(path).suffix.lstrip('.')
+    st.caption(f"{label.split(' ', 1)[1]}: {os.path.getsize(path) / 1024 ** 2:.1f} MB")
+    button = dict(
+        label=label,
+        file_name=f"{base_name}.{fmt}",
+        mime=formats.get(fmt, 'application/octet-stream'),
+        key=f"download_{base_name}"
+    )
+    if LAZY_DOWNLOADS:
+        st.download_button(data=Path(path).read_bytes, on_click="ignore", **button)
     else:
-        st.warning("⚠️ No analysis history to download")
+        with open(path, 'rb') as handle:
+            st.download_button(data=handle, **button)
 
 if __name__ == "__main__":
     main()
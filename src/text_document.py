@@ -0,0 +1,270 @@
+"""
+Text Document Module
+Large text uploads kept on disk, memory-mapped and decoded incrementally in line-indexed chunks
+"""
+
+import os
+import json
+import mmap
+import uuid
+import shutil
+import bisect
+import codecs
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, List
+
+from preflight import detect_encoding
+
+INDEX_FILE = "_index.json"
+CONTENT_FILE = "content.txt"
+
+# Encodings tried, in order, when the detected one fails further into the file
+FALLBACK_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+def _split_lines(text: str) -> List[str]:
+    """Split on '\\n' only, keeping line endings (str.splitlines also splits on other separators)"""
+    parts = text.split('\n')
+    lines = [part + '\n' for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+class TextDocument:
+    """
+    Text file stored on disk with a chunk index
+
+    The file is memory-mapped and cut into chunks at line breaks. The index
+    records the byte range, first line and length of every chunk, so any
+    range of lines is served by decoding only the chunks that contain it and
+    the full decoded text is never held in memory. All supported encodings
+    (UTF-8, cp1252, Latin-1) encode '\\n' as a single byte that cannot occur
+    inside another character, so chunks decode independently.
+    """
+
+    def __init__(self, path: str, name: str = None, cache_chunks: int = 4):
+        """
+        Open an indexed document
+
+        Args:
+            path: Directory holding the content file and its index
+            name: Original file name
+            cache_chunks: Number of decoded chunks kept for repeated access
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.name = name or self.index.get('name')
+        self.encoding = self.index['encoding']
+        self._first_lines = [chunk['first_line'] for chunk in self.index['chunks']]
+        self._file = None
+        self._mmap = None
+        self._cache: "OrderedDict[int, List[str]]" = OrderedDict()
+        self._cache_chunks = cache_chunks
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_upload(cls, source, path: str, name: str, chunk_bytes: int = 1024 * 1024,
+                    sample_bytes: int = 64 * 1024,
+                    progress_callback: Callable[[int], None] = None) -> "TextDocument":
+        """
+        Copy an upload to disk and index it
+
+        The encoding is detected from a sample; if a later chunk does not
+        decode, indexing restarts with the next fallback encoding. A previous
+        import of the same content (same path) is reused.
+
+        Args:
+            source: Binary file object
+            path: Output directory (normally derived from the file fingerprint)
+            name: Original file name
+            chunk_bytes: Target size of an indexed chunk
+            sample_bytes: Bytes inspected to detect the encoding
+            progress_callback: Called with the number of bytes indexed so far
+
+        Returns:
+            TextDocument over the stored file
+        """
+        if os.path.exists(os.path.join(path, INDEX_FILE)):
+            return cls(path, name)
+
+        logger = logging.getLogger(__name__)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.partial"
+        os.makedirs(tmp_path)
+
+        try:
+            content_path = os.path.join(tmp_path, CONTENT_FILE)
+            source.seek(0)
+            with open(content_path, 'wb') as f:
+                shutil.copyfileobj(source, f, 1024 * 1024)
+            source.seek(0)
+
+            with open(content_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    raise ValueError("Text file is empty")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    detected = detect_encoding(mm[:sample_bytes])
+                    candidates = [detected] + [e for e in FALLBACK_ENCODINGS if e != detected.replace('-sig', '')]
+                    for encoding in candidates:
+                        try:
+                            index = cls._build_index(mm, encoding, chunk_bytes, progress_callback)
+                            break
+                        except UnicodeDecodeError:
+                            logger.info(f"{name} does not decode as {encoding}, trying the next encoding")
+                    else:
+                        raise ValueError("Unable to decode text file")
+
+            index['name'] = name
+            index['size_bytes'] = size
+            with open(os.path.join(tmp_path, INDEX_FILE), 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+
+            try:
+                os.rename(tmp_path, path)
+            except OSError:
+                # Another worker finished the same file first
+                if not os.path.exists(os.path.join(path, INDEX_FILE)):
+                    raise
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        logger.info(f"Indexed {name}: {index['lines']} lines in {len(index['chunks'])} chunks ({index['encoding']})")
+        return cls(path, name)
+
+    @staticmethod
+    def _build_index(mm: mmap.mmap, encoding: str, chunk_bytes: int,
+                     progress_callback: Callable[[int], None] = None) -> dict:
+        """Cut the mapped file into chunks at line breaks and record their lines and characters"""
+        start = 0
+        if encoding == 'utf-8-sig':
+            start = len(codecs.BOM_UTF8)
+            encoding = 'utf-8'
+
+        chunks, lines, chars = [], 0, 0
+        size = len(mm)
+        position = start
+        while position < size:
+            end = min(position + chunk_bytes, size)
+            if end < size:
+                cut = mm.rfind(b'\n', position, end)
+                if cut < 0:
+                    # A single line longer than a chunk stays whole
+                    cut = mm.find(b'\n', end)
+                end = size if cut < 0 else cut + 1
+
+            text = mm[position:end].decode(encoding)
+            chunk_lines = len(_split_lines(text))
+            chunks.append({'start': position, 'end': end, 'first_line': lines,
+                           'lines': chunk_lines, 'first_char': chars})
+            lines += chunk_lines
+            chars += len(text)
+            position = end
+            if progress_callback:
+                progress_callback(position)
+
+        return {'encoding': encoding, 'data_start': start, 'lines': lines, 'chars': chars, 'chunks': chunks}
+
+    @property
+    def line_count(self) -> int:
+        return self.index['lines']
+
+    @property
+    def size_bytes(self) -> int:
+        return self.index['size_bytes']
+
+    def __len__(self) -> int:
+        """Number of characters"""
+        return self.index['chars']
+
+    def memory_usage(self) -> int:
+        """Data stays on disk; only the chunk index is in memory"""
+        return 0
+
+    def disk_usage(self) -> int:
+        return os.path.getsize(os.path.join(self.path, CONTENT_FILE))
+
+    def _map(self) -> mmap.mmap:
+        with self._lock:
+            if self._mmap is None:
+                self._file = open(os.path.join(self.path, CONTENT_FILE), 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _chunk_lines(self, chunk_index: int) -> List[str]:
+        """Decoded lines of one chunk (cached)"""
+        with self._lock:
+            cached = self._cache.get(chunk_index)
+            if cached is not None:
+                self._cache.move_to_end(chunk_index)
+                return cached
+            chunk = self.index['chunks'][chunk_index]
+            lines = _split_lines(self._map()[chunk['start']:chunk['end']].decode(self.encoding))
+            self._cache[chunk_index] = lines
+            while len(self._cache) > self._cache_chunks:
+                self._cache.popitem(last=False)
+            return lines
+
+    def lines(self, start: int, stop: int) -> List[str]:
+        """
+        Get a range of lines
+
+        Args:
+            start: Zero-based index of the first line
+            stop: Index after the last line
+
+        Returns:
+            Lines including their line endings
+        """
+        start, stop = max(start, 0), min(stop, self.line_count)
+        result = []
+        if start >= stop:
+            return result
+        chunk_index = bisect.bisect_right(self._first_lines, start) - 1
+        while len(result) < stop - start and chunk_index < len(self._first_lines):
+            first = self._first_lines[chunk_index]
+            chunk_lines = self._chunk_lines(chunk_index)
+            result.extend(chunk_lines[max(start - first, 0):stop - first])
+            chunk_index += 1
+        return result
+
+    def read_lines(self, start: int, stop: int) -> str:
+        """Text of a range of lines"""
+        return "".join(self.lines(start, stop))
+
+    def head(self, n_chars: int = 500) -> str:
+        """First characters of the document"""
+        text = ""
+        for chunk in self.iter_chunks():
+            text += chunk[:n_chars - len(text)]
+            if len(text) >= n_chars:
+                break
+        return text
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Stream the decoded text chunk by chunk"""
+        mm = self._map()
+        for chunk in self.index['chunks']:
+            yield mm[chunk['start']:chunk['end']].decode(self.encoding)
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+                self._mmap = None
+                self._file = None
+            self._cache.clear()
+
+    def cleanup(self):
+        """Close the document and delete the stored copy (called when the store drops it)"""
+        self.close()
+        shutil.rmtree(self.path)
+
+def document_path(fingerprint: str, base_dir: str) -> str:
+    """Directory of the indexed copy of a text file"""
+    return os.path.join(base_dir, fingerprint)
@@ -0,0 +1,264 @@
+"""
+Time Series Module
+Detection of time-indexed data, LTTB downsampling for line plots and resampled aggregates for prompts
+"""
+
+import logging
+import warnings
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+
+def detect_time_series(data: pd.DataFrame, min_rows: int = 20, sample_size: int = 200,
+                       parse_threshold: float = 0.9) -> Optional[Dict[str, Any]]:
+    """
+    Detect whether a DataFrame is a time series
+
+    A datetime column is used directly; text columns qualify when at least
+    parse_threshold of a sample parses as dates. The first candidate that has
+    numeric columns alongside it wins.
+
+    Args:
+        data: pandas DataFrame
+        min_rows: Minimum number of rows for a time series
+        sample_size: Number of values sampled when checking text columns
+        parse_threshold: Fraction of sampled values that must parse as dates
+
+    Returns:
+        Dict with 'time_column', 'value_columns', 'start', 'end', 'frequency'
+        and 'monotonic', or None when no time series is found
+    """
+    if len(data) < min_rows:
+        return None
+
+    value_columns = [str(c) for c in data.select_dtypes(include=['number']).columns]
+    if not value_columns:
+        return None
+
+    for col in data.columns:
+        series = data[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            times = series
+        elif series.dtype == object:
+            sample = series.dropna().head(sample_size)
+            if sample.empty or not sample.map(lambda v: isinstance(v, str)).all():
+                continue
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                parsed = pd.to_datetime(sample, errors='coerce')
+            if parsed.notna().mean() < parse_threshold:
+                continue
+            times = to_datetime(series)
+        else:
+            continue
+
+        times = times.dropna()
+        if times.nunique() < min_rows:
+            continue
+
+        return {
+            'time_column': str(col),
+            'value_columns': [c for c in value_columns if c != str(col)],
+            'start': str(times.min()),
+            'end': str(times.max()),
+            'frequency': infer_frequency(times),
+            'monotonic': bool(times.is_monotonic_increasing)
+        }
+
+    return None
+
+def to_datetime(series: pd.Series) -> pd.Series:
+    """Convert a column to datetimes, turning unparseable values into NaT"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pd.to_datetime(series, errors='coerce')
+
+def infer_frequency(times: pd.Series) -> str:
+    """Describe the typical spacing of timestamps (pandas alias when regular, else the median step)"""
+    unique = pd.DatetimeIndex(times.drop_duplicates().sort_values())
+    if len(unique) >= 3:
+        try:
+            frequency = pd.infer_freq(unique[:1000])
+            if frequency:
+                return frequency
+        except (TypeError, ValueError):
+            pass
+    steps = unique.to_series().diff().dropna()
+    return f"~{steps.median()}" if not steps.empty else "unknown"
+
+RESAMPLE_RULES = [
+    ('60min', pd.Timedelta(hours=1), 'hour'),
+    ('D', pd.Timedelta(days=1), 'day'),
+    ('W', pd.Timedelta(weeks=1), 'week'),
+    ('MS', pd.Timedelta(days=30.44), 'month'),
+    ('QS', pd.Timedelta(days=91.31), 'quarter'),
+    ('YS', pd.Timedelta(days=365.25), 'year'),
+]
+
+def choose_resample_rule(start: pd.Timestamp, end: pd.Timestamp, max_periods: int = 60) -> str:
+    """Pick the finest of hourly to yearly buckets (or multi-year ones) that yields at most max_periods"""
+    span = end - start
+    for rule, period, _ in RESAMPLE_RULES:
+        if span / period < max_periods:
+            return rule
+    return f"{int(np.ceil(span / RESAMPLE_RULES[-1][1] / max(max_periods - 1, 1)))}YS"
+
+def describe_rule(rule: str) -> str:
+    """Readable bucket size of a resample rule ('QS' -> 'quarter', '5YS' -> '5 years')"""
+    for name, _, label in RESAMPLE_RULES:
+        if rule == name:
+            return label
+        if rule.endswith(name) and rule[:-len(name)].isdigit():
+            return f"{rule[:-len(name)]} {label}s"
+    return rule
+
+def resample_aggregates(data: pd.DataFrame, time_column: str, value_columns: List[str],
+                        rule: str = None, max_periods: int = 60) -> pd.DataFrame:
+    """
+    Aggregate value columns into min/mean/max per time bucket
+
+    The whole time range is always covered: if the rule yields more than
+    max_periods buckets, runs of adjacent buckets are merged evenly.
+
+    Args:
+        data: pandas DataFrame
+        time_column: Column holding the timestamps
+        value_columns: Numeric columns to aggregate
+        rule: pandas resample rule; chosen from the time span when omitted
+        max_periods: Upper bound on buckets
+
+    Returns:
+        DataFrame indexed by bucket start with (column, statistic) columns;
+        attrs['rule'] holds the resample rule and attrs['merged'] the number
+        of buckets merged into one (1 when none were)
+    """
+    frame = data[value_columns].copy()
+    frame.index = to_datetime(data[time_column])
+    frame = frame[frame.index.notna()].sort_index()
+    if frame.empty:
+        return pd.DataFrame()
+
+    rule = rule or choose_resample_rule(frame.index.min(), frame.index.max(), max_periods)
+    # Sums and counts rather than means, so merged buckets are weighted by their rows
+    buckets = frame.resample(rule).agg(['min', 'sum', 'count', 'max'])
+    counts = buckets.xs('count', axis=1, level=1)
+    buckets = buckets[(counts > 0).any(axis=1)]
+
+    merged = 1
+    if len(buckets) > max_periods:
+        merged = int(np.ceil(len(buckets) / max_periods))
+        groups = np.arange(len(buckets)) * max_periods // len(buckets)
+        starts = buckets.index[np.searchsorted(groups, np.arange(max_periods))]
+        stats = {'min': 'min', 'sum': 'sum', 'count': 'sum', 'max': 'max'}
+        buckets = buckets.groupby(groups).agg({col: stats[col[1]] for col in buckets.columns})
+        buckets.index = starts
+
+    aggregated = pd.DataFrame(index=buckets.index)
+    for col in value_columns:
+        count = buckets[(col, 'count')]
+        aggregated[(col, 'min')] = buckets[(col, 'min')]
+        aggregated[(col, 'mean')] = buckets[(col, 'sum')].where(count > 0) / count.where(count > 0)
+        aggregated[(col, 'max')] = buckets[(col, 'max')]
+    aggregated.columns = pd.MultiIndex.from_tuples(aggregated.columns)
+    aggregated.attrs.update({'rule': rule, 'merged': merged})
+    return aggregated
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int):
+    """
+    Downsample a line with the Largest-Triangle-Three-Buckets algorithm
+
+    Keeps the first and last points and, for each bucket in between, the point
+    forming the largest triangle with the previous pick and the mean of the
+    next bucket, which preserves peaks and troughs far better than striding.
+
+    Args:
+        x: Monotonically increasing x values (numeric)
+        y: y values
+        threshold: Number of points to keep
+
+    Returns:
+        Indices of the selected points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = bucket_edges[i], max(bucket_edges[i + 1], bucket_edges[i] + 1)
+        next_start = end
+        next_end = bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
+
+def downsample_series(data: pd.DataFrame, time_column: str, value_column: str,
+                      max_points: int = 1000) -> pd.Series:
+    """
+    Downsample one value column over time for plotting
+
+    Args:
+        data: pandas DataFrame
+        time_column: Column holding the timestamps
+        value_column: Numeric column to plot
+        max_points: Maximum number of points kept
+
+    Returns:
+        Series of values indexed by timestamp, at most max_points long
+    """
+    series = pd.Series(data[value_column].to_numpy(), index=to_datetime(data[time_column]))
+    series = series[series.index.notna() & series.notna()].sort_index()
+    if len(series) <= max_points:
+        return series
+
+    x = series.index.asi8.astype(float)
+    indices = lttb(x, series.to_numpy(dtype=float), max_points)
+    logging.getLogger(__name__).debug(f"LTTB reduced {value_column} from {len(series)} to {len(indices)} points")
+    return series.iloc[indices]
+
+def describe_time_series(data: pd.DataFrame, info: Dict[str, Any], max_periods: int = 30,
+                         max_columns: int = 5) -> str:
+    """
+    Describe a detected time series for the AI context
+
+    Args:
+        data: pandas DataFrame
+        info: Result of detect_time_series
+        max_periods: Maximum number of resampled periods listed
+        max_columns: Maximum number of value columns aggregated
+
+    Returns:
+        Text with the time range, frequency and resampled min/mean/max table
+    """
+    value_columns = info['value_columns'][:max_columns]
+    summary = (f"Time series on column '{info['time_column']}' from {info['start']} to {info['end']} "
+               f"(frequency {info['frequency']}).\n")
+    if not value_columns:
+        return summary
+
+    aggregated = resample_aggregates(data, info['time_column'], value_columns, max_periods=max_periods)
+    if not aggregated.empty:
+        bucket = describe_rule(aggregated.attrs['rule'])
+        periods = f"{len(aggregated)} periods covering the full range"
+        if aggregated.attrs['merged'] > 1:
+            periods += f", each of up to {aggregated.attrs['merged']} consecutive {bucket.rstrip('s')}s"
+        aggregated.columns = [f"{col}_{stat}" for col, stat in aggregated.columns]
+        summary += f"Resampled min/mean/max per {bucket} ({periods}):\n"
+        summary += aggregated.round(4).to_string()
+    return summary
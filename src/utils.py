@@ -8,6 +8,9 @@ import os
 import streamlit as st
 from datetime import datetime
 import json
+import uuid
+
+from settings import get_setting
 
 def setup_logging(log_level: str = None):
     """
@@ -49,17 +52,37 @@ def initialize_session_state():
     
     # Initialize session state variables if they don't exist
     session_vars = {
-        'processed_data': None,
+        'session_id': uuid.uuid4().hex,
+        'dataset_key': None,
         'file_info': None,
         'chat_history': [],
         'eda_report': None,
-        'current_analysis': None
+        'current_analysis': None,
+        'jobs': {},
+        'conversations': {},
+        'prewarmed': set(),
+        'upload_fingerprints': {}
     }
     
     for var, default_value in session_vars.items():
         if var not in st.session_state:
             st.session_state[var] = default_value
 
+def trim_chat_history(chat_history: list, max_items: int) -> list:
+    """
+    Keep only the most recent chat interactions
+    
+    Args:
+        chat_history: List of chat interactions
+        max_items: Maximum number of interactions to keep
+        
+    Returns:
+        Trimmed chat history
+    """
+    if max_items and len(chat_history) > max_items:
+        return chat_history[-max_items:]
+    return chat_history
+
 def validate_api_key(api_key: str) -> bool:
     """
     Validate if the API key looks correct
@@ -173,12 +196,16 @@ def get_file_type_emoji(file_extension: str) -> str:
     
     return emoji_map.get(file_extension.lower(), '📄')
 
-def create_download_link(data: str, filename: str, mime_type: str = "text/plain") -> str:
+def create_download_link(data, filename: str, mime_type: str = "text/plain") -> str:
     """
     Create a download link for data
     
+    The data is inlined into the page as base64, so this is only meant for
+    small payloads; larger ones are rejected and should be exported to a file
+    and served with st.download_button.
+    
     Args:
-        data: Data to download
+        data: Data to download (str or bytes)
         filename: Filename for download
         mime_type: MIME type for the file
         
@@ -187,7 +214,12 @@ def create_download_link(data: str, filename: str, mime_type: str = "text/plain"
     """
     import base64
     
-    b64_data = base64.b64encode(data.encode()).decode()
+    payload = data.encode() if isinstance(data, str) else data
+    max_bytes = get_setting('export.max_inline_kb', 1024) * 1024
+    if len(payload) > max_bytes:
+        raise ValueError(f"{filename} is {format_file_size(len(payload))}, too large for an inline download link")
+    
+    b64_data = base64.b64encode(payload).decode()
     href = f'<a href="data:{mime_type};base64,{b64_data}" download="{filename}">Download {filename}</a>'
     return href
 
@@ -255,6 +287,9 @@ def format_analysis_for_download(chat_history: list, file_info: dict = None) ->
     """
     Format chat history and analysis for download
     
+    Large reports should be written with exporters.export_report, which
+    streams the same content to a file.
+    
     Args:
         chat_history: List of chat interactions
         file_info: Information about the analyzed file
@@ -262,26 +297,9 @@ def format_analysis_for_download(chat_history: list, file_info: dict = None) ->
     Returns:
         Formatted markdown string
     """
-    content = "# Data Analysis Report\\n\\n"
-    content += f"**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\\n\\n"
-    
-    if file_info:
-        content += "## File Information\\n\\n"
-        content += f"- **File Name:** {file_info.get('name', 'N/A')}\\n"
-        content += f"- **File Type:** {file_info.get('type', 'N/A')}\\n"
-        content += f"- **File Size:** {format_file_size(file_info.get('size', 0))}\\n\\n"
-    
-    content += "## Analysis Results\\n\\n"
-    
-    for i, interaction in enumerate(chat_history, 1):
-        content += f"### Question {i}\\n\\n"
-        content += f"**Q:** {interaction.get('question', 'N/A')}\\n\\n"
-        content += f"**A:** {interaction.get('response', 'N/A')}\\n\\n"
-        content += "---\\n\\n"
-    
-    content += "\\n*Report generated by Data Analyst Agent*\\n"
+    from exporters import iter_report_markdown
     
-    return content
+    return "".join(iter_report_markdown(chat_history, file_info))
 
 class AnalysisCache:
     """Simple cache for analysis results to avoid redundant API calls"""
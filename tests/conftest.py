@@ -0,0 +1,9 @@
+"""
+Shared pytest configuration
+Modules in src/ import each other by bare name, so src is put on the path
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ai_agent
+from ai_agent import AIAgent
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeClient:
+    def __init__(self, api_key=None, base_url=None):
+        self.calls = []
+        self.rate_limited = set()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, temperature):
+        self.calls.append((model, max_tokens))
+        if model in self.rate_limited:
+            raise RateLimitError("Error code: 429")
+        message = SimpleNamespace(content=f"answer from {model}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(ai_agent.together, 'Together', FakeClient)
+    agent = AIAgent("key", model="big-model", max_tokens=500)
+    agent.model_tiers = {'fast': 'small-model', 'strong': 'big-model'}
+    agent.routes = {
+        'history_summary': {'tier': 'fast', 'max_tokens': 200, 'fallback_tier': 'strong'},
+        'suggest': {'tier': 'fast', 'fallback_tier': 'fast'},
+    }
+    agent.client.calls.clear()
+    return agent
+
+
+class TestResolveRoute:
+    def test_configured_route(self, agent):
+        assert agent.resolve_route('history_summary') == {
+            'task': 'history_summary', 'model': 'small-model', 'max_tokens': 200, 'fallback_model': 'big-model'}
+
+    def test_unrouted_task_uses_the_selected_model(self, agent):
+        route = agent.resolve_route('analysis')
+        assert (route['model'], route['max_tokens'], route['fallback_model']) == ('big-model', 500, None)
+
+    def test_fallback_to_the_same_model_is_dropped(self, agent):
+        assert agent.resolve_route('suggest')['fallback_model'] is None
+
+
+class TestRateLimits:
+    def test_single_attempt_falls_back_on_429(self, agent):
+        agent.client.rate_limited.add('small-model')
+        response = agent._get_ai_response("summarize", max_retries=1, task='history_summary')
+        assert response == "answer from big-model"
+        assert [model for model, _ in agent.client.calls] == ['small-model', 'big-model']
+
+    def test_rate_limit_without_fallback_fails_after_the_budget(self, agent, monkeypatch):
+        monkeypatch.setattr(ai_agent.time, 'sleep', lambda seconds: None)
+        agent.client.rate_limited.add('small-model')
+        with pytest.raises(ValueError):
+            agent._get_ai_response("suggest", max_retries=2, task='suggest')
+        assert [model for model, _ in agent.client.calls] == ['small-model', 'small-model']
@@ -0,0 +1,86 @@
+import bz2
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from compression import (detect_compression, strip_compression_extension, data_file_type, open_compressed,
+                         archive_members, estimate_gzip_size, member_fingerprint)
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+CSV = b"".join(b"%d,name_%d,%d\n" % (i, i, i * 7) for i in range(20_000))
+
+
+class TestDetection:
+    @pytest.mark.parametrize("data, expected", [
+        (gzip.compress(b"x"), 'gzip'),
+        (bz2.compress(b"x"), 'bz2'),
+        (b"a,b\n1,2\n", None),
+    ])
+    def test_magic_bytes(self, data, expected):
+        stream = io.BytesIO(data)
+        assert detect_compression(stream) == expected
+        assert stream.tell() == 0
+
+    def test_names(self):
+        assert strip_compression_extension('sales.csv.gz') == 'sales.csv'
+        assert strip_compression_extension('sales.csv') == 'sales.csv'
+        assert data_file_type('sales.csv.bz2') == 'CSV'
+
+
+class TestOpenCompressed:
+    def test_gzip_roundtrip(self):
+        wrapped = open_compressed(Upload('data.csv.gz', gzip.compress(CSV)))
+        assert wrapped.name == 'data.csv'
+        assert wrapped.size == len(CSV)
+        assert wrapped.read() == CSV
+        wrapped.seek(0)
+        assert wrapped.read(10) == CSV[:10]
+
+    def test_plain_upload_is_unchanged(self):
+        upload = Upload('data.csv', CSV)
+        assert open_compressed(upload) is upload
+
+    def test_zip_members(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('a.csv', b"x\n1\n")
+            archive.writestr('__MACOSX/._a.csv', b"junk")
+            archive.writestr('dir/', b"")
+        members = archive_members(Upload('bundle.zip', buffer.getvalue()))
+        assert [m.name for m in members] == ['bundle.zip/a.csv']
+        assert members[0].read() == b"x\n1\n"
+
+    def test_member_fingerprint(self):
+        assert member_fingerprint('abc', 'x.csv') == member_fingerprint('abc', 'x.csv')
+        assert member_fingerprint('abc', 'x.csv') != member_fingerprint('abc', 'y.csv')
+
+
+class TestGzipSize:
+    def test_trailer_used_when_plausible(self):
+        data = gzip.compress(CSV)
+        assert estimate_gzip_size(io.BytesIO(data), len(data)) == len(CSV)
+
+    def test_multi_member_trailer_is_a_lower_bound(self):
+        # The trailer only describes the tiny last member
+        data = gzip.compress(CSV) + gzip.compress(b"z")
+        estimate = estimate_gzip_size(io.BytesIO(data), len(data))
+        assert estimate > len(data)
+        assert estimate == pytest.approx(len(CSV), rel=0.5)
+
+    def test_files_above_4gb_use_the_sample_ratio(self):
+        data = gzip.compress(CSV)
+        stream = io.BytesIO(data)
+        stream.seek(5)
+        ratio = len(CSV) / len(data)
+        estimate = estimate_gzip_size(stream, 5 << 30)
+        assert estimate == pytest.approx((5 << 30) * ratio, rel=0.01)
+        assert stream.tell() == 5
@@ -0,0 +1,41 @@
+from conversation import Conversation
+
+
+class TestConversation:
+    def test_messages_keep_context_summary_and_window(self):
+        conversation = Conversation(window_turns=2)
+        conversation.set_summary("  earlier  ")
+        conversation.add_turn("q1", "a1")
+        messages = conversation.build_messages("context", "q2")
+        assert [m['role'] for m in messages] == ['system', 'system', 'user', 'assistant', 'user']
+        assert messages[0]['content'] == "context"
+        assert messages[1]['content'].endswith("earlier")
+        assert messages[-1]['content'] == "q2"
+
+    def test_old_turns_leave_the_window(self):
+        conversation = Conversation(window_turns=2)
+        evicted = [conversation.add_turn(f"q{i}", f"a{i}") for i in range(3)]
+        assert evicted[:2] == [[], []]
+        assert evicted[2] == [{'question': 'q0', 'response': 'a0'}]
+        assert [t['question'] for t in conversation.turns] == ['q1', 'q2']
+        assert conversation.total_turns == 3
+
+    def test_long_turns_are_truncated(self):
+        conversation = Conversation(max_turn_chars=10)
+        conversation.add_turn("x" * 50, "short")
+        assert conversation.turns[0]['question'] == "x" * 7 + "..."
+
+    def test_extractive_summary_is_bounded(self):
+        conversation = Conversation(max_summary_chars=60)
+        turns = [{'question': f'q{i}', 'response': f'Answer {i}. More detail.'} for i in range(5)]
+        summary = conversation.extractive_summary(turns)
+        assert len(summary) <= 60
+        assert summary.splitlines()[-1] == "- Q: q4 A: Answer 4."
+        assert "q0" not in summary
+
+    def test_clear(self):
+        conversation = Conversation()
+        conversation.add_turn("q", "a")
+        conversation.set_summary("s")
+        conversation.clear()
+        assert (conversation.turns, conversation.summary, conversation.total_turns) == ([], "", 0)
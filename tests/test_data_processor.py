@@ -0,0 +1,56 @@
+import io
+
+import pandas as pd
+import pytest
+
+from data_processor import DataProcessor
+from dataset_collection import DatasetCollection
+
+
+class NamedBytes(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+class TestDataProcessor:
+    def setup_method(self):
+        self.processor = DataProcessor()
+
+    def test_text_header_is_kept(self):
+        data = self.processor.process_file(NamedBytes("people.csv", b"name,city\nalice,paris\nbob,rome\n"))
+        assert list(data.columns) == ['name', 'city']
+        assert len(data) == 2
+
+    def test_alphanumeric_column_header_is_kept(self):
+        data = self.processor.process_file(NamedBytes("codes.csv", b"id,code\n1,AB12\n2,CD34\n"))
+        assert list(data.columns) == ['id', 'code']
+
+    def test_headerless_numeric_csv(self):
+        data = self.processor.process_file(NamedBytes("numbers.csv", b"1,2\n3,4\n5,6\n"))
+        assert len(data) == 3
+
+    def test_summary_with_integer_column_names(self):
+        summary = self.processor.get_data_summary(pd.DataFrame({0: [1, 2], 1: ['a', 'b']}))
+        assert "Columns: 0, 1" in summary
+
+    def test_collection_profile_does_not_combine_files(self, monkeypatch):
+        collection = DatasetCollection({'a.csv': pd.DataFrame({'x': [1, None], 'y': ['p', 'q']}),
+                                        'b.csv': pd.DataFrame({'x': [3, 5], 'y': ['r', None]})})
+        monkeypatch.setattr(collection, 'to_frame', lambda: pytest.fail("combined all files"))
+        profile = self.processor.profile_columns(collection)
+        assert profile['x']['missing'] == 1 and profile['y']['missing'] == 1
+        assert profile['x']['statistics']['mean'] == 3.0
+
+    @pytest.mark.parametrize("eager_mb, out_of_core_mb, strategy", [
+        (64, 256, 'eager'), (0.01, 256, 'chunked'), (0.01, 0.05, 'out_of_core')])
+    def test_strategy_thresholds_are_independent_of_the_size_cap(self, monkeypatch, eager_mb, out_of_core_mb, strategy):
+        settings = {'file_processing.max_file_size_mb': 1,
+                    'file_processing.preflight.eager_limit_mb': eager_mb,
+                    'performance.out_of_core.threshold_mb': out_of_core_mb}
+        monkeypatch.setattr('data_processor.get_setting', lambda key, default=None: settings.get(key, default))
+        upload = NamedBytes("rows.csv", b"name,value\n" + b"some text,1\n" * 20000)
+        report = self.processor.preflight(upload)
+        assert report['error'] is None
+        assert report['strategy'] == strategy
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_collection import DatasetCollection, group_compatible_frames
+
+
+@pytest.fixture
+def collection():
+    return DatasetCollection({
+        'a.csv': pd.DataFrame({'x': [1, 2, 3], 'y': ['p', 'q', 'r']}),
+        'b.csv': pd.DataFrame({'x': [4.0, np.nan], 'y': ['s', 't']}),
+    })
+
+
+class TestDatasetCollection:
+    def test_mismatched_columns_are_rejected(self):
+        with pytest.raises(ValueError):
+            DatasetCollection({'a.csv': pd.DataFrame({'x': [1]}), 'b.csv': pd.DataFrame({'z': [1]})})
+        with pytest.raises(ValueError):
+            DatasetCollection({})
+
+    def test_shape_and_head(self, collection):
+        assert collection.shape == (5, 2)
+        assert collection.rows_per_file() == {'a.csv': 3, 'b.csv': 2}
+        assert collection.head(4)['y'].tolist() == ['p', 'q', 'r', 's']
+
+    def test_take_keeps_requested_order(self, collection):
+        rows = collection.take([4, 0, 3])
+        assert rows['source_file'].tolist() == ['b.csv', 'a.csv', 'b.csv']
+        assert rows['y'].tolist() == ['t', 'p', 's']
+        assert collection.take([]).columns.tolist() == ['source_file', 'x', 'y']
+
+    def test_describe_matches_combined_frame(self, collection):
+        expected = collection.to_frame()[['x']].describe().loc[['count', 'mean', 'std', 'min', 'max']]
+        pd.testing.assert_frame_equal(collection.describe_numeric(), expected)
+
+    def test_describe_is_accurate_for_large_values(self):
+        rng = np.random.default_rng(0)
+        parts = {f'{i}.csv': pd.DataFrame({'x': 1e9 + rng.random(1000)}) for i in range(3)}
+        expected = pd.concat(parts.values())['x'].std()
+        std = DatasetCollection(parts).describe_numeric().loc['std', 'x']
+        assert std == pytest.approx(expected, rel=1e-6)
+
+    def test_describe_treats_text_in_later_parts_as_missing(self):
+        collection = DatasetCollection({'a.csv': pd.DataFrame({'x': [1.0, 3.0]}),
+                                        'b.csv': pd.DataFrame({'x': ['5', 'n/a']})})
+        stats = collection.describe_numeric()['x']
+        assert (stats['count'], stats['mean'], stats['max']) == (3, 3.0, 5.0)
+
+    def test_missing_counts(self, collection):
+        assert collection.missing_counts() == {'x': 1, 'y': 0}
+
+    def test_to_frame_is_not_kept(self, collection):
+        combined = collection.to_frame()
+        assert combined['source_file'].tolist() == ['a.csv'] * 3 + ['b.csv'] * 2
+        assert collection.to_frame() is not combined
+
+
+class TestGrouping:
+    def test_by_column_names(self):
+        frames = {'a': pd.DataFrame({'x': [1]}), 'b': pd.DataFrame({'y': [1]}), 'c': pd.DataFrame({'x': [2.5]})}
+        assert [list(group) for group in group_compatible_frames(frames)] == [['a', 'c'], ['b']]
+
+    def test_by_column_kind(self):
+        frames = {'a': pd.DataFrame({'x': [1]}), 'b': pd.DataFrame({'x': ['text']})}
+        assert [list(group) for group in group_compatible_frames(frames)] == [['a'], ['b']]
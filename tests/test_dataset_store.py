@@ -0,0 +1,163 @@
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_store
+from dataset_collection import DatasetCollection
+from dataset_store import DatasetStore, compute_fingerprint, combine_fingerprints, fingerprint_data
+from out_of_core import ParquetDataset
+from text_document import TextDocument
+
+
+def frame(rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'a': rng.integers(0, 100, rows), 'b': rng.random(rows)})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(memory_budget_mb=0.02, spill_dir=str(tmp_path / 'spill'), session_timeout_minutes=1)
+
+
+class TestFingerprints:
+    def test_upload_fingerprint_restores_position(self):
+        upload = io.BytesIO(b"a,b\n1,2\n")
+        upload.read(3)
+        first = compute_fingerprint(upload)
+        assert upload.tell() == 0
+        assert compute_fingerprint(io.BytesIO(b"a,b\n1,2\n")) == first
+
+    def test_combined_fingerprint_ignores_order(self):
+        assert combine_fingerprints(['x', 'y']) == combine_fingerprints(['y', 'x'])
+
+    def test_data_fingerprint(self):
+        assert fingerprint_data(frame()) == fingerprint_data(frame())
+        assert fingerprint_data(frame()) != fingerprint_data(frame(seed=1))
+
+
+class TestSpilling:
+    def test_least_recently_used_is_spilled_and_reloaded(self, store):
+        first, second = frame(), frame(seed=1)
+        store.put('first', first)
+        store.put('second', second)
+        stats = store.stats()
+        assert stats['datasets'] == 2 and stats['resident_datasets'] == 1
+        assert os.path.exists(os.path.join(store.spill_dir, 'first.arrow'))
+        pd.testing.assert_frame_equal(store.get('first'), first)
+
+    def test_collection_and_text(self, store):
+        collection = DatasetCollection({'x.csv': frame(), 'y.csv': frame(seed=2)})
+        store.put('collection', collection)
+        store.put('text', "some text " * 1000)
+        store.put('other', frame(seed=3))
+        assert store.get('text') == "some text " * 1000
+        reloaded = store.get('collection')
+        assert reloaded.names == ['x.csv', 'y.csv']
+        pd.testing.assert_frame_equal(reloaded.frames['y.csv'], collection.frames['y.csv'])
+
+    def test_spill_does_not_hold_the_lock(self, store, monkeypatch):
+        acquired = []
+        write_feather = dataset_store.feather.write_feather
+
+        def try_lock():
+            got = store._lock.acquire(timeout=1)
+            acquired.append(got)
+            if got:
+                store._lock.release()
+
+        def checking_write(*args, **kwargs):
+            # Another thread must be able to use the store while the file is written
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            write_feather(*args, **kwargs)
+
+        monkeypatch.setattr(dataset_store.feather, 'write_feather', checking_write)
+        store.put('first', frame())
+        store.put('second', frame(seed=1))
+        assert acquired == [True]
+        assert store.stats()['resident_datasets'] == 1
+
+    def test_reload_does_not_hold_the_lock(self, store, monkeypatch):
+        acquired = []
+        read_table = dataset_store.feather.read_table
+
+        def try_lock():
+            got = store._lock.acquire(timeout=1)
+            acquired.append(got)
+            if got:
+                store._lock.release()
+
+        def checking_read(*args, **kwargs):
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return read_table(*args, **kwargs)
+
+        first = frame()
+        store.put('first', first)
+        store.put('second', frame(seed=1))
+        monkeypatch.setattr(dataset_store.feather, 'read_table', checking_read)
+        pd.testing.assert_frame_equal(store.get('first'), first)
+        assert acquired == [True]
+
+    def test_dataset_dropped_during_reload_removes_its_file(self, store, monkeypatch):
+        read_table = dataset_store.feather.read_table
+
+        def dropping_read(*args, **kwargs):
+            table = read_table(*args, **kwargs)
+            with store._lock:
+                store._drop('first')
+            return table
+
+        store.put('first', frame())
+        store.put('second', frame(seed=1))
+        spilled = os.path.join(store.spill_dir, 'first.arrow')
+        monkeypatch.setattr(dataset_store.feather, 'read_table', dropping_read)
+        store.get('first')
+        assert not store.contains('first')
+        assert not os.path.exists(spilled)
+
+    def test_tracked_memory_counts_against_budget(self, store):
+        store.put('first', frame())
+        store.track_memory('preview', 10 * 1024 ** 2)
+        assert store.stats()['resident_datasets'] == 0
+        assert store.stats()['tracked_bytes'] == 10 * 1024 ** 2
+        store.untrack_memory('preview')
+        assert store.stats()['tracked_bytes'] == 0
+
+
+class TestCleanup:
+    def expire(self, store):
+        for entry in store._entries.values():
+            entry.last_access -= 3600
+        store.cleanup_expired()
+
+    def test_dropped_datasets_remove_their_files(self, store, tmp_path):
+        parquet = ParquetDataset.from_csv(io.BytesIO(b"a,b\n1,2\n3,4\n"), str(tmp_path / 'parquet'), 'p.csv')
+        document = TextDocument.from_upload(io.BytesIO(b"line one\nline two\n"), str(tmp_path / 'doc'), 'd.txt')
+        document.read_lines(0, 1)
+        store.put('parquet', parquet)
+        store.put('document', document)
+        store.put('first', frame())
+        store.put('second', frame(seed=1))
+        spilled = os.path.join(store.spill_dir, 'first.arrow')
+        assert os.path.exists(spilled)
+
+        self.expire(store)
+        assert store.stats()['datasets'] == 0
+        assert not os.path.exists(parquet.path)
+        assert not os.path.exists(document.path)
+        assert not os.path.exists(spilled)
+
+    def test_referenced_datasets_are_kept(self, store):
+        store.put('kept', frame(), session_id='session')
+        self.expire(store)
+        assert store.contains('kept')
+        store.release_session('session')
+        self.expire(store)
+        assert not store.contains('kept')
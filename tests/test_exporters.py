@@ -0,0 +1,140 @@
+import functools
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from dataset_collection import DatasetCollection
+import exporters
+from exporters import export_dataset, export_report, dataset_schema, cleanup_exports
+from jobs import JobManager, DONE
+
+HISTORY = [
+    {'question': 'What is the mean?', 'response': 'It is <b>4</b>', 'file': 'data.csv'},
+    {'question': 'And the max?', 'response': '9', 'file': 'data.csv'},
+]
+FILE_INFO = {'name': 'data.csv', 'type': 'text/csv', 'size': 2048}
+
+
+class TestReports:
+    def test_markdown(self, tmp_path):
+        path = export_report(HISTORY, FILE_INFO, 'md', str(tmp_path / 'report.md'))
+        text = open(path, encoding='utf-8').read()
+        assert "### Question 2" in text
+        assert "**A:** It is <b>4</b>" in text
+        assert "2.0 KB" in text
+
+    def test_html_escapes_answers(self, tmp_path):
+        path = export_report(HISTORY, FILE_INFO, 'html', str(tmp_path / 'report.html'))
+        assert "It is &lt;b&gt;4&lt;/b&gt;" in open(path, encoding='utf-8').read()
+
+    def test_json(self, tmp_path):
+        path = export_report(HISTORY, FILE_INFO, 'json', str(tmp_path / 'report.json'))
+        report = json.load(open(path, encoding='utf-8'))
+        assert report['interactions'] == HISTORY
+        assert report['file_info'] == FILE_INFO
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            export_report(HISTORY, FILE_INFO, 'pdf', str(tmp_path / 'report.pdf'))
+
+
+class TestDatasets:
+    def test_csv_in_chunks(self, tmp_path):
+        frame = pd.DataFrame({'a': range(10), 'b': list('abcdefghij')})
+        progress = []
+        path = export_dataset(frame, 'csv', str(tmp_path / 'out.csv'), chunk_rows=3,
+                              progress_callback=lambda fraction, message: progress.append(fraction))
+        pd.testing.assert_frame_equal(pd.read_csv(path), frame)
+        assert progress[-1] == 1.0 and len(progress) == 4
+
+    def test_parquet_with_null_first_chunk(self, tmp_path):
+        frame = pd.DataFrame({
+            'label': [None] * 5 + ['x', 'y', 'z'],
+            'value': [np.nan] * 5 + [1.5, 2.5, 3.5],
+        })
+        path = export_dataset(frame, 'parquet', str(tmp_path / 'out.parquet'), chunk_rows=5)
+        table = pq.read_table(path)
+        assert str(table.schema.field('label').type) == 'string'
+        assert table.to_pandas()['label'].tolist()[5:] == ['x', 'y', 'z']
+
+    def test_parquet_collection_promotes_types(self, tmp_path):
+        collection = DatasetCollection({
+            'a.csv': pd.DataFrame({'n': [1, 2]}),
+            'b.csv': pd.DataFrame({'n': [0.5, np.nan]}),
+        })
+        schema = dataset_schema(collection)
+        assert schema.names == ['source_file', 'n']
+        assert str(schema.field('n').type) == 'double'
+
+        path = export_dataset(collection, 'parquet', str(tmp_path / 'out.parquet'))
+        result = pq.read_table(path).to_pandas()
+        assert result['source_file'].tolist() == ['a.csv', 'a.csv', 'b.csv', 'b.csv']
+        assert result['n'].tolist()[:3] == [1.0, 2.0, 0.5]
+
+    def test_jsonl_and_html(self, tmp_path):
+        frame = pd.DataFrame({'a': [1, 2], 'b': ['<x>', None]})
+        jsonl = export_dataset(frame, 'json', str(tmp_path / 'out.jsonl'))
+        assert [json.loads(line) for line in open(jsonl)] == [{'a': 1, 'b': '<x>'}, {'a': 2, 'b': None}]
+        page = open(export_dataset(frame, 'html', str(tmp_path / 'out.html')), encoding='utf-8').read()
+        assert "<td>&lt;x&gt;</td>" in page and "<td></td>" in page
+
+    def test_xlsx(self, tmp_path):
+        frame = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+        path = export_dataset(frame, 'xlsx', str(tmp_path / 'out.xlsx'))
+        pd.testing.assert_frame_equal(pd.read_excel(path), frame)
+
+    def test_name_survives_job_submission(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('exporters.export_dir', lambda: str(tmp_path))
+        manager = JobManager(max_workers=1)
+        job = manager.submit(functools.partial(export_dataset, name='sales'), pd.DataFrame({'a': [1]}), 'csv',
+                             name="Dataset export")
+        job.future.result(timeout=10)
+        assert job.status == DONE
+        assert os.path.basename(job.result).startswith('sales_')
+
+    def test_failed_export_leaves_no_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(exporters, 'EXCEL_MAX_ROWS', 3)
+        with pytest.raises(ValueError):
+            export_dataset(pd.DataFrame({'a': range(10)}), 'xlsx', str(tmp_path / 'out.xlsx'), chunk_rows=2)
+        assert os.listdir(tmp_path) == []
+
+
+class TestCleanup:
+    def make(self, directory, name, size, age_hours):
+        path = directory / name
+        path.write_bytes(b"x" * size)
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_old_exports_are_removed(self, tmp_path):
+        self.make(tmp_path, 'old.csv', 10, 30)
+        self.make(tmp_path, 'new.csv', 10, 1)
+        assert cleanup_exports(str(tmp_path), max_age_hours=24) == 1
+        assert os.listdir(tmp_path) == ['new.csv']
+
+    def test_oldest_removed_over_size_limit_but_newest_kept(self, tmp_path):
+        for age, name in enumerate(['c.csv', 'b.csv', 'a.csv']):
+            self.make(tmp_path, name, 1024, age)
+        cleanup_exports(str(tmp_path), max_size_mb=2 / 1024)
+        assert sorted(os.listdir(tmp_path)) == ['b.csv', 'c.csv']
+        cleanup_exports(str(tmp_path), max_size_mb=0)
+        assert os.listdir(tmp_path) == ['c.csv']
+
+    def test_recent_partial_files_are_kept(self, tmp_path):
+        self.make(tmp_path, 'out.1234abcd.partial.csv', 10, 1)
+        self.make(tmp_path, 'out.5678abcd.partial.csv', 10, 30)
+        cleanup_exports(str(tmp_path), max_age_hours=24, max_size_mb=0)
+        assert os.listdir(tmp_path) == ['out.1234abcd.partial.csv']
+
+    def test_export_directory_is_cleaned(self, tmp_path, monkeypatch):
+        settings = {'export.directory': str(tmp_path), 'export.max_age_hours': 1}
+        monkeypatch.setattr('exporters.get_setting', lambda key, default=None: settings.get(key, default))
+        self.make(tmp_path, 'stale.md', 10, 2)
+        path = export_report(HISTORY, FILE_INFO, 'md')
+        assert os.listdir(tmp_path) == [os.path.basename(path)]
@@ -0,0 +1,71 @@
+import threading
+
+from jobs import JobManager, DONE, FAILED, CANCELLED
+
+
+def wait(job):
+    job.future.result(timeout=10)
+    return job
+
+
+class TestJobManager:
+    def test_result_and_progress(self):
+        def work(x, progress_callback):
+            progress_callback(0.5, "halfway")
+            return x * 2
+
+        job = wait(JobManager(max_workers=1).submit(work, 21, name="double"))
+        assert (job.status, job.result, job.progress, job.name) == (DONE, 42, 1.0, "double")
+
+    def test_failure(self):
+        def fail(progress_callback):
+            raise ValueError("boom")
+
+        job = wait(JobManager(max_workers=1).submit(fail))
+        assert job.status == FAILED and job.error == "boom"
+
+    def test_memoized_jobs_are_reused(self):
+        manager = JobManager(max_workers=1)
+        first = wait(manager.submit(lambda progress_callback: object(), memo_key='key'))
+        assert manager.submit(lambda progress_callback: None, memo_key='key') is first
+        manager.forget('key')
+        assert manager.submit(lambda progress_callback: None, memo_key='key') is not first
+
+    def test_cancel_running_job(self):
+        started, release = threading.Event(), threading.Event()
+
+        def work(progress_callback):
+            started.set()
+            release.wait(timeout=10)
+            progress_callback(0.9)
+
+        manager = JobManager(max_workers=1)
+        job = manager.submit(work)
+        started.wait(timeout=10)
+        assert manager.cancel(job.id)
+        release.set()
+        assert wait(job).status == CANCELLED
+
+    def test_separate_pools_do_not_block_each_other(self):
+        release = threading.Event()
+        manager = JobManager(max_workers=1, pools={'export': 1})
+        blocked = manager.submit(lambda progress_callback: release.wait(timeout=10), pool='export')
+        try:
+            quick = wait(manager.submit(lambda progress_callback: 'done'))
+            assert quick.result == 'done'
+            assert blocked.active
+        finally:
+            release.set()
+        assert wait(blocked).status == DONE
+
+    def test_unknown_pool_uses_the_default(self):
+        job = wait(JobManager(max_workers=1).submit(lambda progress_callback: 1, pool='missing'))
+        assert job.result == 1
+
+    def test_keyword_arguments_reach_the_callable(self):
+        def work(progress_callback, **kwargs):
+            return kwargs
+
+        job = wait(JobManager(max_workers=1).submit(work, name="job name", chunk_rows=5))
+        assert job.result == {'chunk_rows': 5}
+        assert job.name == "job name"
@@ -0,0 +1,21 @@
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from load_test import percentile
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        values = list(range(1, 11))
+        assert percentile(values, 50) == 5
+        assert percentile(values, 90) == 9
+        assert percentile(values, 95) == 10
+        assert percentile(values, 100) == 10
+        assert percentile(values, 0) == 1
+
+    def test_unordered_and_empty(self):
+        assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+        assert math.isnan(percentile([], 50))
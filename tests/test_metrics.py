@@ -0,0 +1,40 @@
+import pytest
+
+from metrics import MetricsRegistry, size_class
+
+
+class TestRegistry:
+    def test_counter_and_histogram_render(self):
+        registry = MetricsRegistry(namespace="test")
+        registry.counter('requests_total', "Requests").inc(cache='plots', result='hit')
+        registry.counter('requests_total').inc(2, result='hit', cache='plots')
+        registry.histogram('size_bytes', buckets=(10, 100)).observe(50)
+
+        text = registry.render_prometheus()
+        assert '# TYPE test_requests_total counter' in text
+        assert 'test_requests_total{cache="plots",result="hit"} 3' in text
+        assert 'test_size_bytes_bucket{le="10.0"} 0' in text
+        assert 'test_size_bytes_bucket{le="100.0"} 1' in text
+        assert 'test_size_bytes_bucket{le="+Inf"} 1' in text
+
+    def test_timer_records_outcome(self):
+        registry = MetricsRegistry(namespace="test")
+        with registry.timer('load'):
+            pass
+        with pytest.raises(RuntimeError):
+            with registry.timer('load'):
+                raise RuntimeError
+
+        calls = {row['labels']: row['value'] for row in registry.snapshot() if 'value' in row}
+        assert calls == {'stage=load, status=ok': 1, 'stage=load, status=error': 1}
+        [duration] = [row for row in registry.snapshot() if 'count' in row]
+        assert duration['count'] == 2
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry(namespace="test")
+        registry.counter('files_total').inc(name='a"b\nc')
+        assert 'test_files_total{name="a\\"b\\nc"} 1' in registry.render_prometheus()
+
+
+def test_size_class():
+    assert [size_class(n * 1024 ** 2) for n in (0.5, 5, 50, 500)] == ["<1MB", "1-10MB", "10-100MB", ">=100MB"]
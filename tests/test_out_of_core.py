@@ -0,0 +1,105 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import out_of_core
+from out_of_core import ParquetDataset
+
+CSV = b"id;score;label\n1;0.5;a\n2;;b\n3;2.5;\n4;3.0;d\n5;4.5;e\n"
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return ParquetDataset.from_csv(io.BytesIO(CSV), str(tmp_path / 'scores'), 'scores.csv',
+                                   chunk_rows=2, read_options={'sep': ';'})
+
+
+class TestParquetDataset:
+    def test_delimiter_and_partitions(self, dataset):
+        assert list(dataset.columns) == ['id', 'score', 'label']
+        assert len(dataset) == 5
+        assert len(dataset.parts) == 3
+
+    def test_slice_across_partitions(self, dataset):
+        frame = dataset.slice(1, 3)
+        assert frame['id'].tolist() == [2, 3, 4]
+        assert list(frame.index) == [1, 2, 3]
+
+    def test_take_and_missing(self, dataset):
+        assert dataset.take([4, 0])['id'].tolist() == [5, 1]
+        assert dataset.missing_counts() == {'id': 0, 'score': 1, 'label': 1}
+
+    def test_describe_numeric(self, dataset):
+        stats = dataset.describe_numeric()
+        assert stats.loc['count', 'score'] == 4
+        assert stats.loc['mean', 'score'] == pytest.approx(2.625)
+        assert stats.loc['max', 'id'] == 5
+
+    def test_streamed_statistics_without_duckdb(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(out_of_core, 'duckdb', None)
+        values = 1e9 + np.random.default_rng(0).random(1000)
+        csv = ("x\n" + "\n".join(repr(float(v)) for v in values) + "\n").encode()
+        data = ParquetDataset.from_csv(io.BytesIO(csv), str(tmp_path / 'large'), 'large.csv', chunk_rows=300)
+        stats = data.describe_numeric()
+        assert stats.loc['count', 'x'] == 1000
+        assert stats.loc['mean', 'x'] == pytest.approx(values.mean(), rel=1e-12)
+        assert stats.loc['std', 'x'] == pytest.approx(values.std(ddof=1), rel=1e-6)
+
+    def test_conversion_is_reused(self, dataset, tmp_path):
+        again = ParquetDataset.from_csv(io.BytesIO(b"unused\n"), str(tmp_path / 'scores'), 'scores.csv')
+        assert len(again) == 5
+
+    def test_headerless(self, tmp_path):
+        data = ParquetDataset.from_csv(io.BytesIO(b"1,2\n3,4\n"), str(tmp_path / 'plain'), 'plain.csv',
+                                       read_options={'header': None})
+        assert list(data.columns) == ['0', '1']
+        assert data.head()['1'].tolist() == [2, 4]
+
+
+class TestOutOfCoreProcessing:
+    def test_sniffed_options_are_used(self, tmp_path, monkeypatch):
+        from data_processor import DataProcessor
+
+        monkeypatch.setattr('data_processor.get_setting',
+                            lambda key, default=None: str(tmp_path) if key == 'performance.out_of_core.dir' else default)
+        upload = io.BytesIO(CSV)
+        upload.name = 'scores.csv'
+        upload.size = len(CSV)
+        data = DataProcessor()._process_csv_out_of_core(upload, {'delimiter': ';', 'has_header': True,
+                                                                  'encoding': 'utf-8'})
+        assert list(data.columns) == ['id', 'score', 'label']
+        assert np.isnan(data.head()['score'][1])
+
+    def test_known_fingerprint_is_not_recomputed(self, tmp_path, monkeypatch):
+        from data_processor import DataProcessor
+
+        settings = {'performance.out_of_core.dir': str(tmp_path),
+                    'file_processing.preflight.eager_limit_mb': 0,
+                    'performance.out_of_core.threshold_mb': 0}
+        monkeypatch.setattr('data_processor.get_setting', lambda key, default=None: settings.get(key, default))
+        monkeypatch.setattr('data_processor.compute_fingerprint', lambda f: pytest.fail("upload hashed again"))
+        upload = io.BytesIO(CSV)
+        upload.name = 'scores.csv'
+        upload.size = len(CSV)
+        results, errors = DataProcessor().process_files([upload], fingerprints={'scores.csv': 'abc123'})
+        assert errors == {}
+        assert isinstance(results['scores.csv'], ParquetDataset)
+        assert os.path.basename(results['scores.csv'].path) == 'abc123'
+
+    def test_eda_plots_are_cached_by_dataset_fingerprint(self, dataset, monkeypatch):
+        from data_processor import DataProcessor
+        from dataset_store import fingerprint_data
+
+        fingerprints = []
+
+        class Cache:
+            def get_or_render(self, fingerprint, spec, render_params, render):
+                fingerprints.append(fingerprint)
+                return 'plot.png'
+
+        monkeypatch.setattr('data_processor.get_plot_cache', lambda: Cache())
+        DataProcessor().generate_eda_report(dataset)
+        assert fingerprints and set(fingerprints) == {fingerprint_data(dataset)}
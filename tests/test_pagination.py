@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_collection import DatasetCollection
+from dataset_store import DatasetStore
+from pagination import PagedView, PageCache, text_page
+
+
+def make_frame():
+    return pd.DataFrame({
+        'id': [3, 1, 2, 5, 4],
+        'mixed': [1, 'x', 3.5, None, 'y'],
+        'city': ['Paris', 'Rome', None, 'paris', 'Oslo'],
+    })
+
+
+class TestPagedView:
+    def test_unsorted_view_holds_no_indices(self):
+        frame = make_frame()
+        view = PagedView(frame)
+        assert view.memory_bytes == 0
+        assert view.total_rows == 5
+        assert list(view.page(frame, 1, 2)['id']) == [2, 5]
+
+    def test_sort_descending(self):
+        frame = make_frame()
+        view = PagedView(frame, sort_by='id', ascending=False)
+        page = view.page(frame, 0, 5)
+        assert list(page['id']) == [5, 4, 3, 2, 1]
+        assert list(page.index) == [0, 1, 2, 3, 4]
+
+    def test_mixed_type_column_sorts_as_text(self):
+        frame = make_frame()
+        view = PagedView(frame, sort_by='mixed')
+        page = view.page(frame, 0, 5)
+        assert list(page['id']) == [3, 2, 1, 4, 5]  # '1', '3.5', 'x', 'y', then null
+
+    def test_mixed_type_column_filters(self):
+        frame = make_frame()
+        view = PagedView(frame, filter_column='mixed', filter_value='x')
+        assert view.total_rows == 1
+
+    def test_text_filter_is_case_insensitive(self):
+        frame = make_frame()
+        view = PagedView(frame, sort_by='id', filter_column='city', filter_value='PAR')
+        assert list(view.page(frame, 0, 10)['id']) == [3, 5]
+
+    def test_numeric_filter(self):
+        frame = make_frame()
+        assert PagedView(frame, filter_column='id', filter_value='4').total_rows == 1
+
+    def test_collection_pages_by_global_position(self, monkeypatch):
+        collection = DatasetCollection({
+            'a.csv': pd.DataFrame({'v': [5, 1]}),
+            'b.csv': pd.DataFrame({'v': [3, 4]}),
+        })
+        # No combined copy may be built
+        monkeypatch.setattr(collection, 'to_frame', lambda: pytest.fail("combined all files"))
+        view = PagedView(collection, sort_by='v')
+        page = view.page(collection, 0, 4)
+        assert list(page['v']) == [1, 3, 4, 5]
+        assert list(page['source_file']) == ['a.csv', 'b.csv', 'b.csv', 'a.csv']
+
+
+class TestPageCache:
+    def test_view_memory_counts_against_store_budget(self):
+        store = DatasetStore(memory_budget_mb=1)
+        frame = pd.DataFrame({'v': np.arange(1000)})
+        store.put('key', frame)
+        cache = PageCache(max_views=1, store=store)
+
+        cache.get_page('key', frame, 0, 10, sort_by='v', ascending=False)
+        assert store.stats()['tracked_bytes'] == 1000 * 8
+
+        cache.get_page('key', frame, 0, 10, sort_by='v', ascending=True)  # Evicts the first view
+        assert store.stats()['tracked_bytes'] == 1000 * 8
+
+        cache.clear()
+        assert store.stats()['tracked_bytes'] == 0
+
+    def test_pages_are_cached(self):
+        frame = make_frame()
+        cache = PageCache(store=DatasetStore())
+        first = cache.get_page('key', frame, 0, 2, sort_by='id')
+        assert cache.get_page('key', frame, 0, 2, sort_by='id') is first
+        assert first[1] == 5
+
+
+def test_text_page():
+    text = "a\nb\nc\nd"
+    assert text_page(text, 1, 2) == ("c\nd", 4)
+    assert text_page(text, 5, 2) == ("", 4)
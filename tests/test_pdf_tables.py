@@ -0,0 +1,153 @@
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import pdf_tables
+from pdf_tables import merge_tables, table_to_frame, extract_pdf
+
+reportlab = pytest.importorskip("reportlab")
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, PageBreak  # noqa: E402
+from reportlab.lib.styles import getSampleStyleSheet  # noqa: E402
+
+
+def write_pdf(path, pages):
+    """Each page is a list of ('text', str) or ('table', rows) items"""
+    story = []
+    style = getSampleStyleSheet()['Normal']
+    for i, page in enumerate(pages):
+        if i:
+            story.append(PageBreak())
+        for kind, content in page:
+            if kind == 'text':
+                story.append(Paragraph(content, style))
+            else:
+                table = Table(content)
+                table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, (0, 0, 0))]))
+                story.append(table)
+    SimpleDocTemplate(str(path), pagesize=A4).build(story)
+    return str(path)
+
+
+SALES = [['region', 'amount'], ['north', '1,200'], ['south', '(300)'], ['east', '450']]
+
+
+class TestMergeTables:
+    def page(self, index, tables, height=800):
+        return {'page': index, 'height': height, 'text': '', 'tables': tables}
+
+    def test_continuation_drops_repeated_header(self):
+        pages = [
+            self.page(0, [{'rows': [['a', 'b'], ['1', '2']], 'top': 400, 'bottom': 790}]),
+            self.page(1, [{'rows': [['a', 'b'], ['3', '4']], 'top': 20, 'bottom': 200}]),
+        ]
+        merged = merge_tables(pages)
+        assert len(merged) == 1
+        assert merged[0]['rows'] == [['a', 'b'], ['1', '2'], ['3', '4']]
+        assert (merged[0]['first_page'], merged[0]['last_page']) == (0, 1)
+
+    def test_separate_tables(self):
+        pages = [
+            self.page(0, [{'rows': [['a', 'b'], ['1', '2']], 'top': 100, 'bottom': 300}]),
+            self.page(1, [{'rows': [['a', 'b'], ['3', '4']], 'top': 20, 'bottom': 200}]),
+        ]
+        assert len(merge_tables(pages)) == 2
+
+
+class TestTableToFrame:
+    def test_numeric_and_header_cleanup(self):
+        frame = table_to_frame([['name', None, 'name'], ['x', None, '1'], [None, None, None], ['y', None, '2']])
+        assert list(frame.columns) == ['name', 'name_2']
+        assert frame['name_2'].tolist() == [1, 2]
+
+    def test_accounting_numbers(self):
+        frame = table_to_frame(SALES)
+        assert frame['amount'].tolist() == [1200, -300, 450]
+
+    def test_header_only(self):
+        assert table_to_frame([['a', 'b']]) is None
+
+
+class TestExtractPdf:
+    def test_tables_and_text_in_process(self, tmp_path):
+        path = write_pdf(tmp_path / 'report.pdf', [[('text', 'Quarterly sales summary'), ('table', SALES)]])
+        result = extract_pdf(path, pages_per_task=8, min_rows=2)
+        assert len(result['tables']) == 1
+        assert result['tables'][0]['frame']['region'].tolist() == ['north', 'south', 'east']
+        assert 'Quarterly sales summary' in result['text']
+
+    def test_parallel_pages(self, tmp_path):
+        path = write_pdf(tmp_path / 'report.pdf', [
+            [('text', 'First page'), ('table', SALES)],
+            [('text', 'Second page'), ('table', [['k', 'v'], ['a', '1'], ['b', '2']])],
+        ])
+        result = extract_pdf(path, pages_per_task=1, min_rows=2, timeout=120)
+        assert [t['first_page'] for t in result['tables']] == [1, 2]
+        assert 'First page' in result['text'] and 'Second page' in result['text']
+
+    def test_broken_pool_is_replaced(self, tmp_path, monkeypatch):
+        class BrokenPool:
+            shutdown_called = False
+
+            def submit(self, *args, **kwargs):
+                future = Future()
+                future.set_exception(BrokenProcessPool("worker died"))
+                return future
+
+            def shutdown(self, wait=True):
+                BrokenPool.shutdown_called = True
+
+        class WorkingPool:
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+        pools = [BrokenPool(), WorkingPool()]
+        monkeypatch.setattr(pdf_tables, '_pool', None)
+        monkeypatch.setattr(pdf_tables, '_get_pool', lambda: pools[0])
+        real_discard = pdf_tables._discard_pool
+
+        def discard(pool, futures, terminate=False):
+            real_discard(pool, futures, terminate)
+            pools.pop(0)
+
+        monkeypatch.setattr(pdf_tables, '_discard_pool', discard)
+        path = write_pdf(tmp_path / 'report.pdf', [[('table', SALES)], [('table', SALES)]])
+        result = extract_pdf(path, pages_per_task=1, min_rows=2)
+        assert BrokenPool.shutdown_called
+        assert len(result['tables']) == 2
+
+    def test_timeout_cancels_pending_ranges(self, tmp_path, monkeypatch):
+        class StuckPool:
+            futures = []
+            shutdown_calls = []
+
+            def submit(self, *args, **kwargs):
+                StuckPool.futures.append(Future())
+                return StuckPool.futures[-1]
+
+            def shutdown(self, wait=True):
+                StuckPool.shutdown_calls.append(wait)
+
+        monkeypatch.setattr(pdf_tables, '_pool', None)
+        monkeypatch.setattr(pdf_tables, '_get_pool', lambda: StuckPool())
+        path = write_pdf(tmp_path / 'report.pdf', [[('table', SALES)], [('table', SALES)]])
+        with pytest.raises(TimeoutError):
+            extract_pdf(path, pages_per_task=1, min_rows=2, timeout=0.01)
+        assert len(StuckPool.futures) == 2 and all(f.cancelled() for f in StuckPool.futures)
+        assert StuckPool.shutdown_calls == [False]
+
+
+class TestProcessPdf:
+    def test_text_kept_alongside_tables(self, tmp_path):
+        from data_processor import DataProcessor
+
+        path = write_pdf(tmp_path / 'report.pdf', [[('text', 'Sales grew in the north'), ('table', SALES)]])
+        upload = io.BytesIO(open(path, 'rb').read())
+        upload.name = 'report.pdf'
+        result = DataProcessor()._process_pdf(upload)
+        assert set(result) == {'table_1_p1', 'text'}
+        assert 'Sales grew in the north' in result['text']
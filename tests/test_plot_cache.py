@@ -0,0 +1,54 @@
+import os
+
+from plot_cache import PlotCache
+
+
+def writer(content, calls):
+    def render(path):
+        calls.append(path)
+        with open(path, 'wb') as f:
+            f.write(content)
+    return render
+
+
+class TestPlotCache:
+    def test_rendered_once_per_key(self, tmp_path):
+        cache = PlotCache(str(tmp_path))
+        calls = []
+        spec, params = {'kind': 'hist', 'column': 'x'}, {'dpi': 100}
+        first = cache.get_or_render('fp', spec, params, writer(b"png", calls))
+        second = cache.get_or_render('fp', spec, params, writer(b"png", calls))
+        assert first == second and len(calls) == 1
+        assert open(first, 'rb').read() == b"png"
+        assert cache.get_or_render('fp', spec, {'dpi': 200}, writer(b"png", calls)) != first
+
+    def test_failed_render_leaves_no_file(self, tmp_path):
+        cache = PlotCache(str(tmp_path))
+
+        def fail(path):
+            open(path, 'wb').close()
+            raise RuntimeError("render failed")
+
+        try:
+            cache.get_or_render('fp', {}, {}, fail)
+        except RuntimeError:
+            pass
+        assert os.listdir(tmp_path) == []
+
+    def test_oldest_plots_are_evicted(self, tmp_path):
+        cache = PlotCache(str(tmp_path), max_size_mb=1.5 / 1024)
+        calls = []
+        old = cache.get_or_render('fp', {'n': 1}, {}, writer(b"x" * 1024, calls))
+        new = cache.get_or_render('fp', {'n': 2}, {}, writer(b"x" * 1024, calls))
+        assert not os.path.exists(old) and os.path.exists(new)
+        assert cache.stats()['plots'] == 1
+
+    def test_plots_survive_restarts(self, tmp_path):
+        calls = []
+        path = PlotCache(str(tmp_path)).get_or_render('fp', {}, {}, writer(b"png", calls))
+        open(os.path.join(tmp_path, 'stale.tmp.png'), 'wb').close()
+
+        reopened = PlotCache(str(tmp_path))
+        assert reopened.get_or_render('fp', {}, {}, writer(b"png", calls)) == path
+        assert len(calls) == 1
+        assert sorted(os.listdir(tmp_path)) == [os.path.basename(path)]
@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from preflight import sniff_header, sniff_upload, choose_strategy, EAGER, CHUNKED, OUT_OF_CORE
+
+
+class NamedBytes(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+class TestSniffHeader:
+    @pytest.mark.parametrize("text", [
+        "name,city\nalice,paris\nbob,rome\n",
+        "id,code\n1,AB12\n2,CD34\n",
+        ",value\n0,1.5\n1,2.5\n",
+        "year,amount\n2020,1\n2021,2\n",
+    ])
+    def test_header_detected(self, text):
+        assert sniff_header(text, ',') is True
+
+    def test_numeric_first_row_is_data(self):
+        assert sniff_header("1,2\n3,4\n5,6\n", ',') is False
+
+    def test_single_row_defaults_to_header(self):
+        assert sniff_header("a,b\n", ',') is True
+
+
+class TestSniffUpload:
+    def test_text_header_becomes_columns(self):
+        report = sniff_upload(NamedBytes("people.csv", b"name,city\nalice,paris\nbob,rome\n"))
+        assert report['error'] is None
+        assert report['has_header'] is True
+        assert report['columns'] == ['name', 'city']
+
+    def test_semicolon_delimiter(self):
+        report = sniff_upload(NamedBytes("data.csv", b"a;b\n1;2\n3;4\n"))
+        assert report['delimiter'] == ';'
+        assert report['columns'] == ['a', 'b']
+
+    def test_size_limit(self):
+        report = sniff_upload(NamedBytes("big.csv", b"a\n" + b"1\n" * 1024 * 1024), max_file_size_mb=1)
+        assert report['error'] is not None
+
+    def test_empty_file(self):
+        assert sniff_upload(NamedBytes("empty.csv", b""))['error'] == "File is empty"
+
+
+def test_choose_strategy():
+    mb = 1024 * 1024
+    assert choose_strategy(10 * mb, 'CSV', 256, 1024, True) == EAGER
+    assert choose_strategy(500 * mb, 'CSV', 256, 1024, True) == CHUNKED
+    assert choose_strategy(2000 * mb, 'CSV', 256, 1024, True) == OUT_OF_CORE
+    assert choose_strategy(2000 * mb, 'CSV', 256, 1024, False) == CHUNKED
+    assert choose_strategy(2000 * mb, 'JSONL', 256, 1024, True) == CHUNKED
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+import prewarm
+from jobs import JobManager, DONE
+from prewarm import start_prewarm, run_summary_report, summary_job_key, suggestions_job_key
+
+
+class FakeAgent:
+    def __init__(self, temperature=0.1):
+        self.model = 'model'
+        self.max_tokens = 1000
+        self.temperature = temperature
+        self.calls = []
+
+    def prepare_context(self, data, file_info):
+        self.calls.append('context')
+
+    def generate_summary_report(self, data, file_info):
+        self.calls.append('summary')
+        return "summary"
+
+    def suggest_questions(self, data, file_info):
+        self.calls.append('suggest')
+        return "questions"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = JobManager(max_workers=1, pools={'analysis': 1})
+    monkeypatch.setattr(prewarm, 'get_job_manager', lambda: manager)
+    return manager
+
+
+FILE_INFO = {'name': 'notes.txt', 'type': 'text', 'fingerprint': 'abc'}
+
+
+class TestPrewarm:
+    def test_button_reuses_prewarmed_job(self, manager):
+        agent = FakeAgent()
+        jobs = start_prewarm(agent, SimpleNamespace(), "text", FILE_INFO)
+        for job in jobs:
+            job.future.result(timeout=10)
+        assert all(job.status == DONE for job in jobs)
+
+        clicked = manager.submit(run_summary_report, agent, "text", FILE_INFO, name="Summary report",
+                                 memo_key=summary_job_key(FILE_INFO, agent), pool='analysis')
+        assert clicked is jobs[2] and clicked.result == "summary"
+        assert agent.calls.count('summary') == 1
+
+    @pytest.mark.parametrize('key', [summary_job_key, suggestions_job_key])
+    def test_keys_change_with_generation_settings(self, key):
+        agent = FakeAgent()
+        assert key(FILE_INFO, agent) == key(FILE_INFO, FakeAgent())
+        assert key(FILE_INFO, agent) != key(FILE_INFO, FakeAgent(temperature=0.7))
+        agent.max_tokens = 2000
+        assert key(FILE_INFO, agent) != key(FILE_INFO, FakeAgent())
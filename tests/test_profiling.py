@@ -0,0 +1,87 @@
+import contextvars
+import glob
+import json
+import os
+import threading
+
+import pytest
+
+import profiling
+from profiling import profiled, profiling_enabled, set_profiling_enabled
+from jobs import JobManager
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILES_DIR', str(tmp_path))
+    return tmp_path
+
+
+def read_profiles(directory):
+    return [json.load(open(path)) for path in sorted(glob.glob(os.path.join(directory, '*.json')))]
+
+
+class TestSwitch:
+    def test_per_context(self):
+        def session(enabled, results):
+            set_profiling_enabled(enabled)
+            results.append(profiling_enabled())
+
+        results = []
+        contextvars.copy_context().run(session, True, results)
+        contextvars.copy_context().run(session, False, results)
+        assert results == [True, False]
+        assert profiling_enabled() == profiling.PROFILING_DEFAULT
+
+    def test_jobs_inherit_the_submitting_session(self):
+        def submit_from_session(enabled):
+            set_profiling_enabled(enabled)
+            job = JobManager(max_workers=1).submit(lambda progress_callback: profiling_enabled())
+            return job.future.result(timeout=10)
+
+        assert contextvars.copy_context().run(submit_from_session, True) is True
+        assert contextvars.copy_context().run(submit_from_session, False) is False
+
+
+class TestProfiled:
+    def test_disabled_writes_nothing(self, profiles_dir):
+        contextvars.copy_context().run(lambda: (set_profiling_enabled(False), profiled('stage')(lambda: 1)()))
+        assert read_profiles(profiles_dir) == []
+
+    def test_single_call_reports_its_peak(self, profiles_dir):
+        @profiled('alloc', fingerprint_fn=lambda n: 'abc')
+        def allocate(n):
+            return len(bytearray(n))
+
+        def run():
+            set_profiling_enabled(True)
+            return allocate(5 * 1024 * 1024)
+
+        assert contextvars.copy_context().run(run) == 5 * 1024 * 1024
+        [profile] = read_profiles(profiles_dir)
+        assert profile['stage'] == 'alloc' and profile['fingerprint'] == 'abc'
+        assert profile['peak_memory_bytes'] >= 5 * 1024 * 1024
+        assert profile['process_peak_memory_bytes'] is None
+
+    def test_overlapping_calls_are_labelled_process_wide(self, profiles_dir):
+        inside = threading.Barrier(2)
+
+        @profiled('overlap')
+        def work():
+            inside.wait(timeout=10)
+            return bytearray(1024)
+
+        def run():
+            set_profiling_enabled(True)
+            work()
+
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(run,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        profiles = read_profiles(profiles_dir)
+        assert len(profiles) == 2
+        assert all(p['peak_memory_bytes'] is None and p['process_peak_memory_bytes'] for p in profiles)
+        assert not profiling._active_calls
@@ -0,0 +1,48 @@
+from semantic_cache import SemanticCache, normalize_question
+
+
+class TestNormalize:
+    def test_filler_words_and_punctuation_are_dropped(self):
+        assert normalize_question("What are the main trends?") == normalize_question("main trends in this data")
+
+    def test_only_filler_words_are_kept(self):
+        assert normalize_question("What is this?") == "what is this"
+
+
+class TestSemanticCache:
+    def test_rephrased_question_returns_the_answer(self):
+        cache = SemanticCache()
+        cache.add('ds', "What are the main trends?", "Sales grow")
+        hit = cache.lookup('ds', "Show me the main trends in this data", record_stats=False)
+        assert hit['action'] == 'return' and hit['answer'] == "Sales grow"
+        assert hit['similarity'] == 1.0
+
+    def test_answers_are_per_dataset(self):
+        cache = SemanticCache()
+        cache.add('ds', "average price by region", "42")
+        assert cache.lookup('other', "average price by region", record_stats=False) is None
+
+    def test_different_numbers_are_never_returned_directly(self):
+        cache = SemanticCache(return_threshold=0.5, suggest_threshold=0.3)
+        cache.add('ds', "top 5 products by revenue", "A, B, C, D, E")
+        hit = cache.lookup('ds', "top 10 products by revenue", record_stats=False)
+        assert hit is not None and hit['action'] == 'suggest'
+
+    def test_unrelated_question_misses(self):
+        cache = SemanticCache()
+        cache.add('ds', "average price by region", "42")
+        assert cache.lookup('ds', "correlation between quantity and discount", record_stats=False) is None
+
+    def test_least_recent_entries_and_datasets_are_dropped(self):
+        cache = SemanticCache(max_entries_per_dataset=1, max_datasets=1)
+        cache.add('ds', "average price", "1")
+        cache.add('ds', "median quantity", "2")
+        assert cache.lookup('ds', "average price", record_stats=False) is None
+        cache.add('other', "median quantity", "3")
+        assert cache.lookup('ds', "median quantity", record_stats=False) is None
+
+    def test_clear(self):
+        cache = SemanticCache()
+        cache.add('ds', "average price", "1")
+        cache.clear('ds')
+        assert cache.lookup('ds', "average price", record_stats=False) is None
@@ -0,0 +1,19 @@
+import settings
+
+
+class TestSettings:
+    def test_dotted_lookup_with_defaults(self, monkeypatch):
+        monkeypatch.setattr(settings, '_config_cache', {'security': {'session_timeout_minutes': 30}})
+        assert settings.get_setting('security.session_timeout_minutes') == 30
+        assert settings.get_setting('security.missing', 5) == 5
+        assert settings.get_setting('security.session_timeout_minutes.deeper', 'x') == 'x'
+
+    def test_explicit_path_is_not_cached(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, '_config_cache', {'cached': True})
+        path = tmp_path / 'config.yaml'
+        path.write_text("export:\n  max_inline_kb: 8\n")
+        assert settings.load_config(str(path)) == {'export': {'max_inline_kb': 8}}
+        assert settings.load_config() == {'cached': True}
+
+    def test_missing_file_gives_empty_config(self, tmp_path):
+        assert settings.load_config(str(tmp_path / 'absent.yaml')) == {}
@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import singleflight
+from singleflight import SingleFlight, request_key
+
+
+class TestRequestKey:
+    def test_stable_across_argument_order(self):
+        assert request_key(model='m', messages=[1]) == request_key(messages=[1], model='m')
+        assert request_key(model='m', messages=[1]) != request_key(model='m', messages=[2])
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self, monkeypatch):
+        follower_waiting = threading.Event()
+
+        class SignallingFuture(Future):
+            # Only followers wait on the result; the leader sets it
+            def result(self, timeout=None):
+                follower_waiting.set()
+                return super().result(timeout)
+
+        monkeypatch.setattr(singleflight, 'Future', SignallingFuture)
+        flight = SingleFlight()
+        started = threading.Event()
+        calls, results = [], []
+
+        def work():
+            calls.append(1)
+            started.set()
+            assert follower_waiting.wait(timeout=10)
+            return 'answer'
+
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', work)))
+        leader.start()
+        assert started.wait(timeout=10)
+        follower = threading.Thread(target=lambda: results.append(flight.do('key', work)))
+        follower.start()
+        leader.join(timeout=10)
+        follower.join(timeout=10)
+
+        assert calls == [1]
+        assert sorted(results) == [('answer', False), ('answer', True)]
+        assert flight.in_flight() == 0
+
+    def test_exceptions_reach_the_caller_and_are_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            flight.do('key', fail)
+        assert flight.do('key', lambda: 1) == (1, False)
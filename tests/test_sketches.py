@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from sketches import SpaceSaving, HyperLogLog, CategoricalSketch, sketch_column
+
+
+def zipf_values(n, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, distinct + 1)
+    return pd.Series(rng.choice(distinct, size=n, p=weights / weights.sum())).map(lambda v: f"v{v}")
+
+
+class TestSpaceSaving:
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(10)
+        sketch.update_counts([('a', 3), ('b', 1), ('a', 2)])
+        sketch.update('c')
+        assert sketch.top(2) == [{'value': 'a', 'count': 5, 'error': 0},
+                                 {'value': 'b', 'count': 1, 'error': 0}]
+        assert sketch.total == 7
+
+    def test_bounds_hold_over_chunks(self):
+        values = zipf_values(50_000, 2_000)
+        truth = values.value_counts()
+        sketch = SpaceSaving(50)
+        for start in range(0, len(values), 5_000):
+            sketch.update_counts(values.iloc[start:start + 5_000].value_counts())
+
+        assert len(sketch.counts) == 50
+        assert sketch.total == len(values)
+        for item in sketch.top(50):
+            true_count = truth[item['value']]
+            assert item['count'] >= true_count
+            assert item['count'] - item['error'] <= true_count
+        # The heaviest values are found, in order
+        assert [item['value'] for item in sketch.top(3)] == list(truth.index[:3])
+
+    def test_merge_matches_single_pass(self):
+        values = zipf_values(20_000, 500, seed=1)
+        left, right = SpaceSaving(40), SpaceSaving(40)
+        left.update_counts(values.iloc[:10_000].value_counts())
+        right.update_counts(values.iloc[10_000:].value_counts())
+        left.merge(right)
+
+        truth = values.value_counts()
+        assert left.total == len(values)
+        assert [item['value'] for item in left.top(5)] == list(truth.index[:5])
+        for item in left.top(40):
+            assert item['count'] >= truth[item['value']] >= item['count'] - item['error']
+
+    def test_mixed_value_types(self):
+        sketch = SpaceSaving(3)
+        sketch.update_counts(pd.Series(['x', 1, 1, 2.5, 'x', 'x'], dtype=object).value_counts())
+        assert sketch.top(1)[0] == {'value': 'x', 'count': 3, 'error': 0}
+
+
+class TestHyperLogLog:
+    def test_estimate_within_tolerance(self):
+        values = pd.Series(np.arange(100_000)).astype(str)
+        sketch = HyperLogLog(12)
+        sketch.update_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        assert abs(sketch.estimate() - 100_000) / 100_000 < 0.05
+
+    def test_merge_equals_union(self):
+        def hashed(values):
+            return pd.util.hash_pandas_object(pd.Series(values).astype(str), index=False).to_numpy()
+
+        a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        a.update_hashes(hashed(range(0, 6_000)))
+        b.update_hashes(hashed(range(4_000, 10_000)))
+        union.update_hashes(hashed(range(0, 10_000)))
+        a.merge(b)
+        assert a.estimate() == union.estimate()
+
+
+class TestCategoricalSketch:
+    def test_result(self):
+        values = pd.Series(['red', 'blue', None, 'red', 'green', 'red'])
+        result = sketch_column(values, chunk_size=2, top_k_capacity=10).result(2)
+        assert result['non_null'] == 5
+        assert result['missing'] == 1
+        assert result['approx_distinct'] == 3
+        assert result['top_values'][0] == {'value': 'red', 'count': 3, 'error': 0}
+        assert result['string_length'] == {'min': 3, 'max': 5, 'mean': 3.6}
+
+    def test_merge_parts(self):
+        first, second = CategoricalSketch(10), CategoricalSketch(10)
+        first.update(pd.Series(['a', 'b', 'a']))
+        second.update(pd.Series(['a', None]))
+        first.merge(second)
+        result = first.result(1)
+        assert result['top_values'] == [{'value': 'a', 'count': 3, 'error': 0}]
+        assert result['missing'] == 1
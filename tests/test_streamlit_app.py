@@ -0,0 +1,81 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+import streamlit_app
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data, file_id):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = file_id
+
+
+@pytest.fixture
+def session(monkeypatch):
+    state = SimpleNamespace(upload_fingerprints={}, session_id='session', chat_history=[])
+    state.get = lambda key, default=None: getattr(state, key, default)
+    monkeypatch.setattr(streamlit_app, 'st', SimpleNamespace(session_state=state))
+    return state
+
+
+class TestUploadFingerprints:
+    def test_hashed_once_per_upload(self, session, monkeypatch):
+        calls = []
+        real = streamlit_app.compute_fingerprint
+        monkeypatch.setattr(streamlit_app, 'compute_fingerprint', lambda f: calls.append(f.name) or real(f))
+        uploads = [Upload('a.csv', b"x\n1\n", 'id-a'), Upload('b.csv', b"y\n2\n", 'id-b')]
+
+        first = streamlit_app.upload_fingerprints(uploads)
+        second = streamlit_app.upload_fingerprints(uploads)
+        assert first == second
+        assert calls == ['a.csv', 'b.csv']
+
+    def test_removed_uploads_are_forgotten(self, session):
+        streamlit_app.upload_fingerprints([Upload('a.csv', b"x\n1\n", 'id-a'), Upload('b.csv', b"y\n", 'id-b')])
+        streamlit_app.upload_fingerprints([Upload('b.csv', b"y\n", 'id-b')])
+        assert list(session.upload_fingerprints) == [('id-b', 2)]
+
+    def test_replaced_file_is_hashed_again(self, session):
+        before = streamlit_app.upload_fingerprints([Upload('a.csv', b"x\n1\n", 'id-a')])
+        after = streamlit_app.upload_fingerprints([Upload('a.csv', b"x\n2\n", 'id-a2')])
+        assert before['a.csv'] != after['a.csv']
+
+
+class TestReportExportKey:
+    def test_changes_with_latest_interaction_after_trimming(self, session):
+        session.chat_history = [{'question': f'q{i}', 'response': 'r'} for i in range(50)]
+        before = streamlit_app.report_export_key('md')
+        session.chat_history = session.chat_history[1:] + [{'question': 'q50', 'response': 'r'}]
+        assert len(session.chat_history) == 50
+        assert streamlit_app.report_export_key('md') != before
+        assert streamlit_app.report_export_key('md') == streamlit_app.report_export_key('md')
+
+
+class TestOfferDownload:
+    @pytest.fixture
+    def buttons(self, monkeypatch):
+        calls = []
+
+        def download_button(data, **kwargs):
+            kwargs['content'] = data() if callable(data) else data.read()
+            calls.append(kwargs)
+
+        monkeypatch.setattr(streamlit_app, 'st', SimpleNamespace(
+            download_button=download_button, caption=lambda *a: None, warning=lambda *a: None))
+        return calls
+
+    @pytest.mark.parametrize('lazy', [True, False])
+    def test_serves_export_file(self, buttons, tmp_path, monkeypatch, lazy):
+        monkeypatch.setattr(streamlit_app, 'LAZY_DOWNLOADS', lazy)
+        path = tmp_path / 'report.md'
+        path.write_bytes(b"# Report\n")
+        job = SimpleNamespace(result=str(path), memo_key='export')
+
+        streamlit_app.offer_download(job, 'report', {'md': 'text/markdown'}, "📥 Download report")
+        assert buttons[0]['content'] == b"# Report\n"
+        assert buttons[0]['file_name'] == 'report.md'
+        assert ('on_click' in buttons[0]) == lazy
@@ -0,0 +1,55 @@
+import io
+import os
+
+import pytest
+
+from data_processor import DataProcessor
+from text_document import TextDocument, document_path
+
+
+def build(tmp_path, data, **kwargs):
+    return TextDocument.from_upload(io.BytesIO(data), document_path('doc', str(tmp_path)), 'doc.txt', **kwargs)
+
+
+class TestTextDocument:
+    def test_lines_across_chunks(self, tmp_path):
+        data = "".join(f"line {i}\n" for i in range(100)).encode()
+        document = build(tmp_path, data, chunk_bytes=64)
+        assert len(document.index['chunks']) > 1
+        assert document.line_count == 100
+        assert document.read_lines(8, 12) == "line 8\nline 9\nline 10\nline 11\n"
+        assert "".join(document.iter_chunks()) == data.decode()
+        assert len(document) == len(data)
+
+    def test_bom_and_fallback_encoding(self, tmp_path):
+        document = build(tmp_path, b"\xef\xbb\xbfcaf\xc3\xa9\nend")
+        assert document.read_lines(0, 2) == "café\nend"
+
+        latin = TextDocument.from_upload(io.BytesIO(b"ascii\n" * 20000 + b"caf\xe9\n"),
+                                         str(tmp_path / 'latin'), 'latin.txt', chunk_bytes=1024)
+        assert latin.read_lines(20000, 20001) == "café\n"
+
+    def test_existing_import_is_reused(self, tmp_path):
+        first = build(tmp_path, b"a\nb\n")
+        second = build(tmp_path, b"ignored")
+        assert second.read_lines(0, 2) == "a\nb\n"
+        assert second.path == first.path
+
+    def test_head_and_cleanup(self, tmp_path):
+        document = build(tmp_path, b"0123456789\n" * 10, chunk_bytes=16)
+        assert document.head(15) == "0123456789\n0123"
+        document.cleanup()
+        assert not os.path.exists(document.path)
+
+
+def test_processor_reuses_the_upload_fingerprint(tmp_path, monkeypatch):
+    settings = {'file_processing.text.dir': str(tmp_path), 'file_processing.text.mmap_threshold_mb': 0}
+    monkeypatch.setattr('data_processor.get_setting', lambda key, default=None: settings.get(key, default))
+    monkeypatch.setattr('data_processor.compute_fingerprint', lambda f: pytest.fail("upload hashed again"))
+    upload = io.BytesIO(b"first line\nsecond line\n")
+    upload.name = 'notes.txt'
+    upload.size = len(upload.getvalue())
+    results, errors = DataProcessor().process_files([upload], fingerprints={'notes.txt': 'abc123'})
+    assert errors == {}
+    assert results['notes.txt'].path == os.path.join(str(tmp_path), 'abc123')
+    assert results['notes.txt'].read_lines(1, 2) == "second line\n"
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timeseries import (detect_time_series, choose_resample_rule, describe_rule, resample_aggregates,
+                        describe_time_series, lttb, downsample_series)
+
+
+def daily_frame(days, start='2000-01-01'):
+    times = pd.date_range(start, periods=days, freq='D')
+    return pd.DataFrame({'date': times.strftime('%Y-%m-%d'), 'value': np.arange(days, dtype=float)})
+
+
+class TestDetection:
+    def test_text_dates(self):
+        info = detect_time_series(daily_frame(30))
+        assert info['time_column'] == 'date'
+        assert info['value_columns'] == ['value']
+        assert info['frequency'] == 'D'
+        assert info['monotonic']
+
+    def test_no_time_column(self):
+        assert detect_time_series(pd.DataFrame({'a': range(50), 'b': ['x'] * 50})) is None
+
+
+class TestResampleRule:
+    @pytest.mark.parametrize("span, expected", [
+        (pd.Timedelta(hours=10), '60min'),
+        (pd.Timedelta(days=20), 'D'),
+        (pd.Timedelta(days=200), 'W'),
+        (pd.Timedelta(days=365 * 3), 'MS'),
+        (pd.Timedelta(days=365 * 10), 'QS'),
+        (pd.Timedelta(days=365 * 40), 'YS'),
+    ])
+    def test_finest_rule_within_limit(self, span, expected):
+        start = pd.Timestamp('2000-01-01')
+        assert choose_resample_rule(start, start + span, max_periods=60) == expected
+
+    def test_multi_year(self):
+        start = pd.Timestamp('1750-01-01')
+        rule = choose_resample_rule(start, pd.Timestamp('2000-01-01'), max_periods=30)
+        assert rule == '9YS'
+        assert describe_rule(rule) == '9 years'
+
+
+class TestResampleAggregates:
+    def test_covers_full_range(self):
+        data = daily_frame(365 * 20)
+        aggregated = resample_aggregates(data, 'date', ['value'], max_periods=30)
+        assert len(aggregated) <= 30
+        assert aggregated.index[0] == pd.Timestamp('2000-01-01')
+        assert aggregated[('value', 'min')].iloc[0] == 0
+        assert aggregated[('value', 'max')].iloc[-1] == len(data) - 1
+
+    def test_explicit_rule_merges_buckets_evenly(self):
+        data = daily_frame(100)
+        aggregated = resample_aggregates(data, 'date', ['value'], rule='D', max_periods=30)
+        assert len(aggregated) == 30
+        assert aggregated.attrs['merged'] == 4
+        assert aggregated[('value', 'min')].iloc[0] == 0
+        assert aggregated[('value', 'max')].iloc[-1] == 99
+
+    def test_merged_mean_is_weighted_by_rows(self):
+        data = pd.DataFrame({
+            'date': ['2020-01-01'] * 3 + ['2020-01-02', '2020-01-03', '2020-01-04'],
+            'value': [0.0, 0.0, 0.0, 6.0, 1.0, 1.0],
+        })
+        aggregated = resample_aggregates(data, 'date', ['value'], rule='D', max_periods=2)
+        assert aggregated[('value', 'mean')].tolist() == [pytest.approx(1.5), 1.0]
+
+    def test_description_states_coverage(self):
+        data = daily_frame(100)
+        text = describe_time_series(data, detect_time_series(data), max_periods=10)
+        assert "per month (4 periods covering the full range)" in text
+        assert "value_mean" in text
+
+
+class TestDownsampling:
+    def test_lttb_keeps_endpoints_and_peak(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[500] = 100
+        selected = lttb(x, y, 50)
+        assert len(selected) == 50
+        assert selected[0] == 0 and selected[-1] == 999
+        assert 500 in selected
+
+    def test_downsample_series(self):
+        data = daily_frame(5000)
+        series = downsample_series(data, 'date', 'value', max_points=100)
+        assert len(series) == 100
+        assert series.index.is_monotonic_increasing